@@ -0,0 +1,109 @@
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+import statistics
+from db_engine import connect_sqlite
+
+# Varsayılan SQLite ayarları ile ortak profilin eşzamanlı yük altında karşılaştırması.
+# Kullanım (depo kökünden): python -m benchmarks.bench_sqlite [süre_saniye]
+
+WRITERS = 4
+READERS = 8
+ROWS = 5000
+
+
+def _connect_default(db_path):
+    """Uygulamanın önceki bağlantı biçimi (rollback journal, synchronous=FULL)"""
+    return sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+
+
+def _prepare(db_path, connect):
+    conn = connect(db_path)
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, collection_id INTEGER, title TEXT, created_at REAL)')
+    conn.executemany(
+        'INSERT INTO items (collection_id, title, created_at) VALUES (?, ?, ?)',
+        [(i % 100, f'öğe {i}', time.time()) for i in range(ROWS)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(connect, duration=3.0):
+    """Yazar ve okuyucu iş parçacıklarını duration süresince çalıştır, ölçümleri döndür"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        _prepare(db_path, connect)
+
+        stop = threading.Event()
+        writes = [0] * WRITERS
+        latencies = [[] for _ in range(READERS)]
+        errors = []
+
+        def writer(index):
+            conn = connect(db_path)
+            try:
+                while not stop.is_set():
+                    # Uygulamadaki gibi her ekleme kendi commit'i ile
+                    conn.execute(
+                        'INSERT INTO items (collection_id, title, created_at) VALUES (?, ?, ?)',
+                        (index, 'yeni öğe', time.time())
+                    )
+                    conn.commit()
+                    writes[index] += 1
+            except sqlite3.Error as e:
+                errors.append(str(e))
+            finally:
+                conn.close()
+
+        def reader(index):
+            conn = connect(db_path)
+            try:
+                n = 0
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    conn.execute(
+                        'SELECT id, title FROM items WHERE collection_id = ? ORDER BY id DESC LIMIT 20',
+                        (n % 100,)
+                    ).fetchall()
+                    latencies[index].append(time.perf_counter() - started)
+                    n += 1
+            except sqlite3.Error as e:
+                errors.append(str(e))
+            finally:
+                conn.close()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+        threads += [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        samples = sorted(l for reader_latencies in latencies for l in reader_latencies)
+        return {
+            'writes_per_sec': sum(writes) / duration,
+            'reads': len(samples),
+            'read_p50_ms': statistics.median(samples) * 1000 if samples else float('nan'),
+            'read_p99_ms': samples[int(len(samples) * 0.99) - 1] * 1000 if samples else float('nan'),
+            'errors': len(errors)
+        }
+
+
+def main(duration=3.0):
+    print(f'{WRITERS} yazar, {READERS} okuyucu, {duration:.0f} sn')
+    for label, connect in (('varsayılan', _connect_default), ('WAL profili', connect_sqlite)):
+        result = run(connect, duration)
+        print(
+            f"{label:12} yazma/sn: {result['writes_per_sec']:8.0f}  "
+            f"okuma: {result['reads']:7d}  p50: {result['read_p50_ms']:6.3f} ms  "
+            f"p99: {result['read_p99_ms']:7.3f} ms  hata: {result['errors']}"
+        )
+
+
+if __name__ == '__main__':
+    import sys
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import random
+import tempfile
+from sqlalchemy import select, text
+from database import Database, Base
+
+# get_collection_suggestions: önceki yöntem (takip listesi + kategori başına NOT IN
+# sorgusu) ile tek pencereli sorgunun çok sayıda koleksiyon takip eden kullanıcılarda
+# karşılaştırması.
+# Kullanım (depo kökünden): python -m benchmarks.bench_suggestions [koleksiyon_sayısı]
+
+CATEGORIES = ['music', 'movies', 'comedy', 'sports', 'education', 'gaming', 'food', 'fashion',
+              'technology', 'travel', 'art', 'animals', 'beauty', 'handsome', 'celebrity']
+FOLLOW_COUNTS = [10, 1000, 5000]
+REPEAT = 5
+BACKGROUND_USERS = 2000
+
+collections = Base.metadata.tables['collections']
+followers = Base.metadata.tables['collection_followers']
+
+
+def old_suggestions(db, user_id, limit=10):
+    """Önceki uygulama: takip edilenleri çek, her kategori için id listesiyle NOT IN sorgusu"""
+    with db.engine.connect() as conn:
+        followed = conn.execute(
+            select(collections.c.collection_id, collections.c.category).join(
+                followers, collections.c.collection_id == followers.c.collection_id
+            ).where(followers.c.follower_id == user_id, collections.c.is_public == True)
+        ).fetchall()
+        categories = set(row.category for row in followed)
+        followed_ids = [row.collection_id for row in followed]
+
+        suggestions = []
+        for category in categories:
+            suggestions.extend(row[0] for row in conn.execute(
+                select(collections.c.collection_id).where(
+                    collections.c.category == category,
+                    collections.c.is_public == True,
+                    ~collections.c.collection_id.in_(followed_ids)
+                ).order_by(collections.c.followers_count.desc()).limit(limit // len(categories))
+            ))
+        return suggestions[:limit]
+
+
+def seed(db, collection_count):
+    rng = random.Random(1)
+    with db.engine.begin() as conn:
+        conn.execute(collections.insert(), [
+            {
+                'collection_id': cid, 'name': f'k{cid}', 'category': rng.choice(CATEGORIES),
+                'is_public': rng.random() > 0.1, 'followers_count': rng.randint(0, 10000)
+            }
+            for cid in range(1, collection_count + 1)
+        ])
+        for user_id, count in enumerate(FOLLOW_COUNTS, start=1):
+            conn.execute(followers.insert(), [
+                {'collection_id': cid, 'follower_id': user_id}
+                for cid in rng.sample(range(1, collection_count + 1), count)
+            ])
+        # Diğer kullanıcıların takipleri (planlayıcı istatistikleri gerçekçi olsun)
+        conn.execute(followers.insert(), [
+            {'collection_id': cid, 'follower_id': user_id}
+            for user_id in range(100, 100 + BACKGROUND_USERS)
+            for cid in rng.sample(range(1, collection_count + 1), 20)
+        ])
+        conn.execute(text('ANALYZE'))
+
+
+def measure(fn):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn()
+    return (time.perf_counter() - started) / REPEAT * 1000, result
+
+
+if __name__ == '__main__':
+    collection_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        seed(db, collection_count)
+        print(f'{collection_count} koleksiyon, {len(CATEGORIES)} kategori')
+        for user_id, count in enumerate(FOLLOW_COUNTS, start=1):
+            old_ms, old = measure(lambda: old_suggestions(db, user_id))
+            new_ms, new = measure(lambda: db.get_collection_suggestion_ids(user_id))
+            same = sorted(old) == sorted(new)
+            print(f'{count:>5} takip: önceki {old_ms:7.1f} ms, tek sorgu {new_ms:7.1f} ms (aynı sonuç: {same})')
+        db.engine.dispose()
@@ -1,14 +1,23 @@
 import re
 import json
-import requests
+import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-import yt_dlp
 import logging
+from services.http_client import get_http_client
+from services.metadata_cache import get_metadata_cache, normalize_url
+from services.single_flight import SingleFlight
+from services.ytdl_pool import get_ytdl_pool
+from services.meta_parser import MetaIndex
 
 logger = logging.getLogger('DigiCollect.ContentCollector')
 
 class ContentCollector:
+    # Aynı URL için eşzamanlı toplama işleri tüm örnekler arasında tek işte birleştirilir
+    _inflight = SingleFlight()
+    
     def __init__(self):
         self.supported_domains = {
             'youtube.com': self._collect_youtube,
@@ -19,80 +28,176 @@ class ContentCollector:
             'open.spotify.com': self._collect_spotify,
             'pinterest.com': self._collect_pinterest
         }
+        
+        # Sayfa HTML'i üzerinden çalışan, koşullu GET ile yeniden doğrulanabilen toplayıcılar.
+        # Değer True ise toplayıcı yalnızca <head> içindeki meta etiketlerini okur.
+        self.page_collectors = {
+            self._collect_twitter: True,
+            self._collect_instagram: True,
+            self._collect_spotify: True,
+            self._collect_pinterest: True,
+            self._collect_webpage: False  # Makale gövdesi de gerekiyor
+        }
+        self.http = get_http_client()
+        self.metadata_cache = get_metadata_cache()
+        self.ytdl = get_ytdl_pool()
         logger.info('ContentCollector başlatıldı')
     
     def collect_content(self, url):
         """URL'den içerik topla"""
+        # Aynı normalize URL için devam eden bir toplama varsa onun sonucunu bekle
+        data = self._inflight.do(normalize_url(url), self._collect_content, url)
+        return {**data, 'url': url} if data else data
+    
+    def _collect_content(self, url):
+        """Önbellek ve domain eşlemesi üzerinden tek bir URL'i topla"""
         try:
-            domain = urlparse(url).netloc.replace('www.', '')
+            domain = self._get_domain(url)
             logger.debug(f'Domain: {domain}')
             
             # Desteklenen domain kontrolü
             collector = self.supported_domains.get(domain)
             if collector:
                 logger.info(f'Desteklenen domain bulundu: {domain}')
-                return collector(url)
+            else:
+                # Genel web sayfası
+                logger.info('Genel web sayfası olarak işleniyor')
+                collector = self._collect_webpage
+            
+            # Önbellekte taze kayıt varsa ağa hiç çıkma
+            cached = self.metadata_cache.get(url)
+            if cached and cached['fresh']:
+                logger.debug(f'Önbellekten döndürüldü: {url}')
+                return {**cached['data'], 'url': url}
             
-            # Genel web sayfası
-            logger.info('Genel web sayfası olarak işleniyor')
-            return self._collect_webpage(url)
+            etag = last_modified = None
+            cacheable = True
+            if collector in self.page_collectors:
+                # Süresi dolmuş kaydı koşullu GET ile yeniden doğrula
+                response = self._fetch_page(
+                    url,
+                    head_only=self.page_collectors[collector],
+                    headers=self.metadata_cache.conditional_headers(cached)
+                )
+                if cached and response.status_code == 304:
+                    logger.debug(f'İçerik değişmemiş, önbellek yenilendi: {url}')
+                    self.metadata_cache.refresh(url)
+                    return {**cached['data'], 'url': url}
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                # Hata sayfalarını önbelleğe alma
+                cacheable = response.ok
+                data = collector(url, response)
+            else:
+                data = collector(url)
+            
+            if data and cacheable:
+                self.metadata_cache.set(url, data, data.get('type'), etag=etag, last_modified=last_modified)
+            return data
             
         except Exception as e:
             logger.exception(f"İçerik toplama hatası: {e}")
             return None
     
+    async def collect_many(self, urls, max_concurrency=16, per_domain_limit=4):
+        """URL listesini eşzamanlı topla, sonuçları tamamlandıkça döndür
+        
+        Args:
+            urls: Toplanacak URL listesi
+            max_concurrency: Aynı anda çalışacak en fazla toplama işi
+            per_domain_limit: Aynı domain için aynı anda çalışacak en fazla iş
+        
+        Yields:
+            Her URL için {'url', 'status', 'data'} veya {'url', 'status', 'error'} sözlüğü
+        """
+        loop = asyncio.get_running_loop()
+        global_limit = asyncio.Semaphore(max_concurrency)
+        domain_limits = defaultdict(lambda: asyncio.Semaphore(per_domain_limit))
+        
+        # Toplayıcılar bloklayan HTTP/yt-dlp çağrıları yaptığı için iş parçacıklarında çalışır
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='DigiCollect-collect')
+        
+        async def collect_one(url):
+            # Önce domain sınırı alınır ki bekleyen işler genel kotayı işgal etmesin
+            async with domain_limits[self._get_domain(url)]:
+                async with global_limit:
+                    try:
+                        data = await self._inflight.do_async(
+                            normalize_url(url), self._collect_content, url, executor=executor
+                        )
+                    except Exception as e:
+                        return {'url': url, 'status': 'error', 'error': str(e)}
+            
+            if data is None:
+                return {'url': url, 'status': 'error', 'error': 'İçerik toplanamadı'}
+            return {'url': url, 'status': 'success', 'data': {**data, 'url': url}}
+        
+        logger.info(f'Toplu içerik toplama başladı: {len(urls)} URL')
+        tasks = [asyncio.ensure_future(collect_one(url)) for url in urls]
+        
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            # Tüketici erken çıkarsa kalan işleri iptal et
+            for task in tasks:
+                task.cancel()
+            executor.shutdown(wait=False)
+            logger.info('Toplu içerik toplama bitti')
+    
+    def _fetch_page(self, url, head_only=True, headers=None):
+        """Sayfayı indir; head_only ise yalnızca <head> bölümünü akış halinde oku"""
+        if head_only:
+            return self.http.fetch_head(url, headers=headers)
+        return self.http.get(url, headers=headers)
+    
+    @staticmethod
+    def _get_domain(url):
+        """URL'den www'suz domaini çıkar"""
+        return urlparse(url).netloc.replace('www.', '')
+    
     def _collect_youtube(self, url):
         """YouTube videosu topla"""
         logger.info(f'YouTube videosu toplanıyor: {url}')
         
-        ydl_opts = {
-            'format': 'best',
-            'extract_flat': True,
-            'no_warnings': True,
-            'quiet': True
-        }
-        
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logger.debug('Video bilgileri çekiliyor')
-                info = ydl.extract_info(url, download=False)
-                
-                data = {
-                    'type': 'video',
-                    'url': url,
-                    'title': info.get('title', ''),
-                    'description': info.get('description', ''),
-                    'thumbnail': info.get('thumbnail', ''),
-                    'duration': info.get('duration', 0)
-                }
-                
-                logger.debug(f'Video bilgileri: {data}')
-                return data
-                
+            logger.debug('Video bilgileri çekiliyor')
+            info = self.ytdl.extract_info(url, 'metadata')
+            
+            data = {
+                'type': 'video',
+                'url': url,
+                'title': info.get('title', ''),
+                'description': info.get('description', ''),
+                'thumbnail': info.get('thumbnail', ''),
+                'duration': info.get('duration', 0)
+            }
+            
+            logger.debug(f'Video bilgileri: {data}')
+            return data
+            
         except Exception as e:
             logger.exception(f"YouTube video toplama hatası: {e}")
             return None
     
-    def _collect_twitter(self, url):
+    def _collect_twitter(self, url, response=None):
         """Twitter gönderisi topla"""
         logger.info(f'Twitter gönderisi toplanıyor: {url}')
         
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+            if response is None:
+                response = self._fetch_page(url)
             # Meta etiketlerinden bilgi çek
-            title = soup.find('meta', property='og:title')
-            description = soup.find('meta', property='og:description')
-            image = soup.find('meta', property='og:image')
+            meta = MetaIndex.parse(response.text)
+            description = meta.prop('og:description') or ''
             
             data = {
                 'type': 'text',
                 'url': url,
-                'title': title.get('content', '') if title else '',
-                'description': description.get('content', '') if description else '',
-                'thumbnail': image.get('content', '') if image else '',
-                'content': description.get('content', '') if description else ''
+                'title': meta.prop('og:title') or '',
+                'description': description,
+                'thumbnail': meta.prop('og:image') or '',
+                'content': description
             }
             
             logger.debug(f'Twitter gönderisi bilgileri: {data}')
@@ -102,29 +207,26 @@ class ContentCollector:
             logger.exception(f"Twitter gönderisi toplama hatası: {e}")
             return None
     
-    def _collect_instagram(self, url):
+    def _collect_instagram(self, url, response=None):
         """Instagram gönderisi topla"""
         logger.info(f'Instagram gönderisi toplanıyor: {url}')
         
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+            if response is None:
+                response = self._fetch_page(url)
             # Meta etiketlerinden bilgi çek
-            title = soup.find('meta', property='og:title')
-            description = soup.find('meta', property='og:description')
-            image = soup.find('meta', property='og:image')
-            type_meta = soup.find('meta', property='og:type')
+            meta = MetaIndex.parse(response.text)
+            image = meta.prop('og:image') or ''
             
-            content_type = 'video' if type_meta and 'video' in type_meta.get('content', '') else 'image'
+            content_type = 'video' if 'video' in (meta.prop('og:type') or '') else 'image'
             
             data = {
                 'type': content_type,
                 'url': url,
-                'title': title.get('content', '') if title else '',
-                'description': description.get('content', '') if description else '',
-                'thumbnail': image.get('content', '') if image else '',
-                'image': image.get('content', '') if image else ''
+                'title': meta.prop('og:title') or '',
+                'description': meta.prop('og:description') or '',
+                'thumbnail': image,
+                'image': image
             }
             
             logger.debug(f'Instagram gönderisi bilgileri: {data}')
@@ -134,27 +236,23 @@ class ContentCollector:
             logger.exception(f"Instagram gönderisi toplama hatası: {e}")
             return None
     
-    def _collect_spotify(self, url):
+    def _collect_spotify(self, url, response=None):
         """Spotify şarkısı topla"""
         logger.info(f'Spotify şarkısı toplanıyor: {url}')
         
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+            if response is None:
+                response = self._fetch_page(url)
             # Meta etiketlerinden bilgi çek
-            title = soup.find('meta', property='og:title')
-            description = soup.find('meta', property='og:description')
-            image = soup.find('meta', property='og:image')
-            duration = soup.find('meta', property='music:duration')
+            meta = MetaIndex.parse(response.text)
             
             data = {
                 'type': 'spotify',
                 'url': url,
-                'title': title.get('content', '') if title else '',
-                'description': description.get('content', '') if description else '',
-                'thumbnail': image.get('content', '') if image else '',
-                'duration': int(duration.get('content', 0)) if duration else 0
+                'title': meta.prop('og:title') or '',
+                'description': meta.prop('og:description') or '',
+                'thumbnail': meta.prop('og:image') or '',
+                'duration': int(meta.prop('music:duration') or 0)
             }
             
             logger.debug(f'Spotify şarkısı bilgileri: {data}')
@@ -164,26 +262,24 @@ class ContentCollector:
             logger.exception(f"Spotify şarkısı toplama hatası: {e}")
             return None
     
-    def _collect_pinterest(self, url):
+    def _collect_pinterest(self, url, response=None):
         """Pinterest görseli topla"""
         logger.info(f'Pinterest görseli toplanıyor: {url}')
         
         try:
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+            if response is None:
+                response = self._fetch_page(url)
             # Meta etiketlerinden bilgi çek
-            title = soup.find('meta', property='og:title')
-            description = soup.find('meta', property='og:description')
-            image = soup.find('meta', property='og:image')
+            meta = MetaIndex.parse(response.text)
+            image = meta.prop('og:image') or ''
             
             data = {
                 'type': 'image',
                 'url': url,
-                'title': title.get('content', '') if title else '',
-                'description': description.get('content', '') if description else '',
-                'thumbnail': image.get('content', '') if image else '',
-                'image': image.get('content', '') if image else ''
+                'title': meta.prop('og:title') or '',
+                'description': meta.prop('og:description') or '',
+                'thumbnail': image,
+                'image': image
             }
             
             logger.debug(f'Pinterest görseli bilgileri: {data}')
@@ -193,18 +289,17 @@ class ContentCollector:
             logger.exception(f"Pinterest görseli toplama hatası: {e}")
             return None
     
-    def _collect_webpage(self, url):
+    def _collect_webpage(self, url, response=None):
         """Genel web sayfası topla"""
         logger.info(f'Web sayfası toplanıyor: {url}')
         
         try:
-            response = requests.get(url)
+            if response is None:
+                response = self._fetch_page(url, head_only=False)
             soup = BeautifulSoup(response.text, 'html.parser')
             
-            # Meta etiketlerinden bilgi çek
-            title = soup.find('meta', property='og:title') or soup.find('title')
-            description = soup.find('meta', property='og:description') or soup.find('meta', {'name': 'description'})
-            image = soup.find('meta', property='og:image')
+            # Meta etiketlerinden bilgi çek (ağaç makale için zaten kurulduğundan tek geçişte indekslenir)
+            meta = MetaIndex.from_soup(soup)
             
             # Ana içeriği bul
             content = ''
@@ -216,9 +311,9 @@ class ContentCollector:
             data = {
                 'type': 'text',
                 'url': url,
-                'title': title.get('content', '') if hasattr(title, 'get') else title.string if title else '',
-                'description': description.get('content', '') if hasattr(description, 'get') else description.string if description else '',
-                'thumbnail': image.get('content', '') if image else '',
+                'title': meta.prop('og:title') or meta.title or '',
+                'description': meta.prop('og:description') or meta.name('description') or '',
+                'thumbnail': meta.prop('og:image') or '',
                 'content': content
             }
             
@@ -2,13 +2,14 @@ import os
 import json
 from moviepy.editor import VideoFileClip, AudioFileClip
 from PIL import Image
-import requests
 from io import BytesIO
 import tempfile
+from services.http_client import get_http_client
 
 class ContentCutter:
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
+        self.http = get_http_client()
     
     def cut_content(self, content_data, cut_params):
         """İçeriği kes"""
@@ -60,7 +61,7 @@ class ContentCutter:
         """Görsel kesiti al"""
         try:
             # Görseli indir
-            response = requests.get(content_data['image'])
+            response = self.http.get(content_data['image'])
             image = Image.open(BytesIO(response.content))
             
             # Kırpma koordinatları
@@ -119,8 +120,8 @@ class ContentCutter:
     def _download_media(self, url, temp_file):
         """Medyayı geçici dosyaya indir"""
         try:
-            response = requests.get(url, stream=True)
-            with open(temp_file, 'wb') as f:
+            # Bağlantının havuza geri dönmesi için yanıtı kapat
+            with self.http.get(url, stream=True) as response, open(temp_file, 'wb') as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     if chunk:
                         f.write(chunk)
@@ -0,0 +1,228 @@
+import re
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+import numpy as np
+from db_engine import connect_sqlite, tr_fold
+
+logger = logging.getLogger('DigiCollect.ContentIndex')
+
+# MinHash için Mersenne asalı; 31 bitlik özetlerle a * x + b çarpımı uint64'e sığar
+_PRIME = (1 << 31) - 1
+
+
+def content_tokens(content_type=None, source_url=None, tags=(), title=None):
+    """İçeriği MinHash kümesine çevir: tür, alan adı, etiketler ve başlık kelimeleri"""
+    tokens = set()
+    if content_type:
+        tokens.add(f'type:{content_type}')
+    domain = urlparse(source_url or '').netloc.lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    if domain:
+        tokens.add(f'domain:{domain}')
+    for tag in tags or ():
+        tokens.add(f'tag:{tr_fold(tag)}')
+    for word in re.findall(r'\w{3,}', tr_fold(title or '')):
+        tokens.add(f'word:{word}')
+    return tokens
+
+
+class ContentLSHIndex:
+    """İçerik önerileri için SQLite'ta kalıcı MinHash/LSH indeksi
+
+    Her içerik num_perm uzunluğunda bir MinHash imzasıyla temsil edilir. İmza
+    bands parçaya bölünür ve her parça bir kovaya yazılır; sorgu yalnızca aynı
+    kovalara düşen içerikleri aday olarak alır. Böylece sorgu süresi katalog
+    büyüklüğüne değil kova boyutlarına bağlıdır. Adaylar imzalardan tahmin edilen
+    Jaccard benzerliğiyle sıralanır.
+    """
+
+    # Bir kovadan okunacak en fazla aday (en yeni içerikler); çok kalabalık kovalar
+    # (ör. yalnızca tür ve alan adı ortak olanlar) sorguyu doğrusal hale getirmez
+    BUCKET_CANDIDATE_LIMIT = 200
+
+    def __init__(self, db_path=None, num_perm=128, bands=32, seed=1):
+        """
+        Args:
+            db_path: İndeks veritabanı yolu
+            num_perm: İmza uzunluğu
+            bands: Kova sayısı; num_perm'i tam bölmeli. bands / num_perm oranı
+                arttıkça daha düşük benzerlikteki içerikler de aday olur
+            seed: Hash permütasyonlarının tohumu; kayıtlı imzalarla aynı kalmalı
+        """
+        if num_perm % bands:
+            raise ValueError('num_perm, bands ile tam bölünmeli')
+
+        if db_path is None:
+            data_dir = Path.home() / 'DigiCollect' / 'data'
+            data_dir.mkdir(parents=True, exist_ok=True)
+            db_path = data_dir / 'content_index.db'
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._config = f'{num_perm}:{bands}:{seed}'
+
+        self._lock = threading.Lock()
+        self.conn = connect_sqlite(db_path)
+        self.create_tables()
+
+    def create_tables(self):
+        """Gerekli tabloları oluştur; imza ayarları değiştiyse indeksi sıfırla"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("CREATE TABLE IF NOT EXISTS lsh_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lsh_items (
+                    item_id INTEGER PRIMARY KEY,
+                    content_type TEXT,
+                    signature BLOB NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lsh_buckets (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    item_id INTEGER NOT NULL,
+                    PRIMARY KEY (band, bucket, item_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_item ON lsh_buckets (item_id)")
+
+            row = cursor.execute("SELECT value FROM lsh_meta WHERE key = 'config'").fetchone()
+            if row and row[0] != self._config:
+                logger.info(f'İmza ayarları değişti ({row[0]} -> {self._config}), indeks sıfırlanıyor')
+                cursor.execute("DELETE FROM lsh_items")
+                cursor.execute("DELETE FROM lsh_buckets")
+            cursor.execute("INSERT OR REPLACE INTO lsh_meta (key, value) VALUES ('config', ?)", (self._config,))
+            self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM lsh_items").fetchone()[0]
+
+    def signature(self, tokens):
+        """Token kümesinin MinHash imzası"""
+        if not tokens:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=4).digest(), 'little') % _PRIME
+             for t in tokens),
+            dtype=np.uint64,
+            count=len(tokens)
+        )
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def _buckets(self, signature):
+        """İmzanın her parçası için (band, kova) çiftleri"""
+        buckets = []
+        for band in range(self.bands):
+            part = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+            digest = hashlib.blake2b(part, digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+        return buckets
+
+    def add_many(self, entries):
+        """İçerikleri tek işlemde ekle veya güncelle
+
+        Args:
+            entries: (item_id, content_type, tokens) üçlüleri
+        """
+        prepared = []
+        for item_id, content_type, tokens in entries:
+            signature = self.signature(tokens)
+            prepared.append((item_id, content_type, signature, self._buckets(signature)))
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            try:
+                for item_id, content_type, signature, buckets in prepared:
+                    cursor.execute("DELETE FROM lsh_buckets WHERE item_id = ?", (item_id,))
+                    cursor.execute(
+                        "INSERT OR REPLACE INTO lsh_items (item_id, content_type, signature) VALUES (?, ?, ?)",
+                        (item_id, content_type, signature.astype(np.uint32).tobytes())
+                    )
+                    cursor.executemany(
+                        "INSERT INTO lsh_buckets (band, bucket, item_id) VALUES (?, ?, ?)",
+                        [(band, bucket, item_id) for band, bucket in buckets]
+                    )
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def add(self, item_id, content_type, tokens):
+        """İçeriği ekle veya güncelle"""
+        self.add_many([(item_id, content_type, tokens)])
+
+    def remove_many(self, item_ids):
+        """İçerikleri tek işlemde indeksten sil"""
+        rows = [(item_id,) for item_id in item_ids]
+        with self._lock:
+            try:
+                self.conn.executemany("DELETE FROM lsh_buckets WHERE item_id = ?", rows)
+                self.conn.executemany("DELETE FROM lsh_items WHERE item_id = ?", rows)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def remove(self, item_id):
+        """İçeriği indeksten sil"""
+        self.remove_many([item_id])
+
+    def item_ids(self):
+        """İndeksteki içeriklerin id kümesi"""
+        with self._lock:
+            return {row[0] for row in self.conn.execute("SELECT item_id FROM lsh_items")}
+
+    def query(self, tokens, content_type=None, limit=10, exclude=None):
+        """Benzer içerikleri (item_id, tahmini Jaccard) olarak azalan sırayla döndür"""
+        signature = self.signature(tokens)
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            candidates = set()
+            for band, bucket in self._buckets(signature):
+                cursor.execute(
+                    "SELECT item_id FROM lsh_buckets WHERE band = ? AND bucket = ? ORDER BY item_id DESC LIMIT ?",
+                    (band, bucket, self.BUCKET_CANDIDATE_LIMIT)
+                )
+                candidates.update(row[0] for row in cursor)
+            candidates.discard(exclude)
+            if not candidates:
+                return []
+
+            ids = list(candidates)
+            rows = []
+            # SQLite parametre sınırına takılmamak için parça parça oku
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                sql = "SELECT item_id, signature FROM lsh_items WHERE item_id IN ({})".format(
+                    ', '.join('?' * len(chunk))
+                )
+                params = list(chunk)
+                if content_type is not None:
+                    sql += " AND content_type = ?"
+                    params.append(content_type)
+                rows.extend(cursor.execute(sql, params).fetchall())
+
+        if not rows:
+            return []
+        found = np.array([row[0] for row in rows])
+        signatures = np.frombuffer(b''.join(row[1] for row in rows), dtype=np.uint32).reshape(len(rows), -1)
+        scores = (signatures == signature.astype(np.uint32)).mean(axis=1)
+
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return [(int(found[i]), float(scores[i])) for i in order]
+
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        with self._lock:
+            self.conn.close()
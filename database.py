@@ -1,15 +1,232 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Base, User, Collection, CollectionItem, CollectionFollower, Category
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import text, select, func, exists, case, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.orm.util import identity_key
+from db_engine import create_sqlite_engine, create_missing_indexes, tr_fold
+from pagination import paginate, DEFAULT_PAGE_SIZE
+from trending import TrendingTracker
+from materialized import MaterializedRecommendations
+from models import Base, User, Collection, CollectionItem, CollectionFollower, Category, PremiumPlan
 import bcrypt
 import json
+import logging
+import re
+
+logger = logging.getLogger('DigiCollect.Database')
+
+# Tam metin arama indeksi. rowid koleksiyonlar için collection_id * 2, içerikler için
+# item_id * 2 + 1'dir; böylece tetikleyiciler kayıtları rowid ile doğrudan bulur.
+# Metinler tr_fold ile katlanarak yazılır, aksanları unicode61 ayrıştırıcısı kaldırır.
+SEARCH_INDEX_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body, collection_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_collections_ai AFTER INSERT ON collections BEGIN
+        INSERT INTO search_index (rowid, title, body, collection_id)
+        VALUES (new.collection_id * 2, tr_fold(new.name), tr_fold(new.description), new.collection_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_collections_ad AFTER DELETE ON collections BEGIN
+        DELETE FROM search_index WHERE rowid = old.collection_id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_collections_au AFTER UPDATE OF name, description ON collections BEGIN
+        DELETE FROM search_index WHERE rowid = old.collection_id * 2;
+        INSERT INTO search_index (rowid, title, body, collection_id)
+        VALUES (new.collection_id * 2, tr_fold(new.name), tr_fold(new.description), new.collection_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_items_ai AFTER INSERT ON collection_items BEGIN
+        INSERT INTO search_index (rowid, title, body, collection_id)
+        VALUES (new.item_id * 2 + 1, tr_fold(new.title),
+                tr_fold(coalesce(new.description, '') || ' ' || coalesce(new.note, '')), new.collection_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_items_ad AFTER DELETE ON collection_items BEGIN
+        DELETE FROM search_index WHERE rowid = old.item_id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_items_au
+    AFTER UPDATE OF title, description, note, collection_id ON collection_items BEGIN
+        DELETE FROM search_index WHERE rowid = old.item_id * 2 + 1;
+        INSERT INTO search_index (rowid, title, body, collection_id)
+        VALUES (new.item_id * 2 + 1, tr_fold(new.title),
+                tr_fold(coalesce(new.description, '') || ' ' || coalesce(new.note, '')), new.collection_id);
+    END
+    """
+]
+
+# Başlık eşleşmeleri açıklama/not eşleşmelerinden daha değerli sayılır
+SEARCH_RANK = 'bm25(search_index, 10.0, 1.0)'
+
+# Bir aramada puanlanacak en fazla eşleşme (en yeni kayıtlardan başlayarak)
+SEARCH_SCAN_LIMIT = 5000
+
+# Plan -> koleksiyon başına toplam eklenebilecek içerik (silinenler de sayılır)
+ITEM_LIMITS = {plan.value: limits['items_per_collection'] for plan, limits in PremiumPlan.PLANS.items()}
+
+# update_collection ile değiştirilebilen alanlar
+UPDATABLE_COLLECTION_FIELDS = ('name', 'description', 'category', 'subcategory', 'is_public')
+
+
+def default_suggestion_score(collections):
+    """Öneri sıralaması için varsayılan skor: takipçi sayısı"""
+    return collections.c.followers_count
+
 
 class Database:
-    def __init__(self, db_path='digicollect.db'):
-        self.engine = create_engine(f'sqlite:///{db_path}')
+    def __init__(self, db_path='digicollect.db', pool_size=5, max_overflow=10):
+        # Her iş parçacığı havuzdan kendi bağlantısını alır (WAL, ortak pragmalar)
+        self.engine = create_sqlite_engine(db_path, pool_size=pool_size, max_overflow=max_overflow)
         Base.metadata.create_all(self.engine)
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        self._migrate_indexes()
+        self._create_search_index()
+        self.trending = TrendingTracker(self.engine)
+        self.materialized = MaterializedRecommendations(self.engine)
+        
+        # Öneri skoru: collections tablosunu alıp SQL ifadesi döndüren fonksiyon
+        self.suggestion_score = default_suggestion_score
+        
+        # İçerik eklenip silindikten (commit sonrası) çağrılır:
+        # listener(olay, collection_id, item_id), olay 'added' veya 'removed'
+        self.item_listeners = []
+        # Koleksiyon oluşturulup güncellendikten (commit sonrası) çağrılır:
+        # listener(olay, collection_id), olay 'created' veya 'updated'
+        self.collection_listeners = []
+        
+        # İş parçacığı başına oturum; session_scope sonunda kapatılır, dönen nesneler
+        # yüklü sütunlarıyla ayrık (detached) kalır ve sonraki okuma yeniden sorgular
+        self.Session = scoped_session(sessionmaker(bind=self.engine, expire_on_commit=False))
+    
+    @property
+    def session(self):
+        """Geçerli iş parçacığına ait oturum"""
+        return self.Session()
+    
+    @contextmanager
+    def session_scope(self):
+        """Tek bir iş birimi: başarıda commit, hatada rollback, her durumda oturumu kapat
+        
+        Oturum kapatıldığı için kimlik haritası iş birimleri arasında taşınmaz; başka
+        iş parçacıklarının veya Core ile yapılan yazmaların sonucu bir sonraki
+        okumada görünür. Dönen nesnelerin ilişkileri tembel yüklenemez.
+        """
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            self.Session.remove()
+    
+    def _notify_item(self, event, collection_id, item_id):
+        """İçerik dinleyicilerini çağır; dinleyici hatası yazma işlemini bozmaz"""
+        for listener in list(self.item_listeners):
+            try:
+                listener(event, collection_id, item_id)
+            except Exception as e:
+                logger.exception(f'İçerik dinleyicisi hatası ({event}, {item_id}): {e}')
+    
+    def _expire_counters(self, collection_id):
+        """Core ile güncellenen sayaçları iş parçacığının açık oturumunda eskimiş işaretle
+        
+        session_scope oturumu kapatır; bu yalnızca db.session'ı doğrudan tutan
+        çağıranların (ör. istek boyunca) eski sayaç görmemesi içindir.
+        """
+        if not self.Session.registry.has():
+            return
+        collection = self.Session().identity_map.get(identity_key(Collection, collection_id))
+        if collection is not None:
+            self.Session().expire(collection, ['item_count', 'total_items_added', 'followers_count'])
+    
+    def _notify_collection(self, event, collection_id):
+        """Koleksiyon dinleyicilerini çağır; dinleyici hatası yazma işlemini bozmaz"""
+        for listener in list(self.collection_listeners):
+            try:
+                listener(event, collection_id)
+            except Exception as e:
+                logger.exception(f'Koleksiyon dinleyicisi hatası ({event}, {collection_id}): {e}')
+    
+    def remove_session(self):
+        """Geçerli iş parçacığının oturumunu kapat ve bağlantıyı havuza iade et
+        
+        Arka plan iş parçacıkları ve web istekleri iş bitiminde çağırmalıdır.
+        """
+        self.Session.remove()
+    
+    def _migrate_indexes(self):
+        """Eski veritabanlarına modellerde tanımlı indeksleri ekle
+        
+        create_all var olan tablolara indeks eklemediği için eksikler tek tek
+        oluşturulur. Benzersiz takipçi indeksinden önce yinelenen takip kayıtları
+        silinir ve etkilenen koleksiyonların takipçi sayıları yeniden hesaplanır.
+        """
+        with self.engine.begin() as conn:
+            duplicated = [row[0] for row in conn.execute(text("""
+                SELECT DISTINCT collection_id FROM collection_followers
+                GROUP BY collection_id, follower_id HAVING COUNT(*) > 1
+            """))]
+            if duplicated:
+                conn.execute(text("""
+                    DELETE FROM collection_followers WHERE id NOT IN (
+                        SELECT MIN(id) FROM collection_followers GROUP BY collection_id, follower_id
+                    )
+                """))
+                for collection_id in duplicated:
+                    conn.execute(text("""
+                        UPDATE collections SET followers_count = (
+                            SELECT COUNT(*) FROM collection_followers
+                            WHERE collection_followers.collection_id = collections.collection_id
+                        ) WHERE collection_id = :collection_id
+                    """), {'collection_id': collection_id})
+            
+            # Sayfalama sütunlarını da içeren indekslerle değiştirilen eski indeksler
+            for name in ('ix_collections_user_id', 'ix_collection_followers_follower',
+                         'ix_collections_category_public_followers'):
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            create_missing_indexes(conn, Base.metadata)
+    
+    def _create_search_index(self):
+        """FTS5 arama indeksini ve eşitleme tetikleyicilerini oluştur, ilk kurulumda doldur"""
+        with self.engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+            )).first()
+            for statement in SEARCH_INDEX_DDL:
+                conn.execute(text(statement))
+            
+            if not exists:
+                conn.execute(text("""
+                    INSERT INTO search_index (rowid, title, body, collection_id)
+                    SELECT collection_id * 2, tr_fold(name), tr_fold(description), collection_id
+                    FROM collections
+                """))
+                conn.execute(text("""
+                    INSERT INTO search_index (rowid, title, body, collection_id)
+                    SELECT item_id * 2 + 1, tr_fold(title),
+                           tr_fold(coalesce(description, '') || ' ' || coalesce(note, '')), collection_id
+                    FROM collection_items
+                """))
+    
+    @staticmethod
+    def _build_match_query(query):
+        """Kullanıcı sorgusunu FTS5 önek sorgusuna çevir: 'Müzik lis' -> '"muzik"* "lis"*'"""
+        tokens = re.findall(r'\w+', tr_fold(query or ''))
+        return ' '.join(f'"{token}"*' for token in tokens)
     
     def create_user(self, email, name, password):
         password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
@@ -19,222 +236,489 @@ class Database:
             password_hash=password_hash.decode('utf-8'),
             premium_type='free'
         )
-        self.session.add(user)
-        self.session.commit()
+        with self.session_scope() as session:
+            session.add(user)
         return user
     
     def update_user_profile(self, user_id, profile_picture=None, name=None):
-        user = self.session.query(User).filter_by(user_id=user_id).first()
-        if user:
-            if profile_picture:
-                user.profile_picture = profile_picture
-            if name:
-                user.name = name
-            self.session.commit()
-            return True
-        return False
+        with self.session_scope() as session:
+            user = session.query(User).filter_by(user_id=user_id).first()
+            if user:
+                if profile_picture:
+                    user.profile_picture = profile_picture
+                if name:
+                    user.name = name
+                return True
+            return False
     
     def upgrade_premium(self, user_id, premium_type):
-        user = self.session.query(User).filter_by(user_id=user_id).first()
-        if user:
-            user.premium_type = premium_type
-            self.session.commit()
-            return True
-        return False
+        with self.session_scope() as session:
+            user = session.query(User).filter_by(user_id=user_id).first()
+            if user:
+                user.premium_type = premium_type
+                return True
+            return False
     
     def create_collection(self, user_id, name, description, category, subcategory=None, is_public=True):
-        # Kullanıcının premium durumunu kontrol et
-        user = self.session.query(User).filter_by(user_id=user_id).first()
-        if not user:
-            return None
-        
-        # Kullanıcının koleksiyon sayısını kontrol et
-        collection_count = self.session.query(Collection).filter_by(user_id=user_id).count()
-        max_collections = {
-            'free': 1,
-            'starter': 2,
-            'standard': 3,
-            'pro': 4,
-            'unlimited': float('inf')
-        }
+        with self.session_scope() as session:
+            # Kullanıcının premium durumunu kontrol et
+            user = session.query(User).filter_by(user_id=user_id).first()
+            if not user:
+                return None
+            
+            # Kullanıcının koleksiyon sayısını kontrol et
+            collection_count = session.query(Collection).filter_by(user_id=user_id).count()
+            max_collections = {
+                'free': 1,
+                'starter': 2,
+                'standard': 3,
+                'pro': 4,
+                'unlimited': float('inf')
+            }
+            
+            if collection_count >= max_collections.get(user.premium_type, 0):
+                return None
+            
+            collection = Collection(
+                user_id=user_id,
+                name=name,
+                description=description,
+                category=category,
+                subcategory=subcategory,
+                is_public=is_public
+            )
+            session.add(collection)
+        self._notify_collection('created', collection.collection_id)
+        return collection
+    
+    def update_collection(self, collection_id, user_id, tags=None, **fields):
+        """Kullanıcının koleksiyonunu güncelle; koleksiyon yoksa veya başkasınınsa False
         
-        if collection_count >= max_collections.get(user.premium_type, 0):
-            return None
+        Args:
+            tags: Şemada etiket sütunu olmadığı için saklanmaz
+            fields: UPDATABLE_COLLECTION_FIELDS içinden alanlar
+        """
+        unknown = set(fields) - set(UPDATABLE_COLLECTION_FIELDS)
+        if unknown:
+            raise ValueError(f"Güncellenemeyen koleksiyon alanları: {', '.join(sorted(unknown))}")
         
-        collection = Collection(
-            user_id=user_id,
-            name=name,
-            description=description,
-            category=category,
-            subcategory=subcategory,
-            is_public=is_public
-        )
-        self.session.add(collection)
-        self.session.commit()
-        return collection
+        with self.session_scope() as session:
+            collection = session.query(Collection).filter_by(collection_id=collection_id, user_id=user_id).first()
+            if not collection:
+                return False
+            for name, value in fields.items():
+                setattr(collection, name, value)
+        self._notify_collection('updated', collection_id)
+        return True
     
     def add_item_to_collection(self, collection_id, user_id, content_data):
-        collection = self.session.query(Collection).filter_by(
-            collection_id=collection_id,
-            user_id=user_id
-        ).first()
+        """İçeriği koleksiyona ekle; limit kontrolü ve sayaçlar tek kısa yazma işleminde
         
-        if not collection:
-            return False
+        İçerik, koleksiyon kullanıcıya aitse ve toplam eklenen içerik sayısı plan
+        limitinin altındaysa tek bir koşullu INSERT ... SELECT ile eklenir; sayaçlar
+        aynı işlemde SQL tarafında artırılır. İlk ifade yazma olduğundan yazma kilidi
+        baştan alınır ve eşzamanlı eklemeler limiti aşamaz.
+        """
+        collections = Base.metadata.tables['collections']
+        users = Base.metadata.tables['users']
+        items = Base.metadata.tables['collection_items']
         
-        # Koleksiyonun toplam içerik limitini kontrol et
-        max_items = {
-            'free': 20,
-            'starter': 25,
-            'standard': 30,
-            'pro': 35,
-            'unlimited': 40
+        values = {
+            'collection_id': collection_id,
+            'user_id': user_id,
+            'content_type': content_data['type'],
+            'source_url': content_data['url'],
+            'title': content_data.get('title'),
+            'description': content_data.get('description'),
+            'thumbnail_url': content_data.get('thumbnail'),
+            'note': content_data.get('note'),
+            'cut_data': json.dumps(content_data.get('cut_data', {})),
+            'created_at': datetime.utcnow()
         }
-        
-        user = self.session.query(User).filter_by(user_id=user_id).first()
-        if collection.total_items_added >= max_items.get(user.premium_type, 0):
-            return False
-        
-        item = CollectionItem(
-            collection_id=collection_id,
-            user_id=user_id,
-            content_type=content_data['type'],
-            source_url=content_data['url'],
-            title=content_data.get('title'),
-            description=content_data.get('description'),
-            thumbnail_url=content_data.get('thumbnail'),
-            note=content_data.get('note'),
-            cut_data=json.dumps(content_data.get('cut_data', {}))
+        max_items = case(ITEM_LIMITS, value=users.c.premium_type, else_=0)
+        source = select(
+            *[literal(value, items.c[name].type) for name, value in values.items()]
+        ).select_from(
+            collections.join(users, users.c.user_id == collections.c.user_id)
+        ).where(
+            collections.c.collection_id == collection_id,
+            collections.c.user_id == user_id,
+            func.coalesce(collections.c.total_items_added, 0) < max_items
         )
         
-        self.session.add(item)
-        collection.item_count += 1
-        collection.total_items_added += 1
-        self.session.commit()
+        with self.engine.begin() as conn:
+            result = conn.execute(items.insert().from_select(list(values), source))
+            if not result.rowcount:
+                return False
+            item_id = result.lastrowid
+            conn.execute(
+                collections.update().where(collections.c.collection_id == collection_id).values(
+                    item_count=func.coalesce(collections.c.item_count, 0) + 1,
+                    total_items_added=func.coalesce(collections.c.total_items_added, 0) + 1
+                )
+            )
+            self.trending.record(conn, collection_id, 'item_add')
+        self._expire_counters(collection_id)
+        self._notify_item('added', collection_id, item_id)
         return True
     
     def remove_item_from_collection(self, collection_id, item_id, user_id):
-        item = self.session.query(CollectionItem).filter_by(
-            item_id=item_id,
-            collection_id=collection_id,
-            user_id=user_id
-        ).first()
-        
-        if not item:
-            return False
-        
-        collection = self.session.query(Collection).filter_by(
-            collection_id=collection_id
-        ).first()
-        
-        if collection:
-            collection.item_count -= 1
-            # total_items_added değişmez
+        collections = Base.metadata.tables['collections']
+        items = Base.metadata.tables['collection_items']
         
-        self.session.delete(item)
-        self.session.commit()
+        with self.engine.begin() as conn:
+            deleted = conn.execute(items.delete().where(
+                items.c.item_id == item_id,
+                items.c.collection_id == collection_id,
+                items.c.user_id == user_id
+            )).rowcount
+            if not deleted:
+                return False
+            # total_items_added değişmez; eski veritabanlarındaki NULL sayaç 0 sayılır
+            conn.execute(
+                collections.update().where(collections.c.collection_id == collection_id).values(
+                    item_count=func.max(func.coalesce(collections.c.item_count, 0) - 1, 0)
+                )
+            )
+        self._expire_counters(collection_id)
+        self._notify_item('removed', collection_id, item_id)
         return True
     
     def follow_collection(self, collection_id, follower_id):
-        # Koleksiyonun public olduğunu kontrol et
-        collection = self.session.query(Collection).filter_by(
-            collection_id=collection_id,
-            is_public=True
-        ).first()
+        """Herkese açık koleksiyonu takip et; zaten takip ediliyorsa False
         
-        if not collection:
-            return False
-        
-        # Zaten takip edilip edilmediğini kontrol et
-        existing = self.session.query(CollectionFollower).filter_by(
-            collection_id=collection_id,
-            follower_id=follower_id
-        ).first()
-        
-        if existing:
-            return False
+        Takip kaydı tek bir koşullu INSERT ... ON CONFLICT DO NOTHING ile eklenir,
+        takipçi sayısı aynı işlemde SQL tarafında artırılır.
+        """
+        collections = Base.metadata.tables['collections']
+        followers = Base.metadata.tables['collection_followers']
         
-        follower = CollectionFollower(
-            collection_id=collection_id,
-            follower_id=follower_id
+        source = select(
+            literal(collection_id, followers.c.collection_id.type),
+            literal(follower_id, followers.c.follower_id.type),
+            literal(datetime.utcnow(), followers.c.created_at.type)
+        ).where(
+            exists().where(collections.c.collection_id == collection_id, collections.c.is_public == True)
         )
+        statement = sqlite_insert(followers).from_select(
+            ['collection_id', 'follower_id', 'created_at'], source
+        ).on_conflict_do_nothing(index_elements=['collection_id', 'follower_id'])
         
-        self.session.add(follower)
-        collection.followers_count += 1
-        self.session.commit()
+        with self.engine.begin() as conn:
+            if not conn.execute(statement).rowcount:
+                return False
+            conn.execute(
+                collections.update().where(collections.c.collection_id == collection_id).values(
+                    followers_count=func.coalesce(collections.c.followers_count, 0) + 1
+                )
+            )
+            self.trending.record(conn, collection_id, 'follow')
+        self._expire_counters(collection_id)
         return True
     
     def unfollow_collection(self, collection_id, follower_id):
-        follower = self.session.query(CollectionFollower).filter_by(
-            collection_id=collection_id,
-            follower_id=follower_id
-        ).first()
-        
-        if not follower:
-            return False
+        collections = Base.metadata.tables['collections']
+        followers = Base.metadata.tables['collection_followers']
         
-        collection = self.session.query(Collection).filter_by(
-            collection_id=collection_id
-        ).first()
-        
-        if collection:
-            collection.followers_count -= 1
-        
-        self.session.delete(follower)
-        self.session.commit()
+        with self.engine.begin() as conn:
+            deleted = conn.execute(followers.delete().where(
+                followers.c.collection_id == collection_id,
+                followers.c.follower_id == follower_id
+            )).rowcount
+            if not deleted:
+                return False
+            conn.execute(
+                collections.update().where(collections.c.collection_id == collection_id).values(
+                    followers_count=func.max(func.coalesce(collections.c.followers_count, 0) - 1, 0)
+                )
+            )
+            self.trending.record(conn, collection_id, 'unfollow')
+        self._expire_counters(collection_id)
         return True
     
     def get_user_collections(self, user_id):
-        return self.session.query(Collection).filter_by(user_id=user_id).all()
+        with self.session_scope() as session:
+            return session.query(Collection).filter_by(user_id=user_id).all()
     
     def get_collection_items(self, collection_id, user_id=None):
-        query = self.session.query(CollectionItem).filter_by(collection_id=collection_id)
-        if user_id:
-            query = query.filter_by(user_id=user_id)
-        return query.all()
+        with self.session_scope() as session:
+            query = session.query(CollectionItem).filter_by(collection_id=collection_id)
+            if user_id:
+                query = query.filter_by(user_id=user_id)
+            return query.all()
+    
+    def get_user_collections_page(self, user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Kullanıcının koleksiyonlarını en yeniden eskiye sayfalı getir: (koleksiyonlar, sonraki_imleç)"""
+        with self.session_scope() as session:
+            query = session.query(Collection).filter(Collection.user_id == user_id)
+            return paginate(query, [Collection.created_at, Collection.collection_id], cursor, limit)
+    
+    def get_collection_items_page(self, collection_id, user_id=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Koleksiyon içeriklerini en yeniden eskiye sayfalı getir: (içerikler, sonraki_imleç)"""
+        with self.session_scope() as session:
+            query = session.query(CollectionItem).filter(CollectionItem.collection_id == collection_id)
+            if user_id:
+                query = query.filter(CollectionItem.user_id == user_id)
+            return paginate(query, [CollectionItem.created_at, CollectionItem.item_id], cursor, limit)
+    
+    def get_followed_collections_page(self, user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Takip edilen koleksiyonları son takip edilenden başlayarak sayfalı getir: (koleksiyonlar, sonraki_imleç)"""
+        with self.session_scope() as session:
+            query = session.query(
+                Collection, CollectionFollower.created_at, CollectionFollower.id
+            ).join(
+                CollectionFollower,
+                Collection.collection_id == CollectionFollower.collection_id
+            ).filter(
+                CollectionFollower.follower_id == user_id,
+                Collection.is_public == True
+            )
+            rows, next_cursor = paginate(
+                query,
+                [CollectionFollower.created_at, CollectionFollower.id],
+                cursor,
+                limit,
+                key=lambda row: (row[1], row[2])
+            )
+            return [row[0] for row in rows], next_cursor
     
     def get_followed_collections(self, user_id):
-        return self.session.query(Collection).join(
-            CollectionFollower,
-            Collection.collection_id == CollectionFollower.collection_id
-        ).filter(
-            CollectionFollower.follower_id == user_id,
-            Collection.is_public == True
-        ).all()
-    
-    def get_trending_collections(self, limit=10):
-        return self.session.query(Collection).filter_by(
-            is_public=True
-        ).order_by(
-            Collection.followers_count.desc()
-        ).limit(limit).all()
-    
-    def search_collections(self, query, category=None, limit=20):
-        q = self.session.query(Collection).filter(
-            Collection.is_public == True,
-            Collection.name.ilike(f'%{query}%')
-        )
+        with self.session_scope() as session:
+            return session.query(Collection).join(
+                CollectionFollower,
+                Collection.collection_id == CollectionFollower.collection_id
+            ).filter(
+                CollectionFollower.follower_id == user_id,
+                Collection.is_public == True
+            ).all()
+    
+    def record_collection_view(self, collection_id):
+        """Koleksiyon görüntülenmesini trend skorlarına işle"""
+        with self.engine.begin() as conn:
+            self.trending.record(conn, collection_id, 'view')
+    
+    def get_trending_collections(self, time_period='daily', limit=10):
+        """Seçilen zaman penceresinde sönümlü skoru en yüksek herkese açık koleksiyonlar
         
-        if category:
-            q = q.filter(Collection.category == category)
-        
-        return q.limit(limit).all()
-    
-    def get_collection_suggestions(self, user_id, limit=10):
-        # Kullanıcının takip ettiği koleksiyonların kategorilerine göre öneriler
-        followed = self.get_followed_collections(user_id)
-        categories = set(c.category for c in followed)
-        
-        suggestions = []
-        for category in categories:
-            category_suggestions = self.session.query(Collection).filter(
-                Collection.category == category,
-                Collection.is_public == True,
-                ~Collection.collection_id.in_([c.collection_id for c in followed])
-            ).order_by(
+        Henüz yeterli olay yoksa liste takipçi sayısına göre tamamlanır.
+        """
+        with self.engine.connect() as conn:
+            ids = [cid for cid, _ in self.trending.top(conn, time_period, limit)]
+        collections = self.get_collections_by_ids(ids)
+        if len(collections) >= limit:
+            return collections
+        
+        with self.session_scope() as session:
+            query = session.query(Collection).filter_by(is_public=True)
+            if ids:
+                query = query.filter(~Collection.collection_id.in_(ids))
+            return collections + query.order_by(
                 Collection.followers_count.desc()
-            ).limit(limit // len(categories)).all()
-            
-            suggestions.extend(category_suggestions)
+            ).limit(limit - len(collections)).all()
+    
+    def get_collection_by_id(self, collection_id):
+        with self.session_scope() as session:
+            return session.query(Collection).filter_by(collection_id=collection_id).first()
+    
+    def get_collections_by_ids(self, collection_ids):
+        """Koleksiyonları verilen id sırasıyla tek sorguda getir"""
+        if not collection_ids:
+            return []
+        
+        with self.session_scope() as session:
+            found = {
+                c.collection_id: c
+                for c in session.query(Collection).filter(Collection.collection_id.in_(collection_ids))
+            }
+            return [found[i] for i in collection_ids if i in found]
+    
+    def get_all_public_collections(self):
+        with self.session_scope() as session:
+            return session.query(Collection).filter_by(is_public=True).all()
+    
+    def get_items_by_ids(self, item_ids, public_only=False):
+        """İçerikleri verilen id sırasıyla tek sorguda getir
+        
+        public_only ise yalnızca herkese açık koleksiyonlardaki içerikler döner.
+        """
+        if not item_ids:
+            return []
         
-        return suggestions[:limit]
+        with self.session_scope() as session:
+            query = session.query(CollectionItem).filter(CollectionItem.item_id.in_(item_ids))
+            if public_only:
+                query = query.join(
+                    Collection, Collection.collection_id == CollectionItem.collection_id
+                ).filter(Collection.is_public == True)
+            found = {i.item_id: i for i in query}
+            return [found[i] for i in item_ids if i in found]
+    
+    def get_public_item_ids(self):
+        """Herkese açık koleksiyonlardaki içeriklerin id kümesi"""
+        with self.engine.connect() as conn:
+            return {row[0] for row in conn.execute(text("""
+                SELECT collection_items.item_id FROM collection_items
+                JOIN collections ON collections.collection_id = collection_items.collection_id
+                WHERE collections.is_public = 1
+            """))}
+    
+    def get_all_public_items(self):
+        with self.session_scope() as session:
+            return session.query(CollectionItem).join(
+                Collection,
+                Collection.collection_id == CollectionItem.collection_id
+            ).filter(Collection.is_public == True).all()
+    
+    def get_collection_features(self, collection_ids=None):
+        """Benzerlik için koleksiyon özelliklerini tek sorguda getir
+        
+        collection_ids verilmezse yalnızca herkese açık koleksiyonlar döner.
+        Returns:
+            {collection_id: {'category', 'subcategory', 'is_public', 'content_types': {tür: adet}}}
+        """
+        sql = """
+            SELECT c.collection_id, c.category, c.subcategory, c.is_public,
+                   i.content_type, COUNT(i.item_id)
+            FROM collections AS c
+            LEFT JOIN collection_items AS i ON i.collection_id = c.collection_id
+        """
+        params = {}
+        if collection_ids is None:
+            sql += " WHERE c.is_public = 1"
+        else:
+            ids = list(collection_ids)
+            if not ids:
+                return {}
+            sql += " WHERE c.collection_id IN ({})".format(', '.join(f':id{i}' for i in range(len(ids))))
+            params = {f'id{i}': cid for i, cid in enumerate(ids)}
+        sql += " GROUP BY c.collection_id, i.content_type"
+        
+        features = {}
+        with self.engine.connect() as conn:
+            for cid, category, subcategory, is_public, content_type, count in conn.execute(text(sql), params):
+                entry = features.setdefault(cid, {
+                    'category': category,
+                    'subcategory': subcategory,
+                    'is_public': bool(is_public),
+                    'content_types': {}
+                })
+                if content_type is not None:
+                    entry['content_types'][content_type] = count
+        return features
+    
+    def search_collections(self, query, category=None, limit=20, scan_limit=SEARCH_SCAN_LIMIT):
+        """Koleksiyon adı/açıklaması ve içerik başlığı/açıklaması/notlarında tam metin ara"""
+        return self.get_collections_by_ids(self.search_collection_ids(query, category, limit, scan_limit))
+    
+    def search_collection_ids(self, query, category=None, limit=20, scan_limit=SEARCH_SCAN_LIMIT):
+        """Aramaya uyan herkese açık koleksiyonların id'lerini bm25 sırasıyla döndür
+        
+        Her kelime önek olarak eşleşir; bir koleksiyonun puanı kendisinin veya
+        içeriklerinden birinin en iyi bm25 puanıdır.
+        
+        Args:
+            scan_limit: Puanlanacak en fazla eşleşme. Görünürlük ve kategori
+                filtrelerinden sonra uygulanır; aşılırsa yalnızca en yeni eşleşmeler
+                puanlanır. None ise bütün eşleşmeler puanlanır.
+        """
+        match = self._build_match_query(query)
+        if not match:
+            return []
+        
+        # Sınır, çok yaygın kelime ve kısa öneklerde süreyi katalog büyüklüğünden
+        # bağımsız tutar. Filtreler iç sorguda olduğu için gizli veya başka
+        # kategorideki yeni kayıtlar sınırı doldurup sonuçları boşaltamaz.
+        sql = f"""
+            SELECT collection_id
+            FROM (
+                SELECT search_index.collection_id, {SEARCH_RANK} AS score
+                FROM search_index
+                JOIN collections ON collections.collection_id = search_index.collection_id
+                WHERE search_index MATCH :match AND collections.is_public = 1
+        """
+        params = {'match': match, 'scan_limit': -1 if scan_limit is None else scan_limit, 'limit': limit}
+        if category:
+            sql += " AND collections.category = :category"
+            params['category'] = category
+        # LIMIT alt sorgunun düzleştirilmesini de engeller; bm25 toplama içinde çağrılamaz
+        sql += """
+                ORDER BY search_index.rowid DESC
+                LIMIT :scan_limit
+            )
+            GROUP BY collection_id
+            ORDER BY MIN(score)
+            LIMIT :limit
+        """
+        
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(text(sql), params)]
+    
+    def get_precomputed_suggestions(self, user_id, limit=10):
+        """Toplu işin hesapladığı önerileri oku; henüz hesaplanmamışsa anlık hesapla"""
+        ids = self.materialized.suggestion_ids(user_id, limit)
+        if ids:
+            return self.get_collections_by_ids(ids)
+        return self.get_collection_suggestions(user_id, limit)
+    
+    def get_collection_suggestions(self, user_id, limit=10, score=None):
+        """Takip edilen kategorilerden, henüz takip edilmeyen en yüksek skorlu koleksiyonlar"""
+        return self.get_collections_by_ids(self.get_collection_suggestion_ids(user_id, limit, score))
+    
+    def get_collection_suggestion_ids(self, user_id, limit=10, score=None):
+        """Öneri id'leri, sıralı"""
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(self._suggestion_query(user_id, limit, score))]
+    
+    def _suggestion_query(self, user_id, limit=10, score=None):
+        """Önerileri hesaplayan tek SELECT ifadesi
+        
+        Kullanıcının takip ettiği herkese açık koleksiyonların her kategorisinden
+        limit // kategori sayısı kadar koleksiyon, skora göre azalan sırada döner.
+        Takip edilenler NOT EXISTS ile dışarıda bırakılır; takip listesinin
+        uzunluğu sorgu metnini büyütmez. Pencereye kategori başına en fazla limit
+        aday girer; varsayılan skorda adaylar kategori indeksinden sırayla okunur
+        ve kategorinin geri kalanı taranmaz.
+        
+        Args:
+            score: collections tablosunu (veya takma adını) alıp skor ifadesi
+                döndüren fonksiyon; verilmezse self.suggestion_score kullanılır
+        """
+        collections = Base.metadata.tables['collections']
+        followers = Base.metadata.tables['collection_followers']
+        score = score or self.suggestion_score
+        
+        categories = select(collections.c.category).distinct().join(
+            followers, followers.c.collection_id == collections.c.collection_id
+        ).where(
+            followers.c.follower_id == user_id,
+            collections.c.is_public == True
+        ).cte('followed_categories')
+        
+        # Her kategorinin takip edilmeyen en yüksek skorlu limit koleksiyonu
+        candidate = collections.alias('candidate')
+        top_in_category = select(candidate.c.collection_id).where(
+            candidate.c.category == categories.c.category,
+            candidate.c.is_public == True,
+            ~exists().where(
+                followers.c.collection_id == candidate.c.collection_id,
+                followers.c.follower_id == user_id
+            )
+        ).order_by(score(candidate).desc(), candidate.c.collection_id).limit(limit)
+        
+        ranked = select(
+            collections.c.collection_id,
+            collections.c.category,
+            func.row_number().over(
+                partition_by=collections.c.category,
+                order_by=(score(collections).desc(), collections.c.collection_id)
+            ).label('position')
+        ).select_from(
+            categories.join(collections, collections.c.collection_id.in_(top_in_category))
+        ).subquery('ranked')
+        
+        # Kategori başına pay limit // kategori sayısı: sıra * kategori sayısı <= limit
+        category_count = select(func.count()).select_from(categories).scalar_subquery()
+        return select(ranked.c.collection_id).where(
+            ranked.c.position * category_count <= limit
+        ).order_by(ranked.c.category, ranked.c.position).limit(limit)
+
@@ -0,0 +1,85 @@
+import sqlite3
+from sqlalchemy import create_engine, event
+
+# Tüm SQLite veritabanlarında kullanılan ortak ayarlar
+SQLITE_PRAGMAS = {
+    # Okuyucular yazarı, yazar okuyucuları beklemez
+    'journal_mode': 'WAL',
+    # WAL ile güvenli; her commit'te değil yalnızca checkpoint'te fsync yapılır
+    'synchronous': 'NORMAL',
+    # Okumalar read() yerine bellek eşlemesi üzerinden yapılır (256 MB)
+    'mmap_size': 256 * 1024 * 1024,
+    # Negatif değer KiB cinsindendir (64 MB sayfa önbelleği)
+    'cache_size': -64000,
+    # Kilitli veritabanında hemen hata vermek yerine bekle (ms)
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY'
+}
+
+
+# Türkçe büyük/küçük harf katlaması: İ, I ve ı aramada 'i' ile eşleşir.
+# Diğer aksanlar (ş, ğ, ç, ö, ü) FTS5 unicode61 ayrıştırıcısında remove_diacritics ile katlanır.
+_TR_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def tr_fold(value):
+    """Metni Türkçe kurallarına uygun şekilde küçük harfe katla"""
+    if value is None:
+        return None
+    return str(value).translate(_TR_FOLD).lower()
+
+
+def register_sqlite_functions(connection):
+    """Tetikleyici ve sorgularda kullanılan SQL fonksiyonlarını kaydet"""
+    connection.create_function('tr_fold', 1, tr_fold, deterministic=True)
+
+
+def apply_sqlite_pragmas(connection, pragmas=None):
+    """DB-API bağlantısına pragmaları uygula"""
+    cursor = connection.cursor()
+    try:
+        for name, value in (pragmas or SQLITE_PRAGMAS).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def connect_sqlite(db_path, pragmas=None, **kwargs):
+    """Ayarlanmış bir sqlite3 bağlantısı aç (SQLAlchemy kullanmayan modüller için)"""
+    kwargs.setdefault('check_same_thread', False)
+    conn = sqlite3.connect(str(db_path), **kwargs)
+    apply_sqlite_pragmas(conn, pragmas)
+    register_sqlite_functions(conn)
+    return conn
+
+
+def create_sqlite_engine(db_path, pragmas=None, pool_size=5, max_overflow=10, **kwargs):
+    """Bağlantı havuzlu, her bağlantıda pragmaları ve SQL fonksiyonlarını kuran SQLAlchemy motoru oluştur
+
+    Bağlantılar iş parçacıkları arasında el değiştirebildiği için check_same_thread kapalıdır.
+    """
+    engine = create_engine(
+        f'sqlite:///{db_path}',
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={'check_same_thread': False},
+        **kwargs
+    )
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        register_sqlite_functions(dbapi_connection)
+
+    return engine
+
+
+def create_missing_indexes(connection, metadata):
+    """Var olan tablolara modellerde tanımlı ama veritabanında olmayan indeksleri ekle
+
+    create_all yalnızca yeni tabloların indekslerini oluşturduğu için eski
+    veritabanlarında bu fonksiyon çağrılmalıdır.
+    """
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
@@ -378,6 +378,7 @@ class DigiCollectApp(MDApp):
         self.sm.add_widget(LoginScreen(name='login'))
         self.sm.add_widget(RegisterScreen(name='register'))
         self.sm.add_widget(HomeScreen(name='home'))
+        self.sm.add_widget(CollectionScreen(name='collection'))
         self.sm.add_widget(ProfileScreen(name='profile'))
         self.sm.add_widget(ContentCollectorScreen(name='content_collector'))
         self.sm.add_widget(CollectionManagerScreen(name='collection_manager'))
@@ -1354,7 +1355,7 @@ class DigiCollectApp(MDApp):
     
     def filter_collections(self, category_id=None, subcategory=None):
         """Koleksiyonları kategoriye göre filtrele"""
-        collections = self.db.get_trending_collections()
+        collections = self.database.get_trending_collections()
         trending_collections = self.root.get_screen('discovery').ids.trending_collections
         trending_collections.clear_widgets()
         
@@ -1382,8 +1383,35 @@ class DigiCollectApp(MDApp):
                 ))
                 
                 card.add_widget(box)
+                card.bind(on_release=lambda x, cid=collection.collection_id: self.show_collection(cid))
                 trending_collections.add_widget(card)
 
+    def show_collection(self, collection_id):
+        """Koleksiyon detay ekranını göster ve görüntülemeyi trend skorlarına işle"""
+        try:
+            collection = self.database.get_collection_by_id(collection_id)
+            if not collection:
+                raise ValueError("Koleksiyon bulunamadı")
+            
+            screen = self.sm.get_screen('collection')
+            screen.current_collection_id = collection_id
+            screen.ids.collection_name.text = collection.name
+            screen.ids.collection_description.text = collection.description or ''
+            screen.ids.collection_category.text = collection.category or ''
+            screen.ids.collection_stats.text = (
+                f"{collection.item_count or 0} içerik · {collection.followers_count or 0} takipçi"
+            )
+            self.sm.current = 'collection'
+        except Exception as e:
+            self.show_error_dialog(str(e))
+            return
+        
+        # Trend kaydı ekranın açılmasını engellemez
+        try:
+            self.database.record_collection_view(collection_id)
+        except Exception as e:
+            logger.warning(f'Koleksiyon görüntülemesi kaydedilemedi: {e}')
+
     def go_to_discovery(self, *args):
         self.sm.current = 'discovery'
 
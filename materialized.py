@@ -0,0 +1,116 @@
+import time
+from sqlalchemy import text
+
+# Toplu iş tarafından doldurulan öneri tabloları. Ekranlar birincil anahtar
+# öneki üzerinden tek bir indeksli okuma yapar.
+MATERIALIZED_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS similar_collections_mv (
+        collection_id INTEGER NOT NULL,
+        rank INTEGER NOT NULL,
+        similar_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (collection_id, rank)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_suggestions_mv (
+        user_id INTEGER NOT NULL,
+        rank INTEGER NOT NULL,
+        collection_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (user_id, rank)
+    ) WITHOUT ROWID
+    """,
+    # Her satırın hesaplandığı girdilerin özeti; değişmeyen satırlar yeniden hesaplanmaz
+    """
+    CREATE TABLE IF NOT EXISTS recommendation_fingerprints (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        computed_at REAL NOT NULL,
+        PRIMARY KEY (kind, key)
+    ) WITHOUT ROWID
+    """
+]
+
+# Materyalize tablo -> (anahtar sütunu, değer sütunu)
+_TABLES = {
+    'similar_collections_mv': ('collection_id', 'similar_id'),
+    'user_suggestions_mv': ('user_id', 'collection_id')
+}
+
+
+class MaterializedRecommendations:
+    """Önceden hesaplanmış benzer koleksiyon ve kullanıcı önerisi tabloları"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        with self.engine.begin() as conn:
+            for statement in MATERIALIZED_DDL:
+                conn.execute(text(statement))
+
+    def _read(self, table, key, limit):
+        key_column, value_column = _TABLES[table]
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(text(f"""
+                SELECT {value_column} FROM {table}
+                WHERE {key_column} = :key ORDER BY rank LIMIT :limit
+            """), {'key': key, 'limit': limit})]
+
+    def similar_ids(self, collection_id, limit=10):
+        """Koleksiyona en benzer koleksiyonların id'leri (hesaplanmamışsa boş liste)"""
+        return self._read('similar_collections_mv', collection_id, limit)
+
+    def suggestion_ids(self, user_id, limit=10):
+        """Kullanıcıya önerilen koleksiyonların id'leri (hesaplanmamışsa boş liste)"""
+        return self._read('user_suggestions_mv', user_id, limit)
+
+    def fingerprints(self, kind):
+        """Bir satır türünün kayıtlı girdi özetleri: {anahtar: özet}"""
+        with self.engine.connect() as conn:
+            return dict(conn.execute(
+                text("SELECT key, fingerprint FROM recommendation_fingerprints WHERE kind = :kind"),
+                {'kind': kind}
+            ).fetchall())
+
+    def write(self, table, kind, results, fingerprints, removed=()):
+        """Hesaplanan satırları ve özetlerini tek işlemde yaz
+
+        Args:
+            table: similar_collections_mv veya user_suggestions_mv
+            kind: Özet tablosundaki satır türü
+            results: {anahtar: [(id, skor), ...]} sıralı sonuçlar
+            fingerprints: {anahtar: özet}
+            removed: Artık hesaplanmayacak anahtarlar
+        """
+        key_column, value_column = _TABLES[table]
+        now = time.time()
+        with self.engine.begin() as conn:
+            keys = [{'key': key} for key in list(results) + list(removed)]
+            if keys:
+                conn.execute(text(f"DELETE FROM {table} WHERE {key_column} = :key"), keys)
+            rows = [
+                {'key': key, 'rank': rank, 'value': value, 'score': score}
+                for key, ranked in results.items()
+                for rank, (value, score) in enumerate(ranked)
+            ]
+            if rows:
+                conn.execute(text(f"""
+                    INSERT INTO {table} ({key_column}, rank, {value_column}, score)
+                    VALUES (:key, :rank, :value, :score)
+                """), rows)
+
+            if fingerprints:
+                conn.execute(text("""
+                    INSERT OR REPLACE INTO recommendation_fingerprints (kind, key, fingerprint, computed_at)
+                    VALUES (:kind, :key, :fingerprint, :now)
+                """), [
+                    {'kind': kind, 'key': str(key), 'fingerprint': fingerprint, 'now': now}
+                    for key, fingerprint in fingerprints.items()
+                ])
+            if removed:
+                conn.execute(
+                    text("DELETE FROM recommendation_fingerprints WHERE kind = :kind AND key = :key"),
+                    [{'kind': kind, 'key': str(key)} for key in removed]
+                )
@@ -1,6 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Index, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, backref
 from datetime import datetime
 from enum import Enum
 from dataclasses import dataclass, field
@@ -131,6 +131,15 @@ class User(Base):
 
 class Collection(Base):
     __tablename__ = 'collections'
+    __table_args__ = (
+        # Kullanıcının koleksiyonları (sayısı ve created_at, id sırasıyla sayfalı listesi)
+        Index('ix_collections_user_created', 'user_id', 'created_at', 'collection_id'),
+        # Trend listesi: is_public = 1 ORDER BY followers_count DESC
+        Index('ix_collections_public_followers', 'is_public', 'followers_count'),
+        # Kategori araması ve öneriler: category = ? AND is_public = 1 ORDER BY followers_count DESC.
+        # Azalan sıralı olduğu için öneri sorgusundaki ROW_NUMBER penceresi ek sıralama yapmaz
+        Index('ix_collections_category_public_followers_desc', 'category', 'is_public', text('followers_count DESC')),
+    )
     
     collection_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.user_id'))
@@ -150,6 +159,12 @@ class Collection(Base):
 
 class CollectionItem(Base):
     __tablename__ = 'collection_items'
+    __table_args__ = (
+        # Koleksiyon içerikleri (created_at, item_id sırasıyla sayfalı) ve kullanıcı filtresi
+        Index('ix_collection_items_collection_created', 'collection_id', 'created_at', 'item_id'),
+        Index('ix_collection_items_collection_user', 'collection_id', 'user_id'),
+        Index('ix_collection_items_user_id', 'user_id'),
+    )
     
     item_id = Column(Integer, primary_key=True)
     collection_id = Column(Integer, ForeignKey('collections.collection_id'))
@@ -167,6 +182,12 @@ class CollectionItem(Base):
 
 class CollectionFollower(Base):
     __tablename__ = 'collection_followers'
+    __table_args__ = (
+        # Bir kullanıcı bir koleksiyonu yalnızca bir kez takip edebilir
+        Index('ux_collection_followers_pair', 'collection_id', 'follower_id', unique=True),
+        # Kullanıcının takip ettiği koleksiyonlar, takip zamanına göre sayfalı
+        Index('ix_collection_followers_follower_created', 'follower_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     collection_id = Column(Integer, ForeignKey('collections.collection_id'))
@@ -182,9 +203,7 @@ class Category(Base):
     name = Column(String, nullable=False)
     parent_id = Column(Integer, ForeignKey('categories.category_id'))
     
-    subcategories = relationship("Category", 
-                               backref=ForeignKey("categories.parent_id"),
-                               remote_side=[category_id])
+    subcategories = relationship("Category", backref=backref("parent", remote_side=[category_id]))
 
 @dataclass
 class CollectionTheme:
@@ -195,7 +214,7 @@ class CollectionTheme:
     layout_type: str = "grid"  # grid, list, masonry
 
 @dataclass
-class Collection:
+class CollectionData:
     collection_id: str
     user_id: str
     name: str
@@ -250,7 +269,7 @@ class Collection:
         }
 
 @dataclass
-class CollectionItem:
+class CollectionItemData:
     id: str
     collection_id: str
     user_id: str
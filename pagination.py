@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+# Sayfa başına varsayılan kayıt sayısı
+DEFAULT_PAGE_SIZE = 20
+
+
+def encode_cursor(values):
+    """Sıralama anahtarı değerlerini opak bir imlece çevir"""
+    payload = [{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """encode_cursor ile üretilmiş imleci çöz; bozuk imleçte ValueError fırlatır"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v['dt']) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Geçersiz sayfa imleci')
+
+
+def paginate(query, sort_columns, cursor=None, limit=DEFAULT_PAGE_SIZE, key=None):
+    """Sorguyu anahtar kümesi (keyset) yöntemiyle sayfala
+
+    Kayıtlar sort_columns'a göre azalan sırada döner; son sütun benzersiz olmalıdır
+    (ör. created_at, id). OFFSET kullanılmadığı için her sayfa, sıralamaya uygun
+    bir indeks varsa tablo büyüklüğünden bağımsız sürede gelir.
+
+    Args:
+        query: SQLAlchemy ORM sorgusu
+        sort_columns: Sıralama sütunları
+        cursor: Önceki sayfanın döndürdüğü imleç, ilk sayfa için None
+        limit: Sayfadaki en fazla kayıt
+        key: Satırdan sıralama değerlerini döndüren fonksiyon; verilmezse
+            sütun adlarıyla satırın özniteliklerinden okunur
+
+    Returns:
+        (satırlar, sonraki_imleç) - son sayfada sonraki_imleç None olur
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort_columns):
+            raise ValueError('Geçersiz sayfa imleci')
+        query = query.filter(tuple_(*sort_columns) < tuple_(*values))
+
+    rows = query.order_by(*[column.desc() for column in sort_columns]).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    if key is None:
+        key = lambda row: [getattr(row, column.key) for column in sort_columns]
+    return rows, encode_cursor(list(key(rows[-1])))
@@ -1,35 +1,418 @@
-from typing import List, Dict, Any
-from collections import Counter
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Tuple
+import threading
+import numpy as np
+from scipy import sparse
 from models import Collection, CollectionItem
 from database import Database
+from content_index import ContentLSHIndex, content_tokens
+
+class _FeatureBlocks(NamedTuple):
+    """Bir satır kümesinin türetilmiş seyrek matrisleri (sütunlar tüm sözlük üzerinden)"""
+    onehot: Any               # ağırlıklı kategori + alt kategori one-hot
+    onehot_transposed: Any
+    blocks: List[Any]         # blok başına varlık matrisi
+    transposed: List[Any]
+    counts: np.ndarray        # satır x blok özellik sayıları
+
+
+class CollectionFeatureIndex:
+    """Herkese açık koleksiyonların seyrek özellik matrisi
+    
+    Her satır bir koleksiyondur. Sütunlar dört bloktan oluşur: kategori one-hot,
+    (kategori, alt kategori) one-hot, etiketler ve içerik türü histogramı. Benzerlik
+    tek bir seyrek matris çarpımıyla tüm koleksiyonlar için aynı anda hesaplanır:
+    
+        0.4 * aynı kategori + 0.2 * aynı alt kategori
+        + 0.2 * ortak etiket / max(etiket sayısı)
+        + 0.2 * ortak içerik türü / max(içerik türü sayısı)
+    
+    Matrisler iki katmanlıdır: son yeniden kurulumdaki taban ve o zamandan beri
+    değişen satırların küçük delta katmanı. Bir güncelleme sonrasındaki sorgu
+    yalnızca delta satırlarını (d satır, satır başına f özellik: O(d·f)) yeniden
+    türetir; tabandaki eski kopyaları skorlamada maskelenir. Delta
+    max(DELTA_MIN_ROWS, DELTA_RATIO * satır sayısı) eşiğini aşınca taban O(nnz)
+    maliyetle yeniden kurulur ve silinen satırlar sıkıştırılır; böylece güncelleme
+    başına amortize maliyet O(f / DELTA_RATIO) olur ve silinen satırlar bellekte
+    eşiğin ötesinde birikmez.
+    """
+    CATEGORY, SUBCATEGORY, TAG, CONTENT_TYPE = range(4)
+    WEIGHTS = np.array([0.4, 0.2, 0.2, 0.2])
+    # Taban yeniden kurulmadan delta katmanında tutulabilecek değişen satır sayısı
+    DELTA_MIN_ROWS = 256
+    DELTA_RATIO = 0.05
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns = {}           # (blok, değer) -> sütun
+        self._column_blocks = []     # sütun -> blok
+        self._rows = {}              # collection_id -> satır
+        self._ids = []               # satır -> collection_id, silinen satırlarda None
+        self._features = []          # satır -> sütun listesi, silinen satırlarda None
+        self._dirty = set()          # son yeniden kurulumdan beri değişen satırlar
+        self._pending = set()        # son sorgudan beri değişen satırlar
+        self._base = self._derive([])
+        self._base_rows = 0
+        self._delta = self._base
+        self._delta_rows = np.zeros(0, dtype=np.int64)   # delta satırı -> satır
+        self._delta_index = np.zeros(0, dtype=np.int64)  # satır -> delta satırı, yoksa -1
+        self._active = np.zeros(0, dtype=bool)
+        self._id_keys = np.zeros(0)
+    
+    def __len__(self):
+        return len(self._rows)
+    
+    def __contains__(self, collection_id):
+        return collection_id in self._rows
+    
+    def _column(self, block, value):
+        key = (block, value)
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = len(self._column_blocks)
+            self._column_blocks.append(block)
+        return column
+    
+    def update(self, collection_id, category, subcategory=None, tags: Iterable[str] = (),
+               content_types: Optional[Dict[str, int]] = None):
+        """Koleksiyonun satırını ekle veya yenile"""
+        with self._lock:
+            features = {
+                self._column(self.CATEGORY, category),
+                self._column(self.SUBCATEGORY, (category, subcategory))
+            }
+            for tag in set(tags or ()):
+                features.add(self._column(self.TAG, tag))
+            for content_type, count in (content_types or {}).items():
+                if count > 0:
+                    features.add(self._column(self.CONTENT_TYPE, content_type))
+            
+            row = self._rows.get(collection_id)
+            if row is None:
+                row = self._rows[collection_id] = len(self._ids)
+                self._ids.append(collection_id)
+                self._features.append(None)
+            self._features[row] = sorted(features)
+            self._dirty.add(row)
+            self._pending.add(row)
+    
+    def remove(self, collection_id):
+        """Koleksiyonu indeksten çıkar (ör. silindi veya gizlendi)"""
+        with self._lock:
+            row = self._rows.pop(collection_id, None)
+            if row is not None:
+                self._ids[row] = None
+                self._features[row] = None
+                self._dirty.add(row)
+                self._pending.add(row)
+    
+    def _derive(self, features) -> _FeatureBlocks:
+        """Satırların sütun listelerinden blok matrislerini kur"""
+        n_cols = len(self._column_blocks)
+        indptr = np.zeros(len(features) + 1, dtype=np.int64)
+        np.cumsum([len(f) for f in features], out=indptr[1:])
+        indices = np.fromiter(
+            (column for f in features for column in f), dtype=np.int64, count=int(indptr[-1])
+        )
+        column_blocks = np.asarray(self._column_blocks, dtype=np.int64)[indices]
+        blocks = []
+        for block in range(4):
+            matrix = sparse.csr_matrix(
+                ((column_blocks == block).astype(np.float32), indices, indptr), shape=(len(features), n_cols)
+            )
+            matrix.eliminate_zeros()
+            blocks.append(matrix)
+        # Kategori ve alt kategori bloklarında ortak sütun eşitlik demektir; ağırlıklı
+        # one-hot matrisle çarpım iki bloğun skorunu tek seferde verir
+        return _FeatureBlocks(
+            onehot=(self.WEIGHTS[self.CATEGORY] * blocks[self.CATEGORY]
+                    + self.WEIGHTS[self.SUBCATEGORY] * blocks[self.SUBCATEGORY]).tocsr(),
+            onehot_transposed=(blocks[self.CATEGORY] + blocks[self.SUBCATEGORY]).T.tocsr(),
+            blocks=blocks,
+            transposed=[m.T.tocsr() for m in blocks],
+            counts=np.column_stack([np.diff(m.indptr) for m in blocks]).astype(np.float32)
+        )
+    
+    def _rebuild(self):
+        """Silinen satırları at, tabanı tüm satırlardan yeniden kur ve deltayı boşalt"""
+        live = [row for row, cid in enumerate(self._ids) if cid is not None]
+        self._ids = [self._ids[row] for row in live]
+        self._features = [self._features[row] for row in live]
+        self._rows = {cid: row for row, cid in enumerate(self._ids)}
+        self._base = self._derive(self._features)
+        self._base_rows = len(self._ids)
+        self._delta = self._derive([])
+        self._delta_rows = np.zeros(0, dtype=np.int64)
+        self._delta_index = np.full(len(self._ids), -1, dtype=np.int64)
+        self._active = np.ones(len(self._ids), dtype=bool)
+        # Eşit skorlarda sonuçların kararlı olması için collection_id sıralama anahtarı
+        self._id_keys = np.array(self._ids)
+        self._dirty.clear()
+        self._pending.clear()
+    
+    def _flush(self):
+        """Bekleyen satır değişikliklerini delta katmanına uygula (kilit altında çağrılır)"""
+        if not self._pending:
+            return
+        n_rows = len(self._ids)
+        if len(self._dirty) > max(self.DELTA_MIN_ROWS, self.DELTA_RATIO * n_rows):
+            self._rebuild()
+            return
+        
+        grow = n_rows - len(self._active)
+        if grow:
+            self._active = np.concatenate([self._active, np.zeros(grow, dtype=bool)])
+            self._id_keys = np.concatenate([self._id_keys, np.zeros(grow, dtype=self._id_keys.dtype)])
+            self._delta_index = np.concatenate([self._delta_index, np.full(grow, -1, dtype=np.int64)])
+        for row in self._pending:
+            cid = self._ids[row]
+            self._active[row] = cid is not None
+            if cid is not None:
+                self._id_keys[row] = cid
+        self._pending.clear()
+        
+        live = sorted(row for row in self._dirty if self._ids[row] is not None)
+        self._delta_index[self._delta_rows] = -1
+        self._delta_rows = np.array(live, dtype=np.int64)
+        self._delta_index[self._delta_rows] = np.arange(len(live))
+        self._delta = self._derive([self._features[row] for row in live])
+    
+    def _pair_scores(self, query: _FeatureBlocks, target: _FeatureBlocks):
+        """Sorgu satırlarının hedef satırlarla skorları: (sorgu x hedef) seyrek CSR matris
+        
+        Yalnızca en az bir ortak özelliği olan çiftler hesaplanır.
+        """
+        n_cols = target.onehot_transposed.shape[0]
+        
+        def fit(matrix):
+            # Tabandan sonra eklenen sütunlar tabanda eşleşemez; sütun sayısını hedefe uydur
+            if matrix.shape[1] > n_cols:
+                return matrix[:, :n_cols]
+            return sparse.csr_matrix((matrix.data, matrix.indices, matrix.indptr), shape=(matrix.shape[0], n_cols))
+        
+        total = fit(query.onehot).dot(target.onehot_transposed)
+        for block in (self.TAG, self.CONTENT_TYPE):
+            overlap = fit(query.blocks[block]).dot(target.transposed[block])
+            if not overlap.nnz:
+                continue
+            # Ortak özellik sayısı iki kümeden büyüğüne bölünür
+            query_rows = np.repeat(np.arange(overlap.shape[0]), np.diff(overlap.indptr))
+            overlap.data = self.WEIGHTS[block] * overlap.data / np.maximum(
+                query.counts[query_rows, block],
+                target.counts[overlap.indices, block]
+            )
+            total = total + overlap
+        return total.tocsr()
+    
+    def _scores_all(self, query: _FeatureBlocks):
+        """Sorgu satırlarının taban ve delta katmanlarındaki tüm satırlarla skorları"""
+        n_queries, n_rows = query.onehot.shape[0], len(self._ids)
+        base = self._pair_scores(query, self._base)
+        # Deltada yenisi olan taban satırlarının eski kopyası skorlanmaz
+        data = np.where(self._delta_index[base.indices] >= 0, 0, base.data)
+        scores = sparse.csr_matrix((data, base.indices, base.indptr), shape=(n_queries, n_rows))
+        if len(self._delta_rows):
+            delta = self._pair_scores(query, self._delta)
+            scores = scores + sparse.csr_matrix(
+                (delta.data, self._delta_rows[delta.indices], delta.indptr), shape=(n_queries, n_rows)
+            )
+        return scores.tocsr()
+    
+    def _scores(self, rows):
+        """Satırların tüm satırlarla benzerlik skorları: (len(rows) x satır sayısı) seyrek CSR matris
+        
+        Kilit altında, _flush sonrası çağrılır. Değişmemiş satırların sorgu vektörü
+        tabandan, değişenlerinki deltadan alınır.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        in_delta = self._delta_index[rows] >= 0
+        parts, order = [], []
+        for layer, positions, selected in (
+            (self._base, np.flatnonzero(~in_delta), rows[~in_delta]),
+            (self._delta, np.flatnonzero(in_delta), self._delta_index[rows[in_delta]])
+        ):
+            if len(positions):
+                parts.append(self._scores_all(_FeatureBlocks(
+                    onehot=layer.onehot[selected],
+                    onehot_transposed=None,
+                    blocks=[m[selected] for m in layer.blocks],
+                    transposed=None,
+                    counts=layer.counts[selected]
+                )))
+                order.append(positions)
+        scores = sparse.vstack(parts).tocsr()
+        return scores[np.argsort(np.concatenate(order))]
+    
+    def _select(self, scores, i, row, k):
+        """Skor matrisinin i. satırından en yüksek k koleksiyonu (collection_id, skor) olarak seç"""
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        candidates, values = scores.indices[start:end], scores.data[start:end]
+        keep = (values > 0) & self._active[candidates] & (candidates != row)
+        candidates, values = candidates[keep], values[keep]
+        if len(candidates) > k:
+            kth = np.partition(values, -k)[-k]
+            keep = values >= kth
+            candidates, values = candidates[keep], values[keep]
+        order = np.lexsort((self._id_keys[candidates], -values))[:k]
+        return [(self._ids[candidates[i]], float(values[i])) for i in order]
+    
+    def similarities(self, collection_id) -> Dict[Any, float]:
+        """Koleksiyonun benzerliği sıfırdan büyük olan tüm koleksiyonlarla skorları"""
+        with self._lock:
+            self._flush()
+            row = self._rows.get(collection_id)
+            if row is None:
+                return {}
+            scores = self._scores([row])
+            return dict(self._select(scores, 0, row, len(self._ids)))
+    
+    def top_k(self, collection_id, k: int = 5) -> List[Tuple[Any, float]]:
+        """En benzer k koleksiyonu (collection_id, skor) olarak azalan skorla döndür"""
+        return self.top_k_many([collection_id], k).get(collection_id, [])
+    
+    def top_k_many(self, collection_ids, k: int = 5) -> Dict[Any, List[Tuple[Any, float]]]:
+        """Birden çok koleksiyon için top_k; skorlar tek matris çarpımıyla hesaplanır"""
+        with self._lock:
+            self._flush()
+            found = [(cid, self._rows[cid]) for cid in collection_ids if cid in self._rows]
+            if not found or k <= 0:
+                return {cid: [] for cid, _ in found}
+            
+            scores = self._scores([row for _, row in found])
+            return {cid: self._select(scores, i, row, k) for i, (cid, row) in enumerate(found)}
 
 class RecommendationEngine:
-    def __init__(self, db: Database):
+    # LSH adaylarından kesin skorla yeniden sıralanacak kat sayısı
+    CONTENT_CANDIDATE_FACTOR = 4
+
+    def __init__(self, db: Database, content_index_path=None):
         self.db = db
+        self.collection_features = CollectionFeatureIndex()
+        self._features_loaded = False
+        self._features_lock = threading.Lock()
+        self._content_index_path = content_index_path
+        self._content_index = None
+        self._content_index_lock = threading.Lock()
+        # Eklenen/silinen içerikler ve oluşturulan/güncellenen koleksiyonlar
+        # indekslere ve koleksiyon özelliklerine yansır
+        db.item_listeners.append(self._on_item_changed)
+        db.collection_listeners.append(self._on_collection_changed)
+
+    @property
+    def content_index(self) -> ContentLSHIndex:
+        """Kalıcı içerik indeksi; ilk kullanımda veritabanıyla eşitlenir"""
+        if self._content_index is None:
+            with self._content_index_lock:
+                if self._content_index is None:
+                    index = ContentLSHIndex(self._content_index_path)
+                    self._sync_content_index(index)
+                    self._content_index = index
+        return self._content_index
+
+    # Eşitlemede tek sorguda okunacak içerik sayısı (SQLite parametre sınırı)
+    SYNC_CHUNK_SIZE = 500
+
+    def _sync_content_index(self, index: ContentLSHIndex):
+        """İndeksi herkese açık içeriklerle eşitle
+        
+        İndeks bu motor kapalıyken değişen veritabanından geri kalmış olabilir:
+        eksik içerikler eklenir, silinen veya gizlenen içerikler çıkarılır.
+        """
+        indexed = index.item_ids()
+        if not indexed:
+            index.add_many(
+                (item.item_id, item.content_type, self._item_tokens(item))
+                for item in self.db.get_all_public_items()
+            )
+            return
+
+        public = self.db.get_public_item_ids()
+        missing = sorted(public - indexed)
+        for start in range(0, len(missing), self.SYNC_CHUNK_SIZE):
+            index.add_many(
+                (item.item_id, item.content_type, self._item_tokens(item))
+                for item in self.db.get_items_by_ids(missing[start:start + self.SYNC_CHUNK_SIZE])
+            )
+        stale = indexed - public
+        if stale:
+            index.remove_many(stale)
+
+    def _on_item_changed(self, event, collection_id, item_id):
+        """Database yazma yollarından gelen içerik olaylarını indekse işle"""
+        if event == 'added':
+            items = self.db.get_items_by_ids([item_id], public_only=True)
+            if items:
+                self.index_item(items[0])
+        else:
+            self.unindex_item(item_id)
+        self.refresh_collection(collection_id)
+
+    def _on_collection_changed(self, event, collection_id):
+        """Koleksiyonun özellik satırını yenile; görünürlüğü değiştiyse içeriklerini de"""
+        self.refresh_collection(collection_id)
+        # İçerik indeksi henüz açılmadıysa açılışta zaten eşitlenir
+        if event != 'updated' or self._content_index is None:
+            return
+        features = self.db.get_collection_features([collection_id]).get(collection_id)
+        items = self.db.get_collection_items(collection_id)
+        if features and features['is_public']:
+            self.content_index.add_many(
+                (item.item_id, item.content_type, self._item_tokens(item)) for item in items
+            )
+        else:
+            self.content_index.remove_many([item.item_id for item in items])
+
+    def index_item(self, item: CollectionItem):
+        """Yeni veya değişen içeriği indekse yaz"""
+        self.content_index.add(item.item_id, item.content_type, self._item_tokens(item))
+
+    def unindex_item(self, item_id):
+        """Silinen veya gizlenen içeriği indeksten çıkar"""
+        self.content_index.remove(item_id)
+
+    def _ensure_collection_features(self):
+        """Özellik matrisini ilk kullanımda veritabanından tek sorguyla doldur"""
+        if self._features_loaded:
+            return
+        with self._features_lock:
+            if self._features_loaded:
+                return
+            for collection_id, features in self.db.get_collection_features().items():
+                self.collection_features.update(
+                    collection_id,
+                    features['category'],
+                    features['subcategory'],
+                    content_types=features['content_types']
+                )
+            self._features_loaded = True
+
+    def refresh_collection(self, collection_id, tags: Iterable[str] = ()):
+        """Koleksiyon veya içerikleri değiştiğinde yalnızca onun satırını yenile"""
+        if not self._features_loaded:
+            return
+        features = self.db.get_collection_features([collection_id]).get(collection_id)
+        if features and features['is_public']:
+            self.collection_features.update(
+                collection_id,
+                features['category'],
+                features['subcategory'],
+                tags=tags,
+                content_types=features['content_types']
+            )
+        else:
+            self.collection_features.remove(collection_id)
 
     def get_similar_collections(self, collection_id: str, limit: int = 5) -> List[Collection]:
         """Benzer koleksiyonları bul"""
         try:
-            # Mevcut koleksiyonun özelliklerini al
-            collection = self.db.get_collection_by_id(collection_id)
-            if not collection:
-                return []
-            
-            # Benzer koleksiyonları bul
-            similar_collections = []
-            all_collections = self.db.get_all_public_collections()
+            # Toplu işin hesapladığı liste varsa tek indeksli okuma yeterli
+            ids = self.db.materialized.similar_ids(collection_id, limit)
+            if ids:
+                return self.db.get_collections_by_ids(ids)
             
-            for other in all_collections:
-                if other.collection_id == collection_id:
-                    continue
-                
-                similarity_score = self._calculate_similarity(collection, other)
-                if similarity_score > 0:
-                    similar_collections.append((other, similarity_score))
-            
-            # En benzer koleksiyonları döndür
-            similar_collections.sort(key=lambda x: x[1], reverse=True)
-            return [c[0] for c in similar_collections[:limit]]
+            # Tüm koleksiyonlar tek bir vektörel işlemle puanlanır
+            self._ensure_collection_features()
+            similar = self.collection_features.top_k(collection_id, limit)
+            return self.db.get_collections_by_ids([cid for cid, _ in similar])
             
         except Exception as e:
             print(f"Benzer koleksiyon bulma hatası: {str(e)}")
@@ -38,22 +421,28 @@ class RecommendationEngine:
     def get_content_recommendations(self, item: CollectionItem, limit: int = 5) -> List[Dict[str, Any]]:
         """Benzer içerikleri öner"""
         try:
-            # İçeriğin türünü ve etiketlerini al
-            content_type = item.content_type
-            tags = item.tags
+            # Aynı türdeki adaylar LSH kovalarından gelir, tüm katalog taranmaz
+            candidates = self.content_index.query(
+                self._item_tokens(item),
+                content_type=item.content_type,
+                limit=limit * self.CONTENT_CANDIDATE_FACTOR,
+                exclude=item.item_id
+            )
             
-            # Benzer içerikleri bul
-            similar_items = []
-            all_items = self.db.get_all_public_items()
+            # Yalnızca hâlâ herkese açık olan adaylar önerilir; gizlenen veya
+            # silinenler indeksten de çıkarılır
+            candidate_ids = [item_id for item_id, _ in candidates]
+            others = self.db.get_items_by_ids(candidate_ids, public_only=True)
+            stale = set(candidate_ids) - {other.item_id for other in others}
+            if stale:
+                self.content_index.remove_many(stale)
             
-            for other in all_items:
-                if other.id == item.id:
-                    continue
-                
-                if other.content_type == content_type:
-                    similarity_score = self._calculate_content_similarity(item, other)
-                    if similarity_score > 0:
-                        similar_items.append((other, similarity_score))
+            # Adayları kesin benzerlik skoruyla yeniden sırala
+            similar_items = []
+            for other in others:
+                similarity_score = self._calculate_content_similarity(item, other)
+                if similarity_score > 0:
+                    similar_items.append((other, similarity_score))
             
             # En benzer içerikleri döndür
             similar_items.sort(key=lambda x: x[1], reverse=True)
@@ -66,51 +455,13 @@ class RecommendationEngine:
     def get_trending_collections(self, time_period: str = 'daily', limit: int = 10) -> List[Collection]:
         """Trend olan koleksiyonları getir"""
         try:
-            # Zaman periyoduna göre koleksiyonları filtrele
-            collections = self.db.get_trending_collections(time_period)
-            
-            # Popülerlik skorlarını hesapla
-            scored_collections = []
-            for collection in collections:
-                score = self._calculate_popularity_score(collection)
-                scored_collections.append((collection, score))
-            
-            # En popüler koleksiyonları döndür
-            scored_collections.sort(key=lambda x: x[1], reverse=True)
-            return [c[0] for c in scored_collections[:limit]]
+            # Skorlar olaylarla güncellenen sönümlü trend tablosundan okunur
+            return self.db.get_trending_collections(time_period, limit)
             
         except Exception as e:
             print(f"Trend koleksiyon getirme hatası: {str(e)}")
             return []
 
-    def _calculate_similarity(self, collection1: Collection, collection2: Collection) -> float:
-        """İki koleksiyon arasındaki benzerliği hesapla"""
-        score = 0.0
-        
-        # Kategori benzerliği
-        if collection1.category == collection2.category:
-            score += 0.4
-            if collection1.subcategory == collection2.subcategory:
-                score += 0.2
-        
-        # Etiket benzerliği
-        common_tags = set(collection1.tags) & set(collection2.tags)
-        if common_tags:
-            score += 0.2 * (len(common_tags) / max(len(collection1.tags), len(collection2.tags)))
-        
-        # İçerik türü benzerliği
-        items1 = self.db.get_collection_items(collection1.collection_id)
-        items2 = self.db.get_collection_items(collection2.collection_id)
-        
-        types1 = Counter(item.content_type for item in items1)
-        types2 = Counter(item.content_type for item in items2)
-        
-        common_types = set(types1.keys()) & set(types2.keys())
-        if common_types:
-            score += 0.2 * (len(common_types) / max(len(types1), len(types2)))
-        
-        return score
-
     def _calculate_content_similarity(self, item1: CollectionItem, item2: CollectionItem) -> float:
         """İki içerik arasındaki benzerliği hesapla"""
         score = 0.0
@@ -120,9 +471,10 @@ class RecommendationEngine:
             score += 0.4
         
         # Etiket benzerliği
-        common_tags = set(item1.tags) & set(item2.tags)
+        tags1, tags2 = getattr(item1, 'tags', None) or [], getattr(item2, 'tags', None) or []
+        common_tags = set(tags1) & set(tags2)
         if common_tags:
-            score += 0.4 * (len(common_tags) / max(len(item1.tags), len(item2.tags)))
+            score += 0.4 * (len(common_tags) / max(len(tags1), len(tags2)))
         
         # Kaynak benzerliği
         if self._get_domain(item1.source_url) == self._get_domain(item2.source_url):
@@ -130,34 +482,29 @@ class RecommendationEngine:
         
         return score
 
-    def _calculate_popularity_score(self, collection: Collection) -> float:
-        """Koleksiyonun popülerlik skorunu hesapla"""
-        score = 0.0
-        
-        # Takipçi sayısı
-        score += len(collection.followers) * 0.4
-        
-        # İçerik sayısı
-        score += collection.item_count * 0.3
-        
-        # Görüntülenme sayısı (bu özellik eklenecek)
-        # score += collection.views * 0.3
-        
-        return score
-
     def _prepare_recommendation(self, item: CollectionItem) -> Dict[str, Any]:
         """Önerilen içeriği hazırla"""
         collection = self.db.get_collection_by_id(item.collection_id)
         return {
-            'id': item.id,
+            'id': item.item_id,
             'title': item.title,
             'content_type': item.content_type,
             'source_url': item.source_url,
             'collection_name': collection.name if collection else '',
             'collection_id': collection.collection_id if collection else '',
-            'tags': item.tags
+            'tags': getattr(item, 'tags', None) or []
         }
 
+    @staticmethod
+    def _item_tokens(item: CollectionItem):
+        """İçeriğin LSH token kümesi"""
+        return content_tokens(
+            item.content_type,
+            item.source_url,
+            getattr(item, 'tags', None) or [],
+            getattr(item, 'title', None)
+        )
+
     @staticmethod
     def _get_domain(url: str) -> str:
         """URL'den alan adını çıkar"""
@@ -0,0 +1,293 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text
+from recommendation import CollectionFeatureIndex
+
+logger = logging.getLogger('DigiCollect.RecommendationJobs')
+
+# Koleksiyon başına saklanan benzer koleksiyon sayısı
+SIMILAR_TOP_N = 10
+# Kullanıcı başına saklanan öneri sayısı
+SUGGESTION_LIMIT = 10
+# Bu sayının altındaki işler süreç başlatma maliyetine değmez, aynı süreçte hesaplanır
+PARALLEL_MIN_ROWS = 500
+# İşçilere gönderilen parça boyutu
+CHUNK_SIZE = 256
+
+
+def _fingerprint(value):
+    """Girdi değerinin kararlı özeti"""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def suggest_for_user(followed, rankings, limit=SUGGESTION_LIMIT):
+    """Takip edilen her kategoriden takipçi sayısına göre eşit pay öner
+
+    Database.get_collection_suggestions ile aynı kuraldır.
+
+    Args:
+        followed: {collection_id: kategori} takip edilen herkese açık koleksiyonlar
+        rankings: {kategori: [(collection_id, takipçi sayısı), ...]} azalan sırada
+        limit: En fazla öneri
+    """
+    categories = sorted(set(followed.values()))
+    if not categories:
+        return []
+
+    quota = limit // len(categories)
+    suggestions = []
+    for category in categories:
+        taken = 0
+        for collection_id, followers_count in rankings.get(category, ()):
+            if taken >= quota:
+                break
+            if collection_id in followed:
+                continue
+            suggestions.append((collection_id, float(followers_count)))
+            taken += 1
+    return suggestions[:limit]
+
+
+# İşçi süreçlerin girdileri; initializer ile süreç başına bir kez kurulur
+_worker_state = {}
+
+
+def _init_worker(features, rankings):
+    index = CollectionFeatureIndex()
+    for collection_id, f in features.items():
+        index.update(collection_id, f['category'], f['subcategory'], content_types=f['content_types'])
+    _worker_state['index'] = index
+    _worker_state['rankings'] = rankings
+
+
+def _similar_chunk(collection_ids, top_n):
+    return _worker_state['index'].top_k_many(collection_ids, top_n)
+
+
+def _suggestion_chunk(users, limit):
+    rankings = _worker_state['rankings']
+    return {user_id: suggest_for_user(followed, rankings, limit) for user_id, followed in users}
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class RecommendationPrecomputer:
+    """Benzer koleksiyonları ve kullanıcı önerilerini toplu hesaplayıp materyalize tablolara yazar
+
+    Her çalıştırmada yalnızca girdileri değişen satırlar yeniden hesaplanır:
+    - Benzer koleksiyonlar: özellikleri değişen, yeni veya silinen bir koleksiyonu
+      listesinde barındıran ya da yeni skoru listesine girebilecek koleksiyonlar.
+    - Öneriler: takip listesi veya takip ettiği kategorilerin sıralaması değişen kullanıcılar.
+    Hesaplama süreç havuzunda çekirdeklere dağıtılır.
+    """
+
+    def __init__(self, db, workers=None, top_n=SIMILAR_TOP_N, suggestion_limit=SUGGESTION_LIMIT,
+                 parallel_min_rows=PARALLEL_MIN_ROWS):
+        self.db = db
+        self.workers = workers or os.cpu_count() or 1
+        self.top_n = top_n
+        self.suggestion_limit = suggestion_limit
+        self.parallel_min_rows = parallel_min_rows
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load_inputs(self):
+        """Özellikleri, kategori sıralamalarını ve takipleri birkaç toplu sorguda oku"""
+        features = self.db.get_collection_features()
+
+        rankings = {}
+        follows = {}
+        with self.db.engine.connect() as conn:
+            for collection_id, category, followers_count in conn.execute(text("""
+                SELECT collection_id, category, followers_count FROM collections
+                WHERE is_public = 1
+                ORDER BY category, followers_count DESC, collection_id
+            """)):
+                rankings.setdefault(category, []).append((collection_id, followers_count or 0))
+
+            for user_id, collection_id, category in conn.execute(text("""
+                SELECT f.follower_id, f.collection_id, c.category
+                FROM collection_followers AS f
+                JOIN collections AS c ON c.collection_id = f.collection_id
+                WHERE c.is_public = 1
+            """)):
+                follows.setdefault(user_id, {})[collection_id] = category
+        return features, rankings, follows
+
+    def _affected_collections(self, index, features):
+        """Yeniden hesaplanacak koleksiyonlar, yeni özet değerleri ve silinenler"""
+        stored = self.db.materialized.fingerprints('collection')
+        current = {
+            str(collection_id): _fingerprint([
+                f['category'], f['subcategory'], sorted(f['content_types'].items())
+            ])
+            for collection_id, f in features.items()
+        }
+        changed = {int(key) for key, fp in current.items() if stored.get(key) != fp}
+        removed = {int(key) for key in stored if key not in current}
+        if not stored:
+            return set(features), current, removed
+        if not changed and not removed:
+            return set(), {}, removed
+
+        # Mevcut listeler: değişen/silinen koleksiyonu içerenler ve listenin son skoru
+        affected = set(changed)
+        lists, last_scores = {}, {}
+        with self.db.engine.connect() as conn:
+            for collection_id, similar_id, score in conn.execute(text(
+                "SELECT collection_id, similar_id, score FROM similar_collections_mv ORDER BY collection_id, rank"
+            )):
+                lists.setdefault(collection_id, []).append(similar_id)
+                last_scores[collection_id] = score
+        touched = changed | removed
+        affected.update(cid for cid, similar in lists.items() if touched.intersection(similar))
+
+        # Değişen koleksiyonun yeni skoru listenin sonundakini geçiyorsa listeye girebilir
+        for collection_id in changed:
+            for other, score in index.similarities(collection_id).items():
+                full = len(lists.get(other, ())) >= self.top_n
+                if not full or score >= last_scores[other]:
+                    affected.add(other)
+
+        affected &= set(features)
+        return affected, {str(cid): current[str(cid)] for cid in changed}, removed
+
+    def _affected_users(self, rankings, follows):
+        """Girdileri değişen kullanıcılar, yeni özet değerleri ve artık önerisi olmayanlar"""
+        # Kategori sıralamasının bir kullanıcının sonucunu etkileyebilecek en derin kısmı
+        depths = {}
+        for followed in follows.values():
+            categories = set(followed.values())
+            quota = self.suggestion_limit // len(categories)
+            for category in categories:
+                in_category = sum(1 for c in followed.values() if c == category)
+                depths[category] = max(depths.get(category, 0), quota + in_category)
+        category_fps = {
+            category: _fingerprint(rankings.get(category, [])[:depth])
+            for category, depth in depths.items()
+        }
+
+        stored = self.db.materialized.fingerprints('user')
+        current = {
+            str(user_id): _fingerprint([
+                sorted(followed),
+                [category_fps[c] for c in sorted(set(followed.values()))],
+                self.suggestion_limit
+            ])
+            for user_id, followed in follows.items()
+        }
+        changed = {key: fp for key, fp in current.items() if stored.get(key) != fp}
+        removed = {int(key) for key in stored if key not in current}
+        return [int(key) for key in changed], changed, removed
+
+    def _compute(self, features, rankings, similar_ids, users):
+        """Satırları süreç havuzunda (küçük işlerde aynı süreçte) hesapla"""
+        similar_ids = sorted(similar_ids)
+        users = sorted(users, key=lambda u: u[0])
+        similar, suggestions = {}, {}
+
+        if self.workers <= 1 or len(similar_ids) + len(users) < self.parallel_min_rows:
+            _init_worker(features, rankings)
+            try:
+                for chunk in _chunks(similar_ids):
+                    similar.update(_similar_chunk(chunk, self.top_n))
+                for chunk in _chunks(users):
+                    suggestions.update(_suggestion_chunk(chunk, self.suggestion_limit))
+            finally:
+                _worker_state.clear()
+            return similar, suggestions
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(features, rankings)
+        ) as pool:
+            similar_futures = [pool.submit(_similar_chunk, chunk, self.top_n) for chunk in _chunks(similar_ids)]
+            suggestion_futures = [
+                pool.submit(_suggestion_chunk, chunk, self.suggestion_limit) for chunk in _chunks(users)
+            ]
+            for future in similar_futures:
+                similar.update(future.result())
+            for future in suggestion_futures:
+                suggestions.update(future.result())
+        return similar, suggestions
+
+    def run(self):
+        """Değişen satırları yeniden hesapla ve materyalize tablolara yaz"""
+        started = time.perf_counter()
+        try:
+            features, rankings, follows = self._load_inputs()
+
+            index = CollectionFeatureIndex()
+            for collection_id, f in features.items():
+                index.update(collection_id, f['category'], f['subcategory'], content_types=f['content_types'])
+
+            similar_ids, collection_fps, removed_collections = self._affected_collections(index, features)
+            user_ids, user_fps, removed_users = self._affected_users(rankings, follows)
+
+            similar, suggestions = self._compute(
+                features, rankings, similar_ids, [(user_id, follows[user_id]) for user_id in user_ids]
+            )
+
+            self.db.materialized.write(
+                'similar_collections_mv', 'collection', similar, collection_fps, removed_collections
+            )
+            self.db.materialized.write(
+                'user_suggestions_mv', 'user', suggestions, user_fps, removed_users
+            )
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f'Öneriler güncellendi: {len(similar)} koleksiyon, {len(suggestions)} kullanıcı, {elapsed:.2f} sn'
+            )
+            return {
+                'status': 'success',
+                'similar_rows': len(similar),
+                'suggestion_rows': len(suggestions),
+                'removed_collections': len(removed_collections),
+                'removed_users': len(removed_users),
+                'elapsed': elapsed
+            }
+
+        except Exception as e:
+            logger.exception(f'Öneri hesaplama hatası: {e}')
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+    def start(self, interval=3600):
+        """İşi arka planda belirli aralıklarla çalıştır"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                self.run()
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name='RecommendationPrecomputer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arka plan işini durdur"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+if __name__ == '__main__':
+    from database import Database
+
+    logging.basicConfig(level=logging.INFO)
+    db = Database(sys.argv[1] if len(sys.argv) > 1 else 'digicollect.db')
+    print(RecommendationPrecomputer(db).run())
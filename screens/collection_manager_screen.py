@@ -194,10 +194,23 @@ class CollectionManagerScreen(Screen):
     current_collection_id = NumericProperty(None)
     current_tab = StringProperty('my_collections')  # my_collections, public, following
     
+    # Kaydırdıkça getirilen sayfa boyutu
+    PAGE_SIZE = 20
+    # Liste sonuna bu oranda yaklaşıldığında sonraki sayfa istenir
+    LOAD_MORE_THRESHOLD = 0.1
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.collection_manager = CollectionManager()
         
+        # Sayfalama durumu; liste sıfırlandığında token artar ve eski sonuçlar yok sayılır
+        self._collections_cursor = None
+        self._collections_token = 0
+        self._collections_loading = False
+        self._items_cursor = None
+        self._items_token = 0
+        self._items_loading = False
+        
         # Koleksiyonları yükle
         self.load_collections()
     
@@ -207,34 +220,61 @@ class CollectionManagerScreen(Screen):
         self.load_collections()
     
     def load_collections(self):
-        """Koleksiyonları yükle"""
+        """Koleksiyon listesini sıfırla ve ilk sayfayı yükle"""
+        self._collections_token += 1
+        self._collections_cursor = None
+        self.ids.collections_container.clear_widgets()
+        self._load_collections_page()
+    
+    def load_more_collections(self):
+        """Varsa sonraki koleksiyon sayfasını yükle"""
+        if self._collections_loading or not self._collections_cursor:
+            return
+        self._load_collections_page()
+    
+    def on_collections_scroll(self, scroll_view):
+        """Liste sonuna yaklaşıldığında sonraki sayfayı getir"""
+        if scroll_view.scroll_y <= self.LOAD_MORE_THRESHOLD:
+            self.load_more_collections()
+    
+    def _load_collections_page(self):
         # Yükleniyor göstergesini başlat
+        self._collections_loading = True
         self.ids.loading_indicator.active = True
         
         # Arka planda koleksiyonları çek
-        threading.Thread(target=self._load_collections).start()
+        threading.Thread(
+            target=self._load_collections,
+            args=(self._collections_token, self.current_tab, self._collections_cursor)
+        ).start()
     
-    def _load_collections(self):
-        """Arka planda koleksiyonları çek"""
+    def _load_collections(self, token, tab, cursor):
+        """Arka planda bir sayfa koleksiyon çek"""
         app = App.get_running_app()
         
-        if self.current_tab == 'my_collections':
-            result = self.collection_manager.list_collections()
-        elif self.current_tab == 'public':
-            result = self.collection_manager.get_public_collections()
+        if tab == 'my_collections':
+            result = self.collection_manager.list_collections_page(cursor, self.PAGE_SIZE)
+        elif tab == 'public':
+            result = self.collection_manager.get_public_collections_page(cursor, self.PAGE_SIZE)
         else:  # following
-            result = self.collection_manager.get_followed_collections(app.current_user_id)
+            result = self.collection_manager.get_followed_collections_page(
+                app.current_user_id, cursor, self.PAGE_SIZE
+            )
         
         # Ana thread'de UI güncelleme
-        Clock.schedule_once(lambda dt: self._handle_collections_result(result))
+        Clock.schedule_once(lambda dt: self._handle_collections_result(result, token))
     
-    def _handle_collections_result(self, result):
-        """Koleksiyon sonucunu işle"""
+    def _handle_collections_result(self, result, token):
+        """Koleksiyon sayfasını listeye ekle"""
+        if token != self._collections_token:
+            # Sekme değişmiş veya liste yenilenmiş, eski sayfa
+            return
+        
+        self._collections_loading = False
         self.ids.loading_indicator.active = False
         
         if result['status'] == 'success':
-            # Koleksiyon container'ı temizle
-            self.ids.collections_container.clear_widgets()
+            self._collections_cursor = result.get('next_cursor')
             
             # Her koleksiyon için kart oluştur
             for collection in result['collections']:
@@ -263,6 +303,11 @@ class CollectionManagerScreen(Screen):
                 card = CollectionCard(card_data)
                 self.ids.collections_container.add_widget(card)
             
+            # İlk sayfa ekranı doldurmuyorsa kaydırma olmayacağı için hemen devam et
+            Clock.schedule_once(lambda dt: self._fill_viewport(
+                self.ids.collections_scroll, self.ids.collections_container, self.load_more_collections
+            ))
+            
         else:
             # Hata mesajını göster
             self.ids.error_label.text = f"Koleksiyonlar yüklenemedi: {result['error']}"
@@ -271,27 +316,50 @@ class CollectionManagerScreen(Screen):
     def show_collection(self, collection_id):
         """Koleksiyon detaylarını göster"""
         self.current_collection_id = collection_id
-        
+        self._items_token += 1
+        self._items_cursor = None
+        self.ids.items_container.clear_widgets()
+        self._load_items_page()
+    
+    def load_more_items(self):
+        """Varsa sonraki öğe sayfasını yükle"""
+        if self._items_loading or not self._items_cursor or not self.current_collection_id:
+            return
+        self._load_items_page()
+    
+    def on_items_scroll(self, scroll_view):
+        """Öğe listesinin sonuna yaklaşıldığında sonraki sayfayı getir"""
+        if scroll_view.scroll_y <= self.LOAD_MORE_THRESHOLD:
+            self.load_more_items()
+    
+    def _load_items_page(self):
         # Yükleniyor göstergesini başlat
+        self._items_loading = True
         self.ids.loading_indicator.active = True
         
         # Arka planda koleksiyon öğelerini çek
-        threading.Thread(target=self._load_collection_items, args=(collection_id,)).start()
+        threading.Thread(
+            target=self._load_collection_items,
+            args=(self.current_collection_id, self._items_token, self._items_cursor)
+        ).start()
     
-    def _load_collection_items(self, collection_id):
-        """Arka planda koleksiyon öğelerini çek"""
-        result = self.collection_manager.get_collection_items(collection_id)
+    def _load_collection_items(self, collection_id, token, cursor):
+        """Arka planda bir sayfa koleksiyon öğesi çek"""
+        result = self.collection_manager.get_collection_items_page(collection_id, cursor, self.PAGE_SIZE)
         
         # Ana thread'de UI güncelleme
-        Clock.schedule_once(lambda dt: self._handle_items_result(result))
+        Clock.schedule_once(lambda dt: self._handle_items_result(result, token))
     
-    def _handle_items_result(self, result):
-        """Öğe sonucunu işle"""
+    def _handle_items_result(self, result, token):
+        """Öğe sayfasını listeye ekle"""
+        if token != self._items_token:
+            return
+        
+        self._items_loading = False
         self.ids.loading_indicator.active = False
         
         if result['status'] == 'success':
-            # Öğe container'ı temizle
-            self.ids.items_container.clear_widgets()
+            self._items_cursor = result.get('next_cursor')
             
             # Her öğe için kart oluştur
             for item in result['items']:
@@ -301,11 +369,21 @@ class CollectionManagerScreen(Screen):
             # Koleksiyon görünümüne geç
             self.ids.screen_manager.current = 'collection_view'
             
+            Clock.schedule_once(lambda dt: self._fill_viewport(
+                self.ids.items_scroll, self.ids.items_container, self.load_more_items
+            ))
+            
         else:
             # Hata mesajını göster
             self.ids.error_label.text = f"Öğeler yüklenemedi: {result['error']}"
             self.ids.error_label.opacity = 1
     
+    @staticmethod
+    def _fill_viewport(scroll_view, container, load_more):
+        """İçerik kaydırma alanını doldurmuyorsa sonraki sayfayı iste"""
+        if container.height <= scroll_view.height:
+            load_more()
+    
     def show_create_collection_popup(self):
         """Koleksiyon oluşturma popup'ını göster"""
         popup = CreateCollectionPopup(
@@ -351,8 +429,8 @@ class CollectionManagerScreen(Screen):
             )
             
             if result['status'] == 'success':
-                # Öğeleri yeniden yükle
-                self._load_collection_items(self.current_collection_id)
+                # Öğeleri ilk sayfadan yeniden yükle
+                self.show_collection(self.current_collection_id)
             else:
                 # Hata mesajını göster
                 self.ids.error_label.text = f"Öğe kaldırılamadı: {result['error']}"
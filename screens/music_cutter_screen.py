@@ -1,12 +1,13 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.image import AsyncImage
 from kivy.properties import NumericProperty, StringProperty, ObjectProperty
 from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.animation import Animation
 
 from services.music_cutter import MusicCutter
+from services.waveform import zoom_range
+from widgets.waveform_view import WaveformView
 import threading
 import os
 
@@ -58,8 +59,8 @@ class MusicCutterScreen(Screen):
                 self.music_duration = music_info['duration']
                 self.end_time = music_info['duration']
             
-            # Dalga formunu oluştur
-            self._generate_waveform()
+            # Dalga formunu arka planda oluştur
+            threading.Thread(target=self._generate_waveform).start()
             
             # Müzik bilgilerini göster
             self.ids.music_title.text = result['title']
@@ -77,25 +78,34 @@ class MusicCutterScreen(Screen):
             self.ids.error_label.opacity = 1
     
     def _generate_waveform(self):
-        """Dalga formu görüntüsü oluştur"""
+        """Arka planda dalga formu tepe dizilerini oluştur"""
         if self.music_info:
-            result = self.music_cutter.generate_waveform(
-                self.music_info['file_path'],
-                width=int(self.width * 2),  # Retina display için 2x
-                height=400
-            )
+            file_path = self.music_info['file_path']
+            result = self.music_cutter.generate_waveform(file_path)
             
             if result['status'] == 'success':
-                self.waveform_path = result['waveform_path']
+                peaks = self.music_cutter.load_waveform(file_path)
+                Clock.schedule_once(lambda dt: self._handle_waveform_result(result, peaks))
+    
+    def _handle_waveform_result(self, result, peaks):
+        """Dalga formunu göster; boyut ve aralık değişimleri yalnızca dizilerden yeniden çizilir"""
+        self.waveform_path = result['peaks_path']
+        self.ids.waveform_view.peaks = peaks
     
     def update_time_selection(self, value):
         """Zaman seçimini güncelle"""
-        if isinstance(value, tuple):
-            self.start_time, self.end_time = value
-            
-            # Etiketleri güncelle
-            self.ids.start_time_label.text = self._format_time(self.start_time)
-            self.ids.end_time_label.text = self._format_time(self.end_time)
+        # RangeSlider.value tuple değil, iki elemanlı bir liste döndürür
+        self.start_time, self.end_time = value
+        
+        # Etiketleri güncelle
+        self.ids.start_time_label.text = self._format_time(self.start_time)
+        self.ids.end_time_label.text = self._format_time(self.end_time)
+        
+        # Dalga formunu seçime yakınlaştır; tepe dizileri yalnızca yeniden dilimlenir
+        waveform_view = self.ids.waveform_view
+        waveform_view.view_start, waveform_view.view_end = zoom_range(
+            self.start_time, self.end_time, self.music_duration
+        )
     
     def cut_music(self):
         """Seçili aralıkta müziği kes"""
@@ -1,7 +1,7 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.image import AsyncImage
-from kivy.properties import NumericProperty, StringProperty, ObjectProperty
+from kivy.properties import NumericProperty, StringProperty, ObjectProperty, BooleanProperty
 from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.animation import Animation
@@ -16,6 +16,8 @@ class VideoCutterScreen(Screen):
     start_time = NumericProperty(0)
     end_time = NumericProperty(0)
     thumbnail_path = StringProperty('')
+    # Bölüm modu: videonun tamamı yerine yalnızca seçili aralık indirilir
+    section_mode = BooleanProperty(True)
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -39,7 +41,11 @@ class VideoCutterScreen(Screen):
     
     def _download_video(self, url):
         """Arka planda video indirme"""
-        result = self.video_cutter.download_video(url)
+        if self.section_mode:
+            # Yalnızca bilgileri al, indirme kesme anında seçili aralık için yapılır
+            result = self.video_cutter.fetch_video_metadata(url)
+        else:
+            result = self.video_cutter.download_video(url)
         
         # Ana thread'de UI güncelleme
         Clock.schedule_once(lambda dt: self._handle_download_result(result))
@@ -86,7 +92,8 @@ class VideoCutterScreen(Screen):
     
     def _generate_preview(self):
         """Seçili zaman aralığından önizleme oluştur"""
-        if self.video_info:
+        # Bölüm modunda yerel dosya olmadığından uzak küçük resim gösterilmeye devam eder
+        if self.video_info and 'file_path' in self.video_info:
             # Ortadaki zamandan thumbnail oluştur
             preview_time = (self.start_time + self.end_time) / 2
             result = self.video_cutter.generate_thumbnail(
@@ -108,11 +115,19 @@ class VideoCutterScreen(Screen):
     
     def _cut_video(self):
         """Arka planda video kesme"""
-        result = self.video_cutter.cut_video(
-            self.video_info['file_path'],
-            self.start_time,
-            self.end_time
-        )
+        if 'file_path' in self.video_info:
+            result = self.video_cutter.cut_video(
+                self.video_info['file_path'],
+                self.start_time,
+                self.end_time
+            )
+        else:
+            # İndirilen kesit doğrudan sonuç dosyasıdır
+            result = self.video_cutter.download_section(
+                self.video_info['url'],
+                self.start_time,
+                self.end_time
+            )
         
         # Ana thread'de UI güncelleme
         Clock.schedule_once(lambda dt: self._handle_cut_result(result))
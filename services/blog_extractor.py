@@ -1,4 +1,3 @@
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import json
@@ -7,6 +6,7 @@ import re
 import html2text
 import readability
 from readability import Document
+from services.http_client import get_http_client
 
 class BlogExtractor:
     def __init__(self):
@@ -14,6 +14,7 @@ class BlogExtractor:
         self.h2t.ignore_links = False
         self.h2t.ignore_images = False
         self.h2t.ignore_emphasis = False
+        self.http = get_http_client()
         
         # Desteklenen platformlar
         self.PLATFORMS = {
@@ -27,10 +28,7 @@ class BlogExtractor:
         """URL'den blog içeriğini çek ve işle"""
         try:
             # Sayfa içeriğini al
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url)
             response.raise_for_status()
             
             # Platform'a özel çıkarıcıyı kullan veya genel çıkarıcıya geç
@@ -1,12 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, JSON, ForeignKey, Table, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Table, Boolean, Enum, Index, select, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, column_property, joinedload, undefer
 from datetime import datetime
 import json
 import os
 from pathlib import Path
 import enum
 import secrets
+from db_engine import create_sqlite_engine, create_missing_indexes
+from pagination import paginate, DEFAULT_PAGE_SIZE
 
 Base = declarative_base()
 
@@ -39,7 +41,8 @@ collection_items = Table(
     'collection_items',
     Base.metadata,
     Column('collection_id', Integer, ForeignKey('collections.id')),
-    Column('item_id', Integer, ForeignKey('items.id'))
+    Column('item_id', Integer, ForeignKey('items.id')),
+    Index('ix_collection_items_collection', 'collection_id', 'item_id')
 )
 
 # Koleksiyon takipçileri tablosu
@@ -48,12 +51,20 @@ collection_followers = Table(
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id')),
     Column('collection_id', Integer, ForeignKey('collections.id')),
-    Column('followed_at', DateTime, default=datetime.utcnow)
+    Column('followed_at', DateTime, default=datetime.utcnow),
+    # Kullanıcının takip ettikleri (takip zamanına göre sayfalı) ve koleksiyonun takipçileri
+    Index('ix_collection_followers_user_followed', 'user_id', 'followed_at', 'collection_id'),
+    Index('ix_collection_followers_collection', 'collection_id', 'user_id')
 )
 
 class Collection(Base):
     """Koleksiyon modeli"""
     __tablename__ = 'collections'
+    __table_args__ = (
+        # Sayfalı listeler: created_at, id sırasıyla
+        Index('ix_collections_created', 'created_at', 'id'),
+        Index('ix_collections_visibility_created', 'visibility', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
@@ -86,7 +97,9 @@ class Item(Base):
     description = Column(String)
     content_path = Column(String)  # İndirilen içeriğin yolu
     thumbnail_path = Column(String)  # Küçük resim yolu
-    metadata = Column(JSON)  # İçerik türüne özel meta veriler
+    # İçerik türüne özel meta veriler; 'metadata' adı declarative Base'de ayrılmış olduğu için
+    # öznitelik farklı adlandırılır, sütun adı aynı kalır
+    item_metadata = Column('metadata', JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     is_deleted = Column(Boolean, default=False)  # Silinme durumu
     
@@ -97,15 +110,38 @@ class Item(Base):
         back_populates='items'
     )
 
+# Sayaçlar ilişkileri yüklemek yerine koleksiyon sorgusuna gömülü COUNT alt sorgularıyla
+# hesaplanır; ertelenmiş oldukları için yalnızca undefer() ile istenen sorgularda çalışırlar.
+Collection.item_count = column_property(
+    select(func.count(collection_items.c.item_id))
+    .where(collection_items.c.collection_id == Collection.id)
+    .correlate_except(collection_items)
+    .scalar_subquery(),
+    deferred=True
+)
+Collection.follower_count = column_property(
+    select(func.count(collection_followers.c.user_id))
+    .where(collection_followers.c.collection_id == Collection.id)
+    .correlate_except(collection_followers)
+    .scalar_subquery(),
+    deferred=True
+)
+
 class CollectionManager:
-    def __init__(self):
-        # Veritabanı dizini
-        self.db_dir = Path.home() / 'DigiCollect' / 'data'
-        self.db_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(self, db_path=None):
+        if db_path is None:
+            # Veritabanı dizini
+            self.db_dir = Path.home() / 'DigiCollect' / 'data'
+            self.db_dir.mkdir(parents=True, exist_ok=True)
+            db_path = self.db_dir / 'collections.db'
+        else:
+            self.db_dir = Path(db_path).parent
         
         # SQLite veritabanı bağlantısı
-        self.engine = create_engine(f'sqlite:///{self.db_dir}/collections.db')
+        self.engine = create_sqlite_engine(db_path)
         Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            create_missing_indexes(conn, Base.metadata)
         
         # Oturum oluşturucu
         self.Session = sessionmaker(bind=self.engine)
@@ -195,21 +231,15 @@ class CollectionManager:
         try:
             session = self.Session()
             
-            collection = session.query(Collection).get(collection_id)
+            collection = session.query(Collection).options(
+                undefer(Collection.item_count)
+            ).filter(Collection.id == collection_id).first()
             if not collection:
                 raise ValueError(f"Koleksiyon bulunamadı: {collection_id}")
             
             return {
                 'status': 'success',
-                'collection': {
-                    'id': collection.id,
-                    'name': collection.name,
-                    'description': collection.description,
-                    'cover_image': collection.cover_image,
-                    'created_at': collection.created_at.isoformat(),
-                    'updated_at': collection.updated_at.isoformat(),
-                    'item_count': len(collection.items)
-                }
+                'collection': self._collection_summary(collection)
             }
             
         except Exception as e:
@@ -225,23 +255,37 @@ class CollectionManager:
         try:
             session = self.Session()
             
-            collections = session.query(Collection).all()
-            collection_list = []
+            collections = session.query(Collection).options(undefer(Collection.item_count)).all()
+            
+            return {
+                'status': 'success',
+                'collections': [self._collection_summary(c) for c in collections]
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        finally:
+            session.close()
+    
+    def list_collections_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Koleksiyonları en yeniden eskiye sayfalı listele"""
+        try:
+            session = self.Session()
             
-            for collection in collections:
-                collection_list.append({
-                    'id': collection.id,
-                    'name': collection.name,
-                    'description': collection.description,
-                    'cover_image': collection.cover_image,
-                    'created_at': collection.created_at.isoformat(),
-                    'updated_at': collection.updated_at.isoformat(),
-                    'item_count': len(collection.items)
-                })
+            collections, next_cursor = paginate(
+                session.query(Collection).options(undefer(Collection.item_count)),
+                [Collection.created_at, Collection.id],
+                cursor,
+                limit
+            )
             
             return {
                 'status': 'success',
-                'collections': collection_list
+                'collections': [self._collection_summary(c) for c in collections],
+                'next_cursor': next_cursor
             }
             
         except Exception as e:
@@ -274,7 +318,7 @@ class CollectionManager:
                 description=item_data.get('description'),
                 content_path=item_data.get('content_path'),
                 thumbnail_path=item_data.get('thumbnail_path'),
-                metadata=item_data.get('metadata', {})
+                item_metadata=item_data.get('metadata', {})
             )
             
             # Öğeyi koleksiyona ekle
@@ -309,23 +353,36 @@ class CollectionManager:
             if not collection:
                 raise ValueError(f"Koleksiyon bulunamadı: {collection_id}")
             
-            items = []
-            for item in collection.items:
-                items.append({
-                    'id': item.id,
-                    'content_type': item.content_type,
-                    'source_url': item.source_url,
-                    'title': item.title,
-                    'description': item.description,
-                    'content_path': item.content_path,
-                    'thumbnail_path': item.thumbnail_path,
-                    'metadata': item.metadata,
-                    'created_at': item.created_at.isoformat()
-                })
+            return {
+                'status': 'success',
+                'items': [self._item_to_dict(item) for item in collection.items]
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        finally:
+            session.close()
+    
+    def get_collection_items_page(self, collection_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Koleksiyondaki öğeleri en yeniden eskiye sayfalı al"""
+        try:
+            session = self.Session()
+            
+            if not session.query(Collection.id).filter(Collection.id == collection_id).first():
+                raise ValueError(f"Koleksiyon bulunamadı: {collection_id}")
+            
+            query = session.query(Item).join(
+                collection_items, collection_items.c.item_id == Item.id
+            ).filter(collection_items.c.collection_id == collection_id)
+            items, next_cursor = paginate(query, [Item.created_at, Item.id], cursor, limit)
             
             return {
                 'status': 'success',
-                'items': items
+                'items': [self._item_to_dict(item) for item in items],
+                'next_cursor': next_cursor
             }
             
         except Exception as e:
@@ -570,24 +627,24 @@ class CollectionManager:
         try:
             session = self.Session()
             
-            collection = session.query(Collection).get(collection_id)
-            if not collection:
+            if not session.query(Collection.id).filter(Collection.id == collection_id).first():
                 raise ValueError(f"Koleksiyon bulunamadı: {collection_id}")
             
-            followers = []
-            for user in collection.followers:
-                followers.append({
-                    'id': user.id,
-                    'username': user.username,
-                    'followed_at': session.query(collection_followers).filter_by(
-                        user_id=user.id,
-                        collection_id=collection_id
-                    ).first().followed_at.isoformat()
-                })
+            # Takip zamanı ilişki tablosundan aynı sorguda gelir
+            rows = session.query(User, collection_followers.c.followed_at).join(
+                collection_followers, collection_followers.c.user_id == User.id
+            ).filter(collection_followers.c.collection_id == collection_id).all()
             
             return {
                 'status': 'success',
-                'followers': followers
+                'followers': [
+                    {
+                        'id': user.id,
+                        'username': user.username,
+                        'followed_at': followed_at.isoformat()
+                    }
+                    for user, followed_at in rows
+                ]
             }
             
         except Exception as e:
@@ -603,30 +660,57 @@ class CollectionManager:
         try:
             session = self.Session()
             
-            user = session.query(User).get(user_id)
-            if not user:
+            if not session.query(User.id).filter(User.id == user_id).first():
                 raise ValueError(f"Kullanıcı bulunamadı: {user_id}")
             
-            collections = []
-            for collection in user.followed_collections:
-                collections.append({
-                    'id': collection.id,
-                    'name': collection.name,
-                    'description': collection.description,
-                    'cover_image': collection.cover_image,
-                    'owner': {
-                        'id': collection.user.id,
-                        'username': collection.user.username
-                    },
-                    'followed_at': session.query(collection_followers).filter_by(
-                        user_id=user_id,
-                        collection_id=collection.id
-                    ).first().followed_at.isoformat()
-                })
+            # Takip zamanı ve koleksiyon sahibi aynı sorguda gelir
+            rows = session.query(Collection, collection_followers.c.followed_at).join(
+                collection_followers, collection_followers.c.collection_id == Collection.id
+            ).options(
+                joinedload(Collection.user)
+            ).filter(collection_followers.c.user_id == user_id).all()
+            
+            return {
+                'status': 'success',
+                'collections': [
+                    self._followed_collection_summary(collection, followed_at)
+                    for collection, followed_at in rows
+                ]
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        finally:
+            session.close()
+    
+    def get_followed_collections_page(self, user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Takip edilen koleksiyonları son takip edilenden başlayarak sayfalı getir"""
+        try:
+            session = self.Session()
+            
+            query = session.query(Collection, collection_followers.c.followed_at).join(
+                collection_followers, collection_followers.c.collection_id == Collection.id
+            ).options(
+                joinedload(Collection.user)
+            ).filter(collection_followers.c.user_id == user_id)
+            rows, next_cursor = paginate(
+                query,
+                [collection_followers.c.followed_at, Collection.id],
+                cursor,
+                limit,
+                key=lambda row: (row.followed_at, row[0].id)
+            )
             
             return {
                 'status': 'success',
-                'collections': collections
+                'collections': [
+                    self._followed_collection_summary(collection, followed_at)
+                    for collection, followed_at in rows
+                ],
+                'next_cursor': next_cursor
             }
             
         except Exception as e:
@@ -642,23 +726,39 @@ class CollectionManager:
         try:
             session = self.Session()
             
-            collections = []
-            for collection in session.query(Collection).filter_by(visibility=VisibilityType.PUBLIC).all():
-                collections.append({
-                    'id': collection.id,
-                    'name': collection.name,
-                    'description': collection.description,
-                    'cover_image': collection.cover_image,
-                    'owner': {
-                        'id': collection.user.id,
-                        'username': collection.user.username
-                    },
-                    'follower_count': len(collection.followers)
-                })
+            collections = session.query(Collection).options(
+                joinedload(Collection.user),
+                undefer(Collection.follower_count)
+            ).filter_by(visibility=VisibilityType.PUBLIC).all()
             
             return {
                 'status': 'success',
-                'collections': collections
+                'collections': [self._public_collection_summary(c) for c in collections]
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        finally:
+            session.close()
+    
+    def get_public_collections_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Herkese açık koleksiyonları en yeniden eskiye sayfalı getir"""
+        try:
+            session = self.Session()
+            
+            query = session.query(Collection).options(
+                joinedload(Collection.user),
+                undefer(Collection.follower_count)
+            ).filter(Collection.visibility == VisibilityType.PUBLIC)
+            collections, next_cursor = paginate(query, [Collection.created_at, Collection.id], cursor, limit)
+            
+            return {
+                'status': 'success',
+                'collections': [self._public_collection_summary(c) for c in collections],
+                'next_cursor': next_cursor
             }
             
         except Exception as e:
@@ -674,7 +774,10 @@ class CollectionManager:
         try:
             session = self.Session()
             
-            collection = session.query(Collection).filter_by(
+            collection = session.query(Collection).options(
+                joinedload(Collection.user),
+                undefer(Collection.follower_count)
+            ).filter_by(
                 share_token=share_token,
                 visibility=VisibilityType.UNLISTED
             ).first()
@@ -684,17 +787,7 @@ class CollectionManager:
             
             return {
                 'status': 'success',
-                'collection': {
-                    'id': collection.id,
-                    'name': collection.name,
-                    'description': collection.description,
-                    'cover_image': collection.cover_image,
-                    'owner': {
-                        'id': collection.user.id,
-                        'username': collection.user.username
-                    },
-                    'follower_count': len(collection.followers)
-                }
+                'collection': self._public_collection_summary(collection)
             }
             
         except Exception as e:
@@ -704,3 +797,61 @@ class CollectionManager:
             }
         finally:
             session.close()
+    
+    @staticmethod
+    def _collection_summary(collection):
+        """Koleksiyon listesi kartı için sözlük"""
+        return {
+            'id': collection.id,
+            'name': collection.name,
+            'description': collection.description,
+            'cover_image': collection.cover_image,
+            'created_at': collection.created_at.isoformat(),
+            'updated_at': collection.updated_at.isoformat(),
+            'item_count': collection.item_count
+        }
+    
+    @staticmethod
+    def _public_collection_summary(collection):
+        """Herkese açık koleksiyon kartı için sözlük"""
+        return {
+            'id': collection.id,
+            'name': collection.name,
+            'description': collection.description,
+            'cover_image': collection.cover_image,
+            'owner': {
+                'id': collection.user.id,
+                'username': collection.user.username
+            },
+            'follower_count': collection.follower_count
+        }
+    
+    @staticmethod
+    def _followed_collection_summary(collection, followed_at):
+        """Takip edilen koleksiyon kartı için sözlük"""
+        return {
+            'id': collection.id,
+            'name': collection.name,
+            'description': collection.description,
+            'cover_image': collection.cover_image,
+            'owner': {
+                'id': collection.user.id,
+                'username': collection.user.username
+            },
+            'followed_at': followed_at.isoformat()
+        }
+    
+    @staticmethod
+    def _item_to_dict(item):
+        """Öğe kartı için sözlük"""
+        return {
+            'id': item.id,
+            'content_type': item.content_type,
+            'source_url': item.source_url,
+            'title': item.title,
+            'description': item.description,
+            'content_path': item.content_path,
+            'thumbnail_path': item.thumbnail_path,
+            'metadata': item.item_metadata,
+            'created_at': item.created_at.isoformat()
+        }
@@ -1,9 +1,10 @@
 from urllib.parse import urlparse
 import re
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
 import json
+from services.http_client import get_http_client
+from services.metadata_cache import get_metadata_cache
+from services.meta_parser import MetaIndex
 
 class ContentProcessor:
     def __init__(self):
@@ -17,6 +18,8 @@ class ContentProcessor:
             'pinterest': ['pinterest.com'],
             'podcast': ['anchor.fm', 'spotify.com/show']
         }
+        self.http = get_http_client()
+        self.metadata_cache = get_metadata_cache()
         
     def process_shared_content(self, shared_url):
         """Paylaşılan içeriği işle ve metadata'sını çıkar"""
@@ -61,21 +64,41 @@ class ContentProcessor:
     def fetch_metadata(self, url, platform):
         """Platform türüne göre meta verileri çek"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            cached = self.metadata_cache.get(url, namespace='processor')
+            if cached and cached['fresh']:
+                return cached['data']
+            
+            # Süresi dolmuş kaydı koşullu GET ile yeniden doğrula.
+            # YouTube itemprop etiketlerini gövdede taşıdığı için tam sayfa indirilir.
+            headers = self.metadata_cache.conditional_headers(cached)
+            if platform == 'youtube':
+                response = self.http.get(url, headers=headers)
+            else:
+                response = self.http.fetch_head(url, headers=headers)
+            if cached and response.status_code == 304:
+                self.metadata_cache.refresh(url, namespace='processor')
+                return cached['data']
+            
+            # Belge tek geçişte indekslenir, tüm getter'lar bu indeksten okur
+            meta = MetaIndex.parse(response.text)
             
             metadata = {
-                'title': self.get_title(soup),
-                'description': self.get_description(soup),
-                'image': self.get_image(soup),
-                'author': self.get_author(soup, platform),
-                'date': self.get_date(soup),
-                'platform_specific': self.get_platform_specific(soup, platform)
+                'title': self.get_title(meta),
+                'description': self.get_description(meta),
+                'image': self.get_image(meta),
+                'author': self.get_author(meta, platform),
+                'date': self.get_date(meta),
+                'platform_specific': self.get_platform_specific(meta, platform)
             }
             
+            # Hata sayfalarını önbelleğe alma
+            if response.ok:
+                self.metadata_cache.set(
+                    url, metadata, platform,
+                    namespace='processor',
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
             return metadata
             
         except Exception as e:
@@ -83,86 +106,61 @@ class ContentProcessor:
                 'error': f'Metadata çekilemedi: {str(e)}'
             }
     
-    def get_title(self, soup):
+    def get_title(self, meta):
         """Sayfa başlığını çek"""
-        # Önce Open Graph başlığını dene
-        og_title = soup.find('meta', property='og:title')
+        # Önce Open Graph başlığını, sonra normal başlığı dene
+        og_title = meta.prop('og:title')
         if og_title:
-            return og_title.get('content')
+            return og_title
             
-        # Normal başlığı dene
-        title = soup.find('title')
-        if title:
-            return title.text
+        if meta.title:
+            return meta.title
             
         return 'Başlık bulunamadı'
     
-    def get_description(self, soup):
+    def get_description(self, meta):
         """Sayfa açıklamasını çek"""
-        # Open Graph açıklaması
-        og_desc = soup.find('meta', property='og:description')
-        if og_desc:
-            return og_desc.get('content')
-            
-        # Meta açıklama
-        meta_desc = soup.find('meta', {'name': 'description'})
-        if meta_desc:
-            return meta_desc.get('content')
-            
-        return ''
+        # Open Graph açıklaması, yoksa meta açıklama
+        return meta.prop('og:description') or meta.name('description') or ''
     
-    def get_image(self, soup):
+    def get_image(self, meta):
         """Sayfa görselini çek"""
         # Open Graph görseli
-        og_image = soup.find('meta', property='og:image')
-        if og_image:
-            return og_image.get('content')
-            
-        return None
+        return meta.prop('og:image')
     
-    def get_author(self, soup, platform):
+    def get_author(self, meta, platform):
         """İçerik sahibini platform'a göre çek"""
-        if platform == 'twitter':
+        og_title = meta.prop('og:title')
+        
+        if platform == 'twitter' and og_title:
             # Twitter kullanıcı adını bul
-            author = soup.find('meta', property='og:title')
-            if author:
-                username = re.search(r'@(\w+)', author.get('content'))
-                if username:
-                    return username.group(1)
+            username = re.search(r'@(\w+)', og_title)
+            if username:
+                return username.group(1)
         
-        elif platform == 'instagram':
+        elif platform == 'instagram' and og_title:
             # Instagram kullanıcı adını bul
-            author = soup.find('meta', property='og:title')
-            if author:
-                return author.get('content').split(' on Instagram')[0]
+            return og_title.split(' on Instagram')[0]
         
         # Genel author meta tag'i
-        author = soup.find('meta', {'name': 'author'})
-        if author:
-            return author.get('content')
-            
-        return 'Bilinmeyen Yazar'
+        return meta.name('author') or 'Bilinmeyen Yazar'
     
-    def get_date(self, soup):
+    def get_date(self, meta):
         """Yayın tarihini çek"""
         # Publish date meta tag'i
-        published = soup.find('meta', {'name': ['publishedDate', 'publication_date', 'date']})
-        if published:
-            return published.get('content')
-            
-        return str(datetime.now())
+        return meta.first_name('publishedDate', 'publication_date', 'date') or str(datetime.now())
     
-    def get_platform_specific(self, soup, platform):
+    def get_platform_specific(self, meta, platform):
         """Platforma özel meta verileri çek"""
         if platform == 'youtube':
             return {
-                'duration': self._get_youtube_duration(soup),
-                'views': self._get_youtube_views(soup)
+                'duration': self._get_youtube_duration(meta),
+                'views': self._get_youtube_views(meta)
             }
         elif platform == 'spotify':
             return {
-                'type': self._get_spotify_type(soup),
-                'duration': self._get_spotify_duration(soup)
+                'type': self._get_spotify_type(meta),
+                'duration': self._get_spotify_duration(meta)
             }
         
         return {}
@@ -191,35 +189,28 @@ class ContentProcessor:
         return source
     
     # Platform özel yardımcı metodları
-    def _get_youtube_duration(self, soup):
-        duration = soup.find('meta', {'itemprop': 'duration'})
-        return duration.get('content') if duration else None
+    def _get_youtube_duration(self, meta):
+        return meta.itemprop('duration')
     
-    def _get_youtube_views(self, soup):
-        views = soup.find('meta', {'itemprop': 'interactionCount'})
-        return views.get('content') if views else None
+    def _get_youtube_views(self, meta):
+        return meta.itemprop('interactionCount')
     
-    def _get_spotify_type(self, soup):
-        og_type = soup.find('meta', property='og:type')
-        return og_type.get('content') if og_type else None
+    def _get_spotify_type(self, meta):
+        return meta.prop('og:type')
     
-    def _get_spotify_duration(self, soup):
-        duration = soup.find('meta', property='music:duration')
-        return duration.get('content') if duration else None
+    def _get_spotify_duration(self, meta):
+        return meta.prop('music:duration')
 
     def process_pinterest_image(self, url):
         """Pinterest görselini işle"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.http.fetch_head(url)
+            meta = MetaIndex.parse(response.text)
             
             # Pinterest görseli meta verilerini çek
-            image_url = soup.find('meta', property='og:image').get('content')
-            description = soup.find('meta', property='og:description').get('content')
-            pinner = soup.find('meta', property='og:title').get('content').split(' on Pinterest')[0]
+            image_url = meta.prop('og:image')
+            description = meta.prop('og:description')
+            pinner = meta.prop('og:title').split(' on Pinterest')[0]
             
             return {
                 'type': 'pinterest',
@@ -234,17 +225,14 @@ class ContentProcessor:
     def process_podcast(self, url):
         """Podcast bölümünü işle"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.http.fetch_head(url)
+            meta = MetaIndex.parse(response.text)
             
             # Podcast meta verilerini çek
-            title = soup.find('meta', property='og:title').get('content')
-            description = soup.find('meta', property='og:description').get('content')
-            audio_url = soup.find('meta', property='og:audio').get('content')
-            duration = soup.find('meta', property='og:audio:duration').get('content')
+            title = meta.prop('og:title')
+            description = meta.prop('og:description')
+            audio_url = meta.prop('og:audio')
+            duration = meta.prop('og:audio:duration')
             
             return {
                 'type': 'podcast',
@@ -260,17 +248,14 @@ class ContentProcessor:
     def process_spotify_track(self, url):
         """Spotify şarkısını işle"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.http.fetch_head(url)
+            meta = MetaIndex.parse(response.text)
             
             # Spotify şarkı meta verilerini çek
-            title = soup.find('meta', property='og:title').get('content')
-            artist = soup.find('meta', property='og:description').get('content')
-            preview_url = soup.find('meta', property='og:audio').get('content')
-            duration = soup.find('meta', property='music:duration').get('content')
+            title = meta.prop('og:title')
+            artist = meta.prop('og:description')
+            preview_url = meta.prop('og:audio')
+            duration = meta.prop('music:duration')
             
             return {
                 'type': 'spotify',
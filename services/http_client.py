@@ -0,0 +1,166 @@
+import re
+import threading
+import logging
+from dataclasses import dataclass
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger('DigiCollect.HttpClient')
+
+try:
+    # brotli kuruluysa urllib3 'br' sıkıştırmasını otomatik açar
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+
+# Başlık okuması için varsayılan bayt bütçesi
+HEAD_BYTE_BUDGET = 512 * 1024
+HEAD_END = re.compile(rb'</head\s*>', re.IGNORECASE)
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+@dataclass
+class PageHead:
+    """Sayfanın yalnızca <head> bölümünü taşıyan hafif yanıt"""
+    url: str
+    status_code: int
+    headers: dict
+    text: str
+    truncated: bool = False
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+
+class HttpClient:
+    """Host başına bağlantı havuzu tutan, keep-alive ve yeniden denemeli HTTP istemcisi"""
+
+    def __init__(self, pool_connections=32, pool_maxsize=16, connect_timeout=5, read_timeout=15,
+                 retries=3, backoff_factor=0.5):
+        """
+        Args:
+            pool_connections: Önbellekte tutulacak host havuzu sayısı
+            pool_maxsize: Her host için açık tutulacak en fazla bağlantı
+            connect_timeout: Bağlantı kurma zaman aşımı (saniye)
+            read_timeout: Yanıt okuma zaman aşımı (saniye)
+            retries: Geçici hatalarda yeniden deneme sayısı
+            backoff_factor: Denemeler arası üstel bekleme çarpanı
+        """
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, url, **kwargs):
+        """Ortak oturum üzerinden istek gönder"""
+        kwargs.setdefault('timeout', self.timeout)
+        logger.debug(f'{method} {url}')
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """GET isteği gönder"""
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """HEAD isteği gönder"""
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, **kwargs)
+
+    def fetch_head(self, url, max_bytes=HEAD_BYTE_BUDGET, chunk_size=16 * 1024, **kwargs):
+        """Yanıtı parça parça oku, </head> veya bayt bütçesine ulaşınca bağlantıyı kapat
+
+        Open Graph ve benzeri meta etiketleri <head> içinde olduğundan sayfanın
+        gövdesini indirmeye gerek yoktur.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        logger.debug(f'GET (head) {url}')
+        response = self.session.get(url, stream=True, **kwargs)
+        buffer = bytearray()
+        end = None
+        try:
+            # 304 gibi gövdesiz yanıtlarda okunacak bir şey yok
+            if response.status_code != 304:
+                for chunk in response.iter_content(chunk_size):
+                    # Parça sınırına bölünmüş etiketi kaçırmamak için önceki parçayla çakıştırarak ara
+                    search_from = max(len(buffer) - 16, 0)
+                    buffer += chunk
+                    match = HEAD_END.search(buffer, search_from)
+                    if match:
+                        end = match.end()
+                        break
+                    if len(buffer) >= max_bytes:
+                        break
+        finally:
+            # Okunmamış gövde kalmışsa bağlantı havuza dönmez, kapatılır
+            response.close()
+
+        head = bytes(buffer[:end]) if end else bytes(buffer[:max_bytes])
+        return PageHead(
+            url=response.url,
+            status_code=response.status_code,
+            headers=response.headers,
+            text=head.decode(self._detect_encoding(response, head), errors='replace'),
+            truncated=end is None and len(buffer) >= max_bytes
+        )
+
+    @staticmethod
+    def _detect_encoding(response, head):
+        """Karakter kodlamasını başlıktan veya <meta charset> etiketinden belirle"""
+        content_type = response.headers.get('Content-Type', '')
+        if 'charset=' in content_type.lower():
+            return response.encoding
+        match = META_CHARSET.search(head)
+        if match:
+            encoding = match.group(1).decode('ascii', errors='ignore')
+            try:
+                ''.encode(encoding)
+                return encoding
+            except LookupError:
+                pass
+        return 'utf-8'
+
+    def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Uygulama genelinde paylaşılan HTTP istemcisini döndür"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+                logger.info('Paylaşılan HTTP istemcisi oluşturuldu')
+    return _client
@@ -0,0 +1,95 @@
+from html.parser import HTMLParser
+
+
+class MetaIndex(HTMLParser):
+    """Belgeyi tek geçişte tarayıp meta etiketlerini ve <title> değerini indeksle
+
+    Ağaç kurmadan SAX tarzı çalışır; og:*, twitter:*, music:* gibi property
+    değerleri, name= ve itemprop= değerleri ayrı sözlüklerde tutulur. Aynı
+    anahtar birden fazla kez geçerse BeautifulSoup.find ile aynı şekilde ilk
+    değer kullanılır.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.properties = {}
+        self.names = {}
+        self.itemprops = {}
+        self.title = None
+        self._title_parts = None
+
+    @classmethod
+    def parse(cls, html):
+        """HTML metnini indeksle"""
+        index = cls()
+        index.feed(html or '')
+        index.close()
+        return index
+
+    @classmethod
+    def from_soup(cls, soup):
+        """Zaten kurulmuş bir BeautifulSoup ağacını tek geçişte indeksle"""
+        index = cls()
+        for tag in soup.find_all(['meta', 'title']):
+            if tag.name == 'meta':
+                index._add_meta(tag.attrs)
+            elif index.title is None:
+                index.title = tag.get_text()
+        return index
+
+    def prop(self, *keys):
+        """property= değerlerinden ilk bulunanı döndür"""
+        return self._first(self.properties, keys)
+
+    def name(self, *keys):
+        """name= değerlerinden ilk bulunanı döndür"""
+        return self._first(self.names, keys)
+
+    def itemprop(self, *keys):
+        """itemprop= değerlerinden ilk bulunanı döndür"""
+        return self._first(self.itemprops, keys)
+
+    def first_name(self, *keys):
+        """name= değerlerinden belgede ilk geçeni döndür
+
+        name() anahtar sırasına göre arar; bu ise soup.find('meta', {'name': [...]})
+        gibi anahtarlardan hangisi belgede önce geçiyorsa onu döndürür.
+        """
+        return self._first_in_document(self.names, keys)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            self._add_meta(dict(attrs))
+        elif tag == 'title' and self.title is None:
+            self._title_parts = []
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self._title_parts is not None:
+            self.title = ''.join(self._title_parts)
+            self._title_parts = None
+
+    def _add_meta(self, attrs):
+        content = attrs.get('content')
+        for attr, bucket in (('property', self.properties), ('name', self.names), ('itemprop', self.itemprops)):
+            key = attrs.get(attr)
+            if key and key not in bucket:
+                bucket[key] = content
+
+    @staticmethod
+    def _first(bucket, keys):
+        for key in keys:
+            if bucket.get(key) is not None:
+                return bucket[key]
+        return None
+
+    @staticmethod
+    def _first_in_document(bucket, keys):
+        # Sözlük ekleme sırasını korur; her anahtarın ilk geçişi belge sırasındadır
+        for key, value in bucket.items():
+            if key in keys and value is not None:
+                return value
+        return None
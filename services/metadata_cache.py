@@ -0,0 +1,239 @@
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from db_engine import connect_sqlite
+
+logger = logging.getLogger('DigiCollect.MetadataCache')
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# İçerik türüne göre önbellek süreleri (saniye)
+CONTENT_TTLS = {
+    # ContentCollector içerik türleri
+    'video': 7 * DAY,
+    'spotify': 7 * DAY,
+    'image': 3 * DAY,
+    'text': 6 * HOUR,
+    # ContentProcessor platformları
+    'youtube': 7 * DAY,
+    'pinterest': 3 * DAY,
+    'instagram': 3 * DAY,
+    'podcast': 3 * DAY,
+    'twitter': 6 * HOUR,
+    'medium': DAY,
+    'website': DAY
+}
+DEFAULT_TTL = DAY
+
+# Aynı içeriği farklı anahtarlara dağıtan paylaşım/izleme parametreleri
+TRACKING_PARAMS = {'fbclid', 'gclid', 'igshid', 'si', 'feature', 'ref', 'ref_src'}
+
+
+def normalize_url(url):
+    """Aynı içeriğe giden URL'leri tek bir önbellek anahtarına indir"""
+    parsed = urlparse(url.strip())
+    netloc = (parsed.hostname or '').lower()
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    if parsed.port and parsed.port not in (80, 443):
+        netloc = f'{netloc}:{parsed.port}'
+    path = parsed.path.rstrip('/') or '/'
+
+    query = [
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    ]
+
+    # youtu.be kısa bağlantılarını tam adrese çevir
+    if netloc == 'youtu.be' and path != '/':
+        query.append(('v', path.lstrip('/')))
+        netloc, path = 'youtube.com', '/watch'
+
+    return urlunparse(('https', netloc, path, '', urlencode(sorted(query)), ''))
+
+
+class MetadataCache:
+    """Toplanan URL meta verileri için SQLite tabanlı, TTL'li ve LRU tahliyeli önbellek"""
+
+    EVICT_EVERY = 100
+
+    def __init__(self, db_path=None, max_entries=20000, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            db_path: Önbellek veritabanı yolu
+            max_entries: Tutulacak en fazla kayıt sayısı
+            max_bytes: Kayıtların toplam en fazla boyutu
+        """
+        if db_path is None:
+            cache_dir = Path.home() / 'DigiCollect' / 'cache'
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            db_path = cache_dir / 'metadata.db'
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.conn = connect_sqlite(db_path)
+        self.create_tables()
+        self._evict()
+
+    def create_tables(self):
+        """Gerekli tabloları oluştur"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS metadata_cache (
+                    namespace TEXT NOT NULL,
+                    url_key TEXT NOT NULL,
+                    content_type TEXT,
+                    data TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, url_key)
+                )
+            """)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_metadata_cache_accessed ON metadata_cache (accessed_at)"
+            )
+            self.conn.commit()
+
+    def get(self, url, namespace='collector'):
+        """Önbellek kaydını döndür, yoksa None
+
+        Dönen sözlükteki 'fresh' alanı False ise kayıt süresi dolmuştur ve
+        'etag'/'last_modified' ile yeniden doğrulanabilir.
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT data, etag, last_modified, expires_at FROM metadata_cache WHERE namespace = ? AND url_key = ?",
+                (namespace, key)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute(
+                "UPDATE metadata_cache SET accessed_at = ? WHERE namespace = ? AND url_key = ?",
+                (now, namespace, key)
+            )
+            self.conn.commit()
+
+        data, etag, last_modified, expires_at = row
+        return {
+            'data': json.loads(data),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': expires_at > now
+        }
+
+    def set(self, url, data, content_type=None, namespace='collector', etag=None, last_modified=None):
+        """Meta veriyi önbelleğe yaz"""
+        key = normalize_url(url)
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        now = time.time()
+        ttl = CONTENT_TTLS.get(content_type, DEFAULT_TTL)
+        with self._lock:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO metadata_cache
+                   (namespace, url_key, content_type, data, etag, last_modified, size, fetched_at, expires_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (namespace, key, content_type, payload, etag, last_modified, len(payload), now, now + ttl, now)
+            )
+            self.conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_EVERY == 0
+        if should_evict:
+            self._evict()
+
+    def refresh(self, url, namespace='collector'):
+        """304 yanıtından sonra kaydın süresini yenile"""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT content_type FROM metadata_cache WHERE namespace = ? AND url_key = ?",
+                (namespace, key)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return False
+            ttl = CONTENT_TTLS.get(row[0], DEFAULT_TTL)
+            cursor.execute(
+                "UPDATE metadata_cache SET fetched_at = ?, expires_at = ?, accessed_at = ? WHERE namespace = ? AND url_key = ?",
+                (now, now + ttl, now, namespace, key)
+            )
+            self.conn.commit()
+            return True
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Süresi dolmuş kayıt için koşullu GET başlıklarını oluştur"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def invalidate(self, url, namespace='collector'):
+        """Kaydı önbellekten sil"""
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM metadata_cache WHERE namespace = ? AND url_key = ?",
+                (namespace, normalize_url(url))
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        """Sınırlar aşıldıysa en uzun süredir kullanılmayan kayıtları sil"""
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM metadata_cache")
+            count, total_size = cursor.fetchone()
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                return
+
+            # Boyut sınırı için ortalama kayıt boyutuna göre silinecek sayıyı tahmin et
+            excess = max(count - self.max_entries, 0)
+            if total_size > self.max_bytes and count:
+                excess = max(excess, int((total_size - self.max_bytes) / (total_size / count)) + 1)
+
+            cursor.execute(
+                """DELETE FROM metadata_cache WHERE rowid IN (
+                       SELECT rowid FROM metadata_cache ORDER BY accessed_at LIMIT ?
+                   )""",
+                (excess,)
+            )
+            self.conn.commit()
+            logger.debug(f'{cursor.rowcount} önbellek kaydı tahliye edildi')
+
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        self.conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_metadata_cache():
+    """Uygulama genelinde paylaşılan meta veri önbelleğini döndür"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = MetadataCache()
+    return _cache
@@ -1,30 +1,23 @@
-import yt_dlp
 import ffmpeg
 import os
 from pathlib import Path
 import json
 import tempfile
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+from services.ytdl_pool import get_ytdl_pool
+from services.http_client import get_http_client
+from services.meta_parser import MetaIndex
+from services.waveform import WaveformEngine
 
 class MusicCutter:
     def __init__(self):
         self.temp_dir = Path(tempfile.gettempdir()) / 'digicollect'
         self.temp_dir.mkdir(exist_ok=True)
         
-        # yt-dlp yapılandırması
-        self.ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': str(self.temp_dir / '%(id)s.%(ext)s'),
-            'quiet': True,
-            'no_warnings': True,
-        }
+        # Paylaşılan yt-dlp havuzu ('audio_mp3' profili: en iyi ses, mp3'e dönüştürülür)
+        self.ytdl = get_ytdl_pool()
+        self.http = get_http_client()
+        self.waveform = WaveformEngine()
     
     def download_music(self, url):
         """Müzik URL'inden ses dosyası indir"""
@@ -34,23 +27,22 @@ class MusicCutter:
                 return self._handle_spotify(url)
             
             # YouTube veya diğer kaynaklar için yt-dlp kullan
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                
-                return {
-                    'status': 'success',
-                    'track_id': info['id'],
-                    'title': info['title'],
-                    'duration': info['duration'],
-                    'thumbnail': info.get('thumbnail'),
-                    'file_path': str(self.temp_dir / f"{info['id']}.mp3"),
-                    'metadata': {
-                        'artist': info.get('artist', ''),
-                        'album': info.get('album', ''),
-                        'track': info.get('track', ''),
-                        'release_date': info.get('release_date', ''),
-                    }
+            info = self.ytdl.extract_info(url, 'audio_mp3', download=True)
+            
+            return {
+                'status': 'success',
+                'track_id': info['id'],
+                'title': info['title'],
+                'duration': info['duration'],
+                'thumbnail': info.get('thumbnail'),
+                'file_path': str(self.temp_dir / f"{info['id']}.mp3"),
+                'metadata': {
+                    'artist': info.get('artist', ''),
+                    'album': info.get('album', ''),
+                    'track': info.get('track', ''),
+                    'release_date': info.get('release_date', ''),
                 }
+            }
                 
         except Exception as e:
             return {
@@ -62,16 +54,13 @@ class MusicCutter:
         """Spotify URL'inden meta verileri çek"""
         try:
             # Spotify web sayfasından meta verileri çek
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = self.http.fetch_head(url)
+            meta = MetaIndex.parse(response.text)
             
             # Meta verilerden bilgileri al
-            title = soup.find('meta', property='og:title')['content']
-            description = soup.find('meta', property='og:description')['content']
-            image = soup.find('meta', property='og:image')['content']
+            title = meta.prop('og:title')
+            description = meta.prop('og:description') or ''
+            image = meta.prop('og:image')
             
             # Sanatçı adını açıklamadan çıkar
             artist = description.split('·')[0].strip()
@@ -120,25 +109,15 @@ class MusicCutter:
                 'error': str(e.stderr, 'utf-8')
             }
     
-    def generate_waveform(self, music_path, width=800, height=200):
-        """Ses dosyasından dalga formu görüntüsü oluştur"""
+    def generate_waveform(self, music_path):
+        """Ses dosyasının çok çözünürlüklü dalga formu tepe dosyasını oluştur"""
         try:
-            output_path = str(self.temp_dir / f'waveform_{datetime.now().timestamp()}.png')
-            
-            # FFmpeg ile dalga formu oluştur
-            stream = ffmpeg.input(music_path)
-            stream = ffmpeg.filter(stream, 'showwaves', 
-                                 s=f'{width}x{height}',
-                                 mode='line',
-                                 rate=25,
-                                 colors='blue')
-            
-            stream = ffmpeg.output(stream, output_path)
-            ffmpeg.run(stream, capture_stdout=True, capture_stderr=True)
+            # PCM yalnızca bir kez çözülür; sonraki çağrılar mevcut dosyayı kullanır
+            peaks_path = self.waveform.build(music_path)
             
             return {
                 'status': 'success',
-                'waveform_path': output_path
+                'peaks_path': peaks_path
             }
             
         except ffmpeg.Error as e:
@@ -147,6 +126,10 @@ class MusicCutter:
                 'error': str(e.stderr, 'utf-8')
             }
     
+    def load_waveform(self, music_path):
+        """Çizim için dalga formu tepe dizilerini yükle"""
+        return self.waveform.load(music_path)
+    
     def get_music_info(self, music_path):
         """Ses dosyası hakkında bilgi al"""
         try:
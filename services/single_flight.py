@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Aynı anahtar için eşzamanlı çağrıları tek bir çalıştırmada birleştir
+
+    İlk gelen çağıran işi çalıştırır, iş sürerken aynı anahtarla gelen diğer
+    çağıranlar (iş parçacığı veya asyncio görevi) aynı sonucu bekler. İş
+    bittiğinde anahtar serbest bırakılır; sonuç saklanmaz.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args):
+        """fn(*args) çağrısını anahtar bazında birleştirerek çalıştır (bloklayan)"""
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn, args)
+        return future.result()
+
+    async def do_async(self, key, fn, *args, executor=None):
+        """do() ile aynı, ancak bloklayan işi executor'da çalıştırıp asyncio içinde bekler"""
+        future, leader = self._join(key)
+        if leader:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(executor, self._run, key, future, fn, args)
+        return await asyncio.wrap_future(future)
+
+    def in_flight(self):
+        """Şu anda çalışan anahtar sayısı"""
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _run(self, key, future, fn, args):
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                if self._calls.get(key) is future:
+                    del self._calls[key]
@@ -1,45 +1,40 @@
-import yt_dlp
 import ffmpeg
 import os
+import time
 from pathlib import Path
 import json
 import tempfile
 from datetime import datetime
+from services.ytdl_pool import get_ytdl_pool
 
 class VideoCutter:
     def __init__(self):
         self.temp_dir = Path(tempfile.gettempdir()) / 'digicollect'
         self.temp_dir.mkdir(exist_ok=True)
         
-        # yt-dlp yapılandırması
-        self.ydl_opts = {
-            'format': 'best[height<=720]',  # 720p veya daha düşük kalite
-            'outtmpl': str(self.temp_dir / '%(id)s.%(ext)s'),
-            'quiet': True,
-            'no_warnings': True,
-        }
+        # Paylaşılan yt-dlp havuzu ('video_720p' profili: 720p veya daha düşük kalite)
+        self.ytdl = get_ytdl_pool()
     
     def download_video(self, url):
         """Video URL'inden video indir"""
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                # Video bilgilerini al
-                info = ydl.extract_info(url, download=True)
-                
-                return {
-                    'status': 'success',
-                    'video_id': info['id'],
-                    'title': info['title'],
-                    'duration': info['duration'],
-                    'thumbnail': info['thumbnail'],
-                    'file_path': str(self.temp_dir / f"{info['id']}.{info['ext']}"),
-                    'metadata': {
-                        'uploader': info.get('uploader', ''),
-                        'view_count': info.get('view_count', 0),
-                        'like_count': info.get('like_count', 0),
-                        'upload_date': info.get('upload_date', ''),
-                    }
+            # Video bilgilerini al ve indir
+            info = self.ytdl.extract_info(url, 'video_720p', download=True)
+            
+            return {
+                'status': 'success',
+                'video_id': info['id'],
+                'title': info['title'],
+                'duration': info['duration'],
+                'thumbnail': info['thumbnail'],
+                'file_path': str(self.temp_dir / f"{info['id']}.{info['ext']}"),
+                'metadata': {
+                    'uploader': info.get('uploader', ''),
+                    'view_count': info.get('view_count', 0),
+                    'like_count': info.get('like_count', 0),
+                    'upload_date': info.get('upload_date', ''),
                 }
+            }
                 
         except Exception as e:
             return {
@@ -47,35 +42,277 @@ class VideoCutter:
                 'error': str(e)
             }
     
-    def cut_video(self, video_path, start_time, end_time, output_path=None):
-        """Videoyu belirtilen zaman aralığında kes"""
+    def fetch_video_metadata(self, url):
+        """Videoyu indirmeden bilgilerini al (bölüm indirme modu için)"""
         try:
-            if not output_path:
-                # Geçici dosya oluştur
-                output_path = str(self.temp_dir / f'cut_{datetime.now().timestamp()}.mp4')
+            info = self.ytdl.extract_info(url, 'metadata')
             
-            # FFmpeg ile kesme işlemi
-            stream = ffmpeg.input(video_path)
+            return {
+                'status': 'success',
+                'url': url,
+                'video_id': info['id'],
+                'title': info['title'],
+                'duration': info['duration'],
+                'thumbnail': info['thumbnail'],
+                'metadata': {
+                    'uploader': info.get('uploader', ''),
+                    'view_count': info.get('view_count', 0),
+                    'like_count': info.get('like_count', 0),
+                    'upload_date': info.get('upload_date', ''),
+                }
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def download_section(self, url, start_time, end_time):
+        """Videonun yalnızca [start_time, end_time] aralığını indir
+        
+        Kaynak videonun tamamı indirilmez; disk, bant genişliği ve süre kesit
+        uzunluğuyla orantılıdır. İnen dosya doğrudan kesit olarak kullanılabilir.
+        """
+        try:
+            if end_time <= start_time:
+                raise ValueError("Bitiş zamanı başlangıç zamanından büyük olmalı")
             
-            # Zaman aralığını ayarla
-            stream = stream.trim(start=start_time, end=end_time)
+            info = self.ytdl.extract_info(
+                url, 'video_720p',
+                download=True,
+                sections=[(start_time, end_time)]
+            )
             
-            # Ses ve görüntüyü birleştir
-            stream = ffmpeg.output(stream, output_path, acodec='aac', vcodec='h264')
+            return {
+                'status': 'success',
+                'output_path': info['requested_downloads'][0]['filepath'],
+                'start_time': start_time,
+                'end_time': end_time
+            }
             
-            # Kesme işlemini gerçekleştir
-            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    # Kesim noktası anahtar kareye bu kadar (saniye) yakınsa doğrudan kopyalanır
+    KEYFRAME_TOLERANCE = 0.1
+    # Sınır GOP'ları yeniden kodlanıp ortası kopyalanabilen (concat uyumlu) kodekler
+    SMART_CUT_CODECS = {'h264'}
+    # ffprobe profil adı -> libx264 profili; sınır parçaları kaynakla aynı profille kodlanır
+    X264_PROFILES = {
+        'Constrained Baseline': 'baseline',
+        'Baseline': 'baseline',
+        'Main': 'main',
+        'High': 'high',
+        'High 10': 'high10',
+        'High 4:2:2': 'high422',
+        'High 4:4:4 Predictive': 'high444'
+    }
+    
+    def cut_video(self, video_path, start_time, end_time, output_path=None, mode='auto'):
+        """Videoyu belirtilen zaman aralığında kes
+        
+        Args:
+            mode: 'auto' başlangıç anahtar kareye yakınsa kopyalar, değilse yalnızca
+                sınırdaki kısmi GOP'ları yeniden kodlar; 'copy' her zaman akış kopyalar
+                (başlangıç önceki anahtar kareye kayabilir); 'accurate' kare hassasiyetli
+                kesim yapar; 'reencode' tüm aralığı yeniden kodlar
+        
+        Returns:
+            Sonuç sözlüğünde kullanılan 'strategy' ve geçen süre 'elapsed' (saniye) bulunur
+        """
+        started = time.perf_counter()
+        try:
+            if mode not in ('auto', 'copy', 'accurate', 'reencode'):
+                raise ValueError(f'Bilinmeyen kesim modu: {mode}')
+            
+            if not output_path:
+                # Geçici dosya oluştur
+                output_path = str(self.temp_dir / f'cut_{datetime.now().timestamp()}.mp4')
+            
+            strategy = self._choose_cut_strategy(video_path, start_time, end_time, mode)
+            if strategy == 'copy':
+                self._copy_segment(video_path, start_time, end_time, output_path)
+            elif strategy == 'smart':
+                strategy = self._smart_cut(video_path, start_time, end_time, output_path)
+            else:
+                self._encode_segment(video_path, start_time, end_time, output_path)
             
             return {
                 'status': 'success',
-                'output_path': output_path
+                'output_path': output_path,
+                'strategy': strategy,
+                'elapsed': time.perf_counter() - started
             }
             
         except ffmpeg.Error as e:
             return {
                 'status': 'error',
-                'error': str(e.stderr, 'utf-8')
+                'error': str(e.stderr, 'utf-8'),
+                'elapsed': time.perf_counter() - started
             }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e),
+                'elapsed': time.perf_counter() - started
+            }
+    
+    def _choose_cut_strategy(self, video_path, start_time, end_time, mode):
+        """Kesim moduna ve anahtar karelere göre 'copy', 'smart' veya 'reencode' seç"""
+        if mode in ('copy', 'reencode'):
+            return mode
+        
+        keyframes = self._get_keyframes(video_path, start_time, end_time)
+        previous = [k for k in keyframes if k <= start_time + self.KEYFRAME_TOLERANCE]
+        if mode == 'auto' and previous and start_time - previous[-1] <= self.KEYFRAME_TOLERANCE:
+            # Başlangıç zaten anahtar karede; bitişte paket sınırında kesmek yeterli
+            return 'copy'
+        
+        if self._smart_cut_options(self._get_video_stream(video_path)) is not None:
+            return 'smart'
+        return 'reencode'
+    
+    def _get_packet_times(self, video_path, start_time, end_time):
+        """Aralık çevresindeki video paketlerinin (zaman, anahtar kare mi) listesi
+        
+        Kareler çözülmez; yalnızca paket bayrakları okunur, bu yüzden uzun videolarda da hızlıdır.
+        """
+        probe = ffmpeg.probe(
+            video_path,
+            select_streams='v:0',
+            show_entries='packet=pts_time,flags',
+            read_intervals=f'{max(start_time - 30, 0)}%{end_time}'
+        )
+        return sorted(
+            (float(packet['pts_time']), 'K' in packet.get('flags', ''))
+            for packet in probe.get('packets', [])
+            if packet.get('pts_time') not in (None, 'N/A')
+        )
+    
+    def _get_keyframes(self, video_path, start_time, end_time):
+        """Aralık çevresindeki anahtar karelerin zamanlarını döndür"""
+        return [pts for pts, key in self._get_packet_times(video_path, start_time, end_time) if key]
+    
+    def _get_video_stream(self, video_path):
+        """İlk video akışının ffprobe bilgisi (yoksa None)"""
+        probe = ffmpeg.probe(video_path, select_streams='v:0')
+        streams = probe.get('streams', [])
+        return streams[0] if streams else None
+    
+    def _has_audio(self, video_path):
+        probe = ffmpeg.probe(video_path, select_streams='a:0')
+        return bool(probe.get('streams'))
+    
+    def _smart_cut_options(self, stream):
+        """Sınır parçalarını kaynakla uyumlu kodlayacak libx264 ayarları
+        
+        Kopyalanan orta kısımla birleşebilmesi için profil, seviye, piksel formatı
+        ve zaman ölçeği kaynaktan alınır. Kodek veya profil desteklenmiyorsa None.
+        """
+        if not stream or stream.get('codec_name') not in self.SMART_CUT_CODECS:
+            return None
+        profile = self.X264_PROFILES.get(stream.get('profile'))
+        pix_fmt = stream.get('pix_fmt')
+        if not profile or not pix_fmt:
+            return None
+        
+        options = {'vcodec': 'libx264', 'profile:v': profile, 'pix_fmt': pix_fmt}
+        level = int(stream.get('level') or 0)
+        if level > 0:
+            options['level'] = f'{level / 10:g}'
+        frame_rate = stream.get('r_frame_rate')
+        if frame_rate and frame_rate != '0/0':
+            options['r'] = frame_rate
+        return options
+    
+    @staticmethod
+    def _timescale(stream):
+        """Video akışının zaman ölçeği: time_base '1/15360' -> 15360"""
+        _, _, denominator = (stream.get('time_base') or '').partition('/')
+        return int(denominator) if denominator.isdigit() else None
+    
+    def _copy_segment(self, video_path, start_time, end_time, output_path):
+        """Giriş tarafında arayıp yeniden kodlamadan kopyala"""
+        stream = ffmpeg.input(video_path, ss=start_time, t=end_time - start_time)
+        stream = ffmpeg.output(stream, output_path, c='copy', avoid_negative_ts='make_zero')
+        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+    
+    def _encode_segment(self, video_path, start_time, end_time, output_path):
+        """Aralığı h264/aac olarak yeniden kodla (giriş tarafı arama kare hassasiyetlidir)"""
+        stream = ffmpeg.input(video_path, ss=start_time, t=end_time - start_time)
+        stream = ffmpeg.output(stream, output_path, acodec='aac', vcodec='h264')
+        ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+    
+    def _smart_cut(self, video_path, start_time, end_time, output_path):
+        """Yalnızca sınırlardaki kısmi GOP'ları yeniden kodla, aradaki GOP'ları kopyala
+        
+        [başlangıç, ilk anahtar kare) ve [son anahtar kare, bitiş) kaynağın profil,
+        seviye, piksel formatı ve kare hızıyla yeniden kodlanır; aradaki kısım akış
+        kopyalanır. Tüm parçalar kaynağın zaman ölçeğiyle MP4 olarak yazılır ve concat
+        demuxer ile yeniden kodlanmadan birleştirilir.
+        Ses parça sınırlarında kayma olmaması için tüm aralık boyunca tek seferde
+        AAC olarak kodlanır. Aralıkta anahtar kare yoksa tamamı yeniden kodlanır.
+        Kullanılan stratejiyi döndürür.
+        """
+        tolerance = self.KEYFRAME_TOLERANCE
+        video = self._get_video_stream(video_path)
+        options = self._smart_cut_options(video)
+        packets = self._get_packet_times(video_path, start_time, end_time)
+        inner = [pts for pts, key in packets if key and start_time - tolerance <= pts <= end_time - tolerance]
+        if options is None or not inner:
+            self._encode_segment(video_path, start_time, end_time, output_path)
+            return 'reencode'
+        
+        first_key, last_key = inner[0], inner[-1]
+        boundaries = [('encode', start_time, first_key), ('copy', first_key, last_key), ('encode', last_key, end_time)]
+        # Kopyada -t süresi paket sırasına göre işlediğinden sonraki GOP'tan kare
+        # sızabilir; kopya kısmı bu yüzden kare sayısıyla sınırlanır
+        copy_frames = sum(1 for pts, _ in packets if first_key - 1e-3 <= pts < last_key - 1e-3)
+        timescale = self._timescale(video)
+        
+        stamp = datetime.now().timestamp()
+        parts = []
+        try:
+            for index, (kind, part_start, part_end) in enumerate(boundaries):
+                if part_end - part_start <= tolerance:
+                    continue
+                part_path = str(self.temp_dir / f'part_{stamp}_{index}.mp4')
+                stream = ffmpeg.input(video_path, ss=part_start).video
+                if kind == 'copy':
+                    part_options = {'vcodec': 'copy', 'frames:v': copy_frames}
+                else:
+                    part_options = dict(options, t=part_end - part_start)
+                if timescale:
+                    part_options['video_track_timescale'] = timescale
+                stream = ffmpeg.output(stream, part_path, **part_options)
+                ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+                parts.append(part_path)
+            
+            list_path = self.temp_dir / f'parts_{stamp}.txt'
+            list_path.write_text(''.join(f"file '{part}'\n" for part in parts), encoding='utf-8')
+            parts.append(str(list_path))
+            
+            streams = [ffmpeg.input(str(list_path), format='concat', safe=0).video]
+            output_options = {'vcodec': 'copy'}
+            if self._has_audio(video_path):
+                streams.append(ffmpeg.input(video_path, ss=start_time, t=end_time - start_time).audio)
+                output_options['acodec'] = 'aac'
+            if timescale:
+                output_options['video_track_timescale'] = timescale
+            
+            stream = ffmpeg.output(*streams, output_path, **output_options)
+            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+            return 'smart'
+        finally:
+            for part in parts:
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
     
     def generate_thumbnail(self, video_path, time_position, output_path=None):
         """Videodan belirli bir anda thumbnail oluştur"""
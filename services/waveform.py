@@ -0,0 +1,171 @@
+import os
+import logging
+import ffmpeg
+import numpy as np
+
+logger = logging.getLogger('DigiCollect.Waveform')
+
+
+class WaveformPeaks:
+    """Çok çözünürlüklü min/max tepe dizileri
+
+    Seviye 0 en ince çözünürlüktür; her sonraki seviye bir öncekinin iki
+    kovasını birleştirir. Çizim için istenen genişliğe en yakın seviye seçilir,
+    böylece yakınlaştırma ve yeniden boyutlandırma yalnızca dizi dilimlemesidir.
+    """
+
+    def __init__(self, sample_rate, bucket_size, duration, levels):
+        self.sample_rate = sample_rate
+        self.bucket_size = bucket_size
+        self.duration = duration
+        self.levels = levels  # [(mins, maxs), ...]
+
+    def seconds_per_bucket(self, level):
+        """Verilen seviyede bir kovanın kapsadığı süre (saniye)"""
+        return self.bucket_size * (2 ** level) / self.sample_rate
+
+    def level_for(self, span, width):
+        """span saniyede width'ten az kova kalmayan en kaba seviyeyi seç"""
+        level = 0
+        for index in range(len(self.levels)):
+            if span / self.seconds_per_bucket(index) < width:
+                break
+            level = index
+        return level
+
+    def window(self, start, end, width):
+        """[start, end) saniye aralığını en fazla width sütuna indirip -1..1 aralığında döndür"""
+        width = int(width)
+        if width <= 0 or end <= start or not self.levels:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+        level = self.level_for(end - start, width)
+        mins, maxs = self.levels[level]
+        seconds_per_bucket = self.seconds_per_bucket(level)
+        first = min(int(start / seconds_per_bucket), len(mins))
+        last = min(max(int(np.ceil(end / seconds_per_bucket)), first + 1), len(mins))
+        mins, maxs = mins[first:last], maxs[first:last]
+        if len(mins) == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+        if len(mins) > width:
+            # Kalan fazlalığı sütun sınırlarında tek adımda indir
+            edges = np.linspace(0, len(mins), width + 1).astype(np.int64)[:-1]
+            mins = np.minimum.reduceat(mins, edges)
+            maxs = np.maximum.reduceat(maxs, edges)
+
+        scale = np.float32(1 / 32768)
+        return mins.astype(np.float32) * scale, maxs.astype(np.float32) * scale
+
+
+def zoom_range(start, end, duration, margin=0.1):
+    """Seçimi her iki yanda seçim uzunluğunun margin katı kadar payla çevreleyen görünüm aralığı
+
+    Sonuç [0, duration] içinde kalır; seçim geçersizse (0, 0) döner, bu da
+    WaveformView'da parçanın tamamı anlamına gelir.
+    """
+    if duration <= 0 or end <= start:
+        return 0, 0
+    pad = (end - start) * margin
+    return max(start - pad, 0), min(end + pad, duration)
+
+
+class WaveformEngine:
+    """Ses dosyasını bir kez PCM'e çözüp tepe dosyasını üreten motor
+
+    Tepe dosyası ses dosyasının yanına '<ses>.peaks.npz' olarak kaydedilir ve
+    ses dosyası değişmedikçe yeniden kullanılır.
+    """
+
+    def __init__(self, sample_rate=8000, bucket_size=64, level_count=10):
+        """
+        Args:
+            sample_rate: Çözümleme için kullanılacak mono örnekleme hızı
+            bucket_size: En ince seviyede bir kovadaki örnek sayısı
+            level_count: Üretilecek çözünürlük seviyesi sayısı
+        """
+        self.sample_rate = sample_rate
+        self.bucket_size = bucket_size
+        self.level_count = level_count
+
+    @staticmethod
+    def peaks_path(audio_path):
+        """Ses dosyasına ait tepe dosyasının yolu"""
+        return f'{audio_path}.peaks.npz'
+
+    def build(self, audio_path, force=False):
+        """Tepe dosyasını üret (güncel bir dosya varsa dokunmadan yolunu döndür)"""
+        peaks_path = self.peaks_path(audio_path)
+        if not force and os.path.exists(peaks_path) and \
+                os.path.getmtime(peaks_path) >= os.path.getmtime(audio_path):
+            return peaks_path
+
+        samples = self._decode(audio_path)
+        levels = self._compute_levels(samples)
+
+        arrays = {
+            'sample_rate': np.int64(self.sample_rate),
+            'bucket_size': np.int64(self.bucket_size),
+            'duration': np.float64(len(samples) / self.sample_rate)
+        }
+        for index, (mins, maxs) in enumerate(levels):
+            arrays[f'min_{index}'] = mins
+            arrays[f'max_{index}'] = maxs
+
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yaz
+        tmp_path = f'{peaks_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, peaks_path)
+
+        logger.debug(f'Tepe dosyası oluşturuldu: {peaks_path} ({len(levels)} seviye)')
+        return peaks_path
+
+    def load(self, audio_path):
+        """Tepe dosyasını yükle, yoksa önce üret"""
+        with np.load(self.build(audio_path)) as data:
+            levels = []
+            index = 0
+            while f'min_{index}' in data:
+                levels.append((data[f'min_{index}'], data[f'max_{index}']))
+                index += 1
+            return WaveformPeaks(
+                int(data['sample_rate']),
+                int(data['bucket_size']),
+                float(data['duration']),
+                levels
+            )
+
+    def _decode(self, audio_path):
+        """Sesi tek seferde 16 bit mono PCM'e çöz"""
+        out, _ = (
+            ffmpeg
+            .input(audio_path)
+            .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar=self.sample_rate)
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+        return np.frombuffer(out, dtype=np.int16)
+
+    def _compute_levels(self, samples):
+        """Örneklerden vektörel min/max seviyeleri hesapla"""
+        if len(samples) == 0:
+            return []
+
+        # Son kovayı sessizlik yerine son örnekle doldur ki tepe değerleri bozulmasın
+        remainder = (-len(samples)) % self.bucket_size
+        if remainder:
+            samples = np.concatenate([samples, np.full(remainder, samples[-1], dtype=np.int16)])
+
+        buckets = samples.reshape(-1, self.bucket_size)
+        mins, maxs = buckets.min(axis=1), buckets.max(axis=1)
+        levels = [(mins, maxs)]
+
+        while len(levels) < self.level_count and len(mins) > 1:
+            if len(mins) % 2:
+                mins = np.append(mins, mins[-1])
+                maxs = np.append(maxs, maxs[-1])
+            mins = mins.reshape(-1, 2).min(axis=1)
+            maxs = maxs.reshape(-1, 2).max(axis=1)
+            levels.append((mins, maxs))
+
+        return levels
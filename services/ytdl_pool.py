@@ -0,0 +1,177 @@
+import copy
+import time
+import queue
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+import yt_dlp
+from yt_dlp.utils import download_range_func
+from services.metadata_cache import normalize_url
+
+logger = logging.getLogger('DigiCollect.YoutubeDLPool')
+
+TEMP_DIR = Path(tempfile.gettempdir()) / 'digicollect'
+
+# Seçenek profilleri; her profil için ayrı, uzun ömürlü YoutubeDL örnekleri tutulur
+PROFILES = {
+    'metadata': {
+        'format': 'best',
+        'extract_flat': True,
+        'no_warnings': True,
+        'quiet': True
+    },
+    'video_720p': {
+        'format': 'best[height<=720]',  # 720p veya daha düşük kalite
+        # Bölüm indirmelerinde dosya adına aralık eklenir: <id>_<başlangıç>-<bitiş>.<ext>
+        'outtmpl': str(TEMP_DIR / '%(id)s%(section_start&_{}|)s%(section_end&-{}|)s.%(ext)s'),
+        'quiet': True,
+        'no_warnings': True,
+    },
+    'audio_mp3': {
+        'format': 'bestaudio/best',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '192',
+        }],
+        'outtmpl': str(TEMP_DIR / '%(id)s.%(ext)s'),
+        'quiet': True,
+        'no_warnings': True,
+    }
+}
+
+
+class YoutubeDLPool:
+    """Profil başına yeniden kullanılan YoutubeDL örnekleri ve kısa ömürlü extract_info önbelleği"""
+
+    def __init__(self, size=2, info_ttl=300, max_cached_infos=128):
+        """
+        Args:
+            size: Her profil için oluşturulacak en fazla YoutubeDL örneği
+            info_ttl: Çıkarılmış sayfa bilgisinin saklanma süresi (saniye)
+            max_cached_infos: Önbellekte tutulacak en fazla sayfa bilgisi
+        """
+        TEMP_DIR.mkdir(exist_ok=True)
+        self.size = size
+        self.info_ttl = info_ttl
+        self.max_cached_infos = max_cached_infos
+
+        self._idle = {profile: queue.LifoQueue() for profile in PROFILES}
+        self._created = {profile: [] for profile in PROFILES}
+        self._lock = threading.Lock()
+
+        self._infos = {}
+        self._infos_lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self, profile, **overrides):
+        """Profile ait bir YoutubeDL örneğini özel kullanım için al, iş bitince havuza geri koy
+
+        overrides ile verilen seçenekler yalnızca bu kullanım süresince uygulanır.
+        """
+        ydl = self._acquire(profile)
+        missing = object()
+        previous = {name: ydl.params.get(name, missing) for name in overrides}
+        ydl.params.update(overrides)
+        try:
+            yield ydl
+        finally:
+            for name, value in previous.items():
+                if value is missing:
+                    ydl.params.pop(name, None)
+                else:
+                    ydl.params[name] = value
+            self._idle[profile].put(ydl)
+
+    def extract_info(self, url, profile='metadata', download=False, sections=None):
+        """URL bilgisini profile göre işle; sayfa çıkarımı kısa süreliğine önbelleklenir
+
+        Aynı URL için önce meta veri sorgusu, ardından indirme yapılırsa sayfa
+        ikinci kez çıkarılmaz; önbellekteki ham sonuç indirme profiliyle işlenir.
+
+        Args:
+            sections: [(başlangıç, bitiş), ...] saniye aralıkları verilirse yalnızca
+                bu aralıklar indirilir (HTTP aralık isteği / HLS-DASH segment seçimi)
+        """
+        key = normalize_url(url)
+        raw = self._get_cached_info(key)
+
+        overrides = {}
+        if sections:
+            overrides = {
+                'download_ranges': download_range_func(None, list(sections)),
+                # Kesim noktalarında anahtar kare zorlanır, yalnızca kısa kesit yeniden kodlanır
+                'force_keyframes_at_cuts': True
+            }
+
+        with self.checkout(profile, **overrides) as ydl:
+            if raw is None:
+                raw = ydl.extract_info(url, download=False, process=False)
+                self._store_info(key, raw)
+            else:
+                logger.debug(f'Sayfa bilgisi önbellekten kullanıldı: {url}')
+
+            # process_ie_result sözlüğü değiştirdiği için önbellekteki kopyaya dokunma
+            return ydl.process_ie_result(copy.deepcopy(raw), download=download)
+
+    def close(self):
+        """Havuzdaki tüm örnekleri kapat"""
+        with self._lock:
+            for profile, instances in self._created.items():
+                for ydl in instances:
+                    ydl.close()
+                instances.clear()
+                self._idle[profile] = queue.LifoQueue()
+
+    def _acquire(self, profile):
+        if profile not in PROFILES:
+            raise ValueError(f'Bilinmeyen yt-dlp profili: {profile}')
+
+        try:
+            return self._idle[profile].get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._created[profile]) < self.size:
+                ydl = yt_dlp.YoutubeDL(copy.deepcopy(PROFILES[profile]))
+                self._created[profile].append(ydl)
+                logger.debug(f'Yeni YoutubeDL örneği oluşturuldu: {profile}')
+                return ydl
+
+        # Sınıra ulaşıldı, boşa çıkan bir örneği bekle
+        return self._idle[profile].get()
+
+    def _get_cached_info(self, key):
+        with self._infos_lock:
+            entry = self._infos.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            self._infos.pop(key, None)
+            return None
+
+    def _store_info(self, key, info):
+        now = time.monotonic()
+        with self._infos_lock:
+            # Süresi dolanları, sonra gerekirse en eskileri at
+            for stale in [k for k, (expires, _) in self._infos.items() if expires <= now]:
+                del self._infos[stale]
+            while len(self._infos) >= self.max_cached_infos:
+                self._infos.pop(next(iter(self._infos)))
+            self._infos[key] = (now + self.info_ttl, info)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_ytdl_pool():
+    """Uygulama genelinde paylaşılan yt-dlp havuzunu döndür"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = YoutubeDLPool()
+    return _pool
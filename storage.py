@@ -1,85 +1,185 @@
 import os
-import sqlite3
-import shutil
-from typing import Optional, BinaryIO
+import mmap
+import hashlib
+import logging
+import threading
+import weakref
+from typing import Optional, BinaryIO, Iterable, Iterator
 from datetime import datetime
 import uuid
 from pathlib import Path
+from contextlib import contextmanager
+from db_engine import connect_sqlite
+
+logger = logging.getLogger('DigiCollect.Storage')
+
+# Akış işlemlerinde kullanılan sabit parça boyutu
+CHUNK_SIZE = 1024 * 1024
 
 class Storage:
-    def __init__(self):
+    """Yerel dosya deposu
+
+    Dosya içerikleri SHA-256 özetine göre 'blobs/ab/cd/<özet>' altında bir kez
+    saklanır; 'files' tablosu mantıksal dosya adlarını bu bloblara bağlar. Aynı
+    içeriğin yeniden yüklenmesi ve kopyalama yalnızca meta veri işlemidir.
+    Referansı kalmayan bloblar arka plandaki çöp toplayıcı tarafından silinir.
+    """
+    
+    def __init__(self, gc_interval: Optional[float] = 600, gc_grace: float = 300):
+        """
+        Args:
+            gc_interval: Arka plan çöp toplama aralığı (saniye), None ise kapalı
+            gc_grace: Referansı biten blobun silinmeden önce bekleyeceği süre (saniye)
+        """
         # Ana depolama klasörünü oluştur
         self.storage_path = Path("storage")
         self.storage_path.mkdir(exist_ok=True)
+        self.blob_path = self.storage_path / "blobs"
+        self.blob_path.mkdir(exist_ok=True)
+        self.gc_grace = gc_grace
         
-        # Veritabanı bağlantısını oluştur
+        # Veritabanı bağlantısını oluştur (çöp toplayıcı iş parçacığı da kullanır)
         self.db_path = self.storage_path / "storage.db"
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = connect_sqlite(self.db_path)
+        self._lock = threading.RLock()
         self.create_tables()
+        
+        self._gc_stop = threading.Event()
+        self._gc_thread = None
+        if gc_interval:
+            self.start_gc(gc_interval)
     
     def create_tables(self):
         """Gerekli tabloları oluştur"""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS files (
-                id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                original_name TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                file_size INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        self.conn.commit()
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    original_name TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_size INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    ref_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    released_at TIMESTAMP
+                )
+            """)
+            
+            # Eski veritabanlarına blob sütununu ekle; NULL olan kayıtlar file_path'teki dosyayı kullanır
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(files)")]
+            if 'blob_hash' not in columns:
+                cursor.execute("ALTER TABLE files ADD COLUMN blob_hash TEXT")
+            
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_file_path ON files (file_path)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_blobs_released ON blobs (released_at) WHERE ref_count = 0")
+            self.conn.commit()
     
     def upload_file(self, name: str, file: BinaryIO) -> Optional[str]:
         """Dosya yükle ve dosya adını döndür"""
+        return self.upload_stream(name, file)
+    
+    def upload_stream(self, name: str, file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Optional[str]:
+        """Dosyayı sabit boyutlu parçalarla yükle; bellekte aynı anda tek parça tutulur
+        
+        İçerik diske yazılırken özetlenir, ikinci bir okuma yapılmaz.
+        """
         try:
-            # Dosya yolu oluştur
-            file_path = self.storage_path / name
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Dosyayı kaydet
-            with open(file_path, 'wb') as f:
-                f.write(file.read())
-            
-            # Veritabanına kaydet
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "INSERT INTO files (id, user_id, original_name, file_path, file_size) VALUES (?, ?, ?, ?, ?)",
-                (str(uuid.uuid4()), name.split('/')[0], name.split('/')[-1], str(file_path), file_path.stat().st_size)
-            )
-            self.conn.commit()
-            
+            blob_hash, size = self._store_blob(iter(lambda: file.read(chunk_size), b''))
+            self._link(name, blob_hash, size)
             return name
         except Exception as e:
             print(f"Dosya yükleme hatası: {str(e)}")
             return None
     
+    def upload_path(self, name: str, local_path: str, chunk_size: int = CHUNK_SIZE) -> Optional[str]:
+        """Yerel dosyayı (ör. kesilmiş video) akış halinde depoya yükle"""
+        try:
+            with open(local_path, 'rb') as f:
+                return self.upload_stream(name, f, chunk_size)
+        except OSError as e:
+            print(f"Dosya yükleme hatası: {str(e)}")
+            return None
+    
     def download_file(self, name: str) -> Optional[bytes]:
-        """Dosyayı indir"""
+        """Dosyayı indir (büyük dosyalar için open_stream veya read_range kullanın)"""
         try:
-            file_path = self.storage_path / name
-            with open(file_path, 'rb') as f:
+            with open(self._resolve(name), 'rb') as f:
                 return f.read()
         except Exception as e:
             print(f"Dosya indirme hatası: {str(e)}")
             return None
     
+    @contextmanager
+    def open_stream(self, name: str, chunk_size: int = CHUNK_SIZE,
+                    start: int = 0, end: Optional[int] = None) -> Iterator[Iterator[bytes]]:
+        """Dosyanın [start, end) bayt aralığını sabit boyutlu parçalar halinde veren yineleyici
+        
+        Dosya bağlamdan çıkınca kapatılır; yineleyici sonuna kadar tüketilmese
+        de tanıtıcı açık kalmaz. Dosya bulunamazsa bağlama girerken
+        FileNotFoundError fırlatır.
+        """
+        with open(self._resolve(name), 'rb') as f:
+            yield self._iter_chunks(f, chunk_size, start, end)
+    
+    def read_range(self, name: str, offset: int, length: int) -> Optional[bytes]:
+        """Dosyanın offset'ten başlayan en fazla length baytını oku (kısmi içerik)"""
+        try:
+            with open(self._resolve(name), 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        except Exception as e:
+            print(f"Dosya aralığı okuma hatası: {str(e)}")
+            return None
+    
+    @contextmanager
+    def open_mmap(self, name: str) -> Iterator[memoryview]:
+        """Dosyayı salt okunur eşle ve üzerinde kopyasız bir memoryview ver
+        
+        Dilimler de kopyasızdır; ancak bağlam dışında tutulmamalıdır, eşleme
+        bağlamdan çıkınca kapatılır.
+        """
+        with open(self._resolve(name), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Boş dosya eşlenemez
+                yield memoryview(b'')
+                return
+            
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+                try:
+                    mapped.close()
+                except BufferError:
+                    # Dışarı sızan bir dilim varsa eşleme çöp toplayıcıyla kapanır
+                    logger.warning(f'Bellek eşlemesi açık dilimler nedeniyle hemen kapatılamadı: {name}')
+    
     def delete_file(self, name: str) -> bool:
         """Dosyayı sil"""
         try:
             file_path = self.storage_path / name
-            if file_path.exists():
-                file_path.unlink()
+            with self._lock:
+                rows = self._get_rows(file_path)
+                if not rows:
+                    # Veritabanında olmayan eski dosya
+                    if file_path.exists():
+                        file_path.unlink()
+                        return True
+                    return False
                 
-                # Veritabanından sil
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM files WHERE file_path = ?", (str(file_path),))
+                self._unlink_rows(file_path, rows)
                 self.conn.commit()
-                
                 return True
-            return False
         except Exception as e:
             print(f"Dosya silme hatası: {str(e)}")
             return False
@@ -87,7 +187,7 @@ class Storage:
     def get_file_url(self, name: str) -> Optional[str]:
         """Dosyanın yerel yolunu al"""
         try:
-            file_path = self.storage_path / name
+            file_path = self._resolve(name)
             return str(file_path.absolute()) if file_path.exists() else None
         except Exception as e:
             print(f"Dosya yolu alma hatası: {str(e)}")
@@ -96,12 +196,13 @@ class Storage:
     def list_files(self, prefix: str = "") -> list:
         """Dosyaları listele"""
         try:
-            cursor = self.conn.cursor()
-            if prefix:
-                cursor.execute("SELECT file_path FROM files WHERE user_id = ?", (prefix,))
-            else:
-                cursor.execute("SELECT file_path FROM files")
-            return [Path(row[0]).name for row in cursor.fetchall()]
+            with self._lock:
+                cursor = self.conn.cursor()
+                if prefix:
+                    cursor.execute("SELECT file_path FROM files WHERE user_id = ?", (prefix,))
+                else:
+                    cursor.execute("SELECT file_path FROM files")
+                return [Path(row[0]).name for row in cursor.fetchall()]
         except Exception as e:
             print(f"Dosya listeleme hatası: {str(e)}")
             return []
@@ -116,6 +217,10 @@ class Storage:
     def get_file_size(self, name: str) -> Optional[int]:
         """Dosya boyutunu al"""
         try:
+            with self._lock:
+                rows = self._get_rows(self.storage_path / name)
+            if rows:
+                return rows[-1][2]
             file_path = self.storage_path / name
             return file_path.stat().st_size if file_path.exists() else None
         except Exception as e:
@@ -123,28 +228,187 @@ class Storage:
             return None
     
     def copy_file(self, source: str, destination: str) -> bool:
-        """Dosyayı kopyala"""
+        """Dosyayı kopyala (içerik kopyalanmaz, aynı blob'a yeni bir referans eklenir)"""
         try:
             source_path = self.storage_path / source
-            dest_path = self.storage_path / destination
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            shutil.copy2(source_path, dest_path)
-            
-            # Yeni dosyayı veritabanına ekle
+            with self._lock:
+                rows = self._get_rows(source_path)
+                if rows and rows[-1][1]:
+                    blob_hash, size = rows[-1][1], rows[-1][2]
+                else:
+                    # Eski düzende saklanan kaynağı önce blob deposuna taşı
+                    blob_hash, size = self._adopt_legacy(source, source_path)
+                
+                self._link(destination, blob_hash, size)
+            return True
+        except Exception as e:
+            print(f"Dosya kopyalama hatası: {str(e)}")
+            return False
+    
+    def collect_garbage(self) -> int:
+        """Referansı kalmamış ve bekleme süresi dolmuş blobları sil, silinen sayısını döndür"""
+        removed = 0
+        with self._lock:
             cursor = self.conn.cursor()
             cursor.execute(
-                "INSERT INTO files (id, user_id, original_name, file_path, file_size) VALUES (?, ?, ?, ?, ?)",
-                (str(uuid.uuid4()), destination.split('/')[0], destination.split('/')[-1], str(dest_path), dest_path.stat().st_size)
+                "SELECT hash FROM blobs WHERE ref_count = 0 AND released_at <= datetime('now', ?)",
+                (f'-{int(self.gc_grace)} seconds',)
             )
+            for (blob_hash,) in cursor.fetchall():
+                cursor.execute("DELETE FROM blobs WHERE hash = ? AND ref_count = 0", (blob_hash,))
+                if cursor.rowcount:
+                    try:
+                        self._blob_file(blob_hash).unlink()
+                    except FileNotFoundError:
+                        pass
+                    removed += 1
             self.conn.commit()
+        
+        if removed:
+            logger.info(f'Çöp toplama: {removed} blob silindi')
+        return removed
+    
+    def start_gc(self, interval: float = 600):
+        """Arka plan çöp toplayıcısını başlat"""
+        if self._gc_thread and self._gc_thread.is_alive():
+            return
+        self._gc_stop.clear()
+        self._gc_thread = threading.Thread(
+            target=self._gc_loop, args=(weakref.ref(self), self._gc_stop, interval), name='DigiCollect-storage-gc', daemon=True
+        )
+        self._gc_thread.start()
+    
+    def stop_gc(self):
+        """Arka plan çöp toplayıcısını durdur"""
+        self._gc_stop.set()
+    
+    @staticmethod
+    def _gc_loop(storage_ref, stop, interval):
+        # Zayıf referans: iş parçacığı Storage nesnesinin silinmesini engellemez
+        while not stop.wait(interval):
+            storage = storage_ref()
+            if storage is None:
+                return
+            try:
+                storage.collect_garbage()
+            except Exception as e:
+                logger.exception(f'Çöp toplama hatası: {e}')
+            finally:
+                del storage
+    
+    @staticmethod
+    def _iter_chunks(f, chunk_size, start, end):
+        f.seek(start)
+        remaining = None if end is None else max(end - start, 0)
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    
+    def _blob_file(self, blob_hash: str) -> Path:
+        """Blob'un parçalanmış dizindeki yolu: blobs/ab/cd/<özet>"""
+        return self.blob_path / blob_hash[:2] / blob_hash[2:4] / blob_hash
+    
+    def _store_blob(self, chunks: Iterable[bytes]):
+        """İçeriği yazarken özetle; blob zaten varsa yeni dosya bırakmaz. (özet, boyut) döndürür"""
+        tmp_path = self.blob_path / f'.tmp_{uuid.uuid4().hex}'
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
             
-            return True
-        except Exception as e:
-            print(f"Dosya kopyalama hatası: {str(e)}")
-            return False
+            blob_hash = digest.hexdigest()
+            target = self._blob_file(blob_hash)
+            # Çöp toplayıcı ile yarışmamak için yerleştirme kilit altında yapılır
+            with self._lock:
+                if target.exists():
+                    tmp_path.unlink()
+                else:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp_path, target)
+                # Henüz bağlanmamış blob da bekleme süresi boyunca korunur
+                self.conn.execute(
+                    "INSERT INTO blobs (hash, size, ref_count, released_at) VALUES (?, ?, 0, CURRENT_TIMESTAMP) "
+                    "ON CONFLICT(hash) DO UPDATE SET "
+                    "released_at = CASE WHEN ref_count = 0 THEN CURRENT_TIMESTAMP ELSE released_at END",
+                    (blob_hash, size)
+                )
+            return blob_hash, size
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def _link(self, name: str, blob_hash: str, size: int):
+        """Mantıksal adı blob'a bağla; ad zaten varsa eski içeriğin referansını bırak"""
+        file_path = self.storage_path / name
+        with self._lock:
+            cursor = self.conn.cursor()
+            # Yeni referans eskisinden önce eklenir ki aynı içerik yeniden yüklenirken blob serbest kalmasın
+            cursor.execute(
+                "UPDATE blobs SET ref_count = ref_count + 1, released_at = NULL WHERE hash = ?",
+                (blob_hash,)
+            )
+            self._unlink_rows(file_path, self._get_rows(file_path))
+            cursor.execute(
+                "INSERT INTO files (id, user_id, original_name, file_path, file_size, blob_hash) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(uuid.uuid4()), name.split('/')[0], name.split('/')[-1], str(file_path), size, blob_hash)
+            )
+            self.conn.commit()
+    
+    def _unlink_rows(self, file_path: Path, rows):
+        """Mantıksal adın kayıtlarını sil, blob referanslarını bırak, eski düzen dosyasını kaldır"""
+        cursor = self.conn.cursor()
+        for _, blob_hash, _ in rows:
+            if blob_hash:
+                cursor.execute(
+                    "UPDATE blobs SET ref_count = ref_count - 1, "
+                    "released_at = CASE WHEN ref_count - 1 <= 0 THEN CURRENT_TIMESTAMP ELSE released_at END "
+                    "WHERE hash = ?",
+                    (blob_hash,)
+                )
+        cursor.execute("DELETE FROM files WHERE file_path = ?", (str(file_path),))
+        if any(not blob_hash for _, blob_hash, _ in rows) and file_path.exists():
+            file_path.unlink()
+    
+    def _get_rows(self, file_path: Path):
+        """Mantıksal ada ait (id, blob_hash, file_size) kayıtları, en yenisi sonda"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT id, blob_hash, file_size FROM files WHERE file_path = ? ORDER BY rowid",
+            (str(file_path),)
+        )
+        return cursor.fetchall()
+    
+    def _adopt_legacy(self, name: str, file_path: Path):
+        """Eski düzende adıyla saklanan dosyayı blob deposuna taşı"""
+        with open(file_path, 'rb') as f:
+            blob_hash, size = self._store_blob(iter(lambda: f.read(CHUNK_SIZE), b''))
+        with self._lock:
+            self._link(name, blob_hash, size)
+            # Kaydı hiç olmayan eski dosyayı _link silmez; içerik artık blobda
+            if file_path.exists():
+                file_path.unlink()
+        return blob_hash, size
+    
+    def _resolve(self, name: str) -> Path:
+        """Mantıksal adın diskteki gerçek yolunu bul"""
+        file_path = self.storage_path / name
+        with self._lock:
+            rows = self._get_rows(file_path)
+        if rows and rows[-1][1]:
+            return self._blob_file(rows[-1][1])
+        return file_path
     
     def __del__(self):
         """Veritabanı bağlantısını kapat"""
+        if hasattr(self, '_gc_stop'):
+            self._gc_stop.set()
         if hasattr(self, 'conn'):
             self.conn.close()
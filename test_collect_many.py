@@ -0,0 +1,102 @@
+import time
+import asyncio
+import threading
+from collections import defaultdict
+from content_collector import ContentCollector
+
+# collect_many ağa çıkmadan sınanır: _collect_content yerine süren işleri
+# sayan, gecikmeli bir toplayıcı konur.
+
+
+class Tracker:
+    """Aynı anda çalışan toplama işlerini genelde ve domain bazında say"""
+
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.domain_running = defaultdict(int)
+        self.domain_peak = defaultdict(int)
+
+    def __call__(self, url):
+        domain = ContentCollector._get_domain(url)
+        with self.lock:
+            self.running += 1
+            self.domain_running[domain] += 1
+            self.peak = max(self.peak, self.running)
+            self.domain_peak[domain] = max(self.domain_peak[domain], self.domain_running[domain])
+        try:
+            time.sleep(self.delays.get(url, 0.02))
+            if url in self.failing:
+                raise RuntimeError('bağlantı koptu')
+            return {'type': 'webpage', 'title': url}
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.domain_running[domain] -= 1
+
+
+def run(collector, urls, **kwargs):
+    async def gather():
+        return [result async for result in collector.collect_many(urls, **kwargs)]
+    return asyncio.run(gather())
+
+
+def collector_with(tracker):
+    collector = ContentCollector()
+    collector._collect_content = tracker
+    return collector
+
+
+def test_global_and_per_domain_limits():
+    urls = [f'https://a.example.com/{i}' for i in range(12)]
+    urls += [f'https://site{i}.example.com/' for i in range(12)]
+    tracker = Tracker()
+    results = run(collector_with(tracker), urls, max_concurrency=5, per_domain_limit=2)
+
+    assert sorted(r['url'] for r in results) == sorted(urls)
+    assert all(r['status'] == 'success' for r in results)
+    assert tracker.peak == 5
+    assert tracker.domain_peak['a.example.com'] == 2
+    # www öneki aynı domain sayılır
+    tracker = Tracker()
+    run(collector_with(tracker), [f'https://{w}b.example.com/{w}{i}' for i in range(6) for w in ('', 'www.')],
+        max_concurrency=8, per_domain_limit=3)
+    assert tracker.domain_peak['b.example.com'] == 3
+
+
+def test_results_are_yielded_as_they_complete():
+    delays = {'https://a.example.com/yavas': 0.3, 'https://b.example.com/orta': 0.15, 'https://c.example.com/hizli': 0.0}
+    collector = collector_with(Tracker(delays))
+
+    async def first_arrivals():
+        arrivals = []
+        start = time.monotonic()
+        async for result in collector.collect_many(list(delays)):
+            arrivals.append((result['url'], time.monotonic() - start))
+        return arrivals
+
+    arrivals = asyncio.run(first_arrivals())
+    assert [url for url, _ in arrivals] == list(reversed(list(delays)))
+    # Hızlı sonuç yavaş iş bitmeden gelir
+    assert arrivals[0][1] < 0.15
+
+
+def test_failing_url_does_not_abort_batch():
+    urls = [f'https://example.com/{i}' for i in range(6)]
+    tracker = Tracker(failing={urls[2]})
+    collector = collector_with(tracker)
+    # _collect_content hataları yakalayıp None döndürür; o yol da hata olarak raporlanır
+    real = collector._collect_content
+    collector._collect_content = lambda url: None if url == urls[4] else real(url)
+
+    results = {r['url']: r for r in run(collector, urls, per_domain_limit=6)}
+
+    assert len(results) == 6
+    assert results[urls[2]] == {'url': urls[2], 'status': 'error', 'error': 'bağlantı koptu'}
+    assert results[urls[4]]['status'] == 'error'
+    assert {url for url, r in results.items() if r['status'] == 'success'} == set(urls) - {urls[2], urls[4]}
+    assert results[urls[0]]['data'] == {'type': 'webpage', 'title': urls[0], 'url': urls[0]}
+    assert ContentCollector._inflight.in_flight() == 0
@@ -0,0 +1,147 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from sqlalchemy import event
+from services.collection_manager import (
+    CollectionManager, Collection, Item, User, VisibilityType, collection_followers
+)
+
+# CollectionManager listelerinin satır sayısından bağımsız, sabit sayıda sorgu
+# çalıştırdığını doğrular (N+1 regresyon testi).
+
+
+@contextmanager
+def count_queries(engine):
+    """Blok içinde çalışan SQL ifadelerini say"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed(manager, count, start=0):
+    """Her biri öğeli ve takipçili `count` koleksiyon ekle"""
+    session = manager.Session()
+    try:
+        owner = session.query(User).get(manager.default_user_id)
+        for i in range(start, start + count):
+            follower = User(username=f'follower{i}')
+            collection = Collection(
+                name=f'koleksiyon {i}',
+                user=owner,
+                visibility=VisibilityType.UNLISTED if i % 2 else VisibilityType.PUBLIC,
+                share_token=f'token{i}'
+            )
+            collection.items = [
+                Item(content_type='video', title=f'öğe {i}.{j}', item_metadata={'j': j})
+                for j in range(3)
+            ]
+            collection.followers.append(follower)
+            session.add(collection)
+        session.commit()
+    finally:
+        session.close()
+
+
+def listing_calls(manager):
+    """Sorgu sayısı ölçülecek liste çağrıları"""
+    user_id = manager.default_user_id
+    return {
+        'list_collections': lambda: manager.list_collections(),
+        'list_collections_page': lambda: manager.list_collections_page(limit=100),
+        'get_public_collections': lambda: manager.get_public_collections(),
+        'get_public_collections_page': lambda: manager.get_public_collections_page(limit=100),
+        'get_followed_collections': lambda: manager.get_followed_collections(user_id),
+        'get_followed_collections_page': lambda: manager.get_followed_collections_page(user_id, limit=100),
+        'get_collection': lambda: manager.get_collection(1),
+        'get_collection_by_token': lambda: manager.get_collection_by_token('token1'),
+        'get_collection_followers': lambda: manager.get_collection_followers(1),
+        'get_collection_items_page': lambda: manager.get_collection_items_page(1, limit=100),
+    }
+
+
+def follow_all(manager):
+    """Varsayılan kullanıcının bütün koleksiyonları takip etmesini sağla"""
+    with manager.engine.begin() as conn:
+        ids = [row[0] for row in conn.exec_driver_sql('SELECT id FROM collections')]
+        followed = {row[0] for row in conn.exec_driver_sql(
+            'SELECT collection_id FROM collection_followers WHERE user_id = ?', (manager.default_user_id,)
+        )}
+        conn.execute(collection_followers.insert(), [
+            {'user_id': manager.default_user_id, 'collection_id': cid}
+            for cid in ids if cid not in followed
+        ])
+
+
+def measure(manager):
+    counts = {}
+    for name, call in listing_calls(manager).items():
+        with count_queries(manager.engine) as statements:
+            result = call()
+        assert result['status'] == 'success', (name, result)
+        counts[name] = len(statements)
+    return counts
+
+
+def test_listing_query_count_is_constant():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = CollectionManager(os.path.join(tmp, 'collections.db'))
+
+        seed(manager, 4)
+        follow_all(manager)
+        small = measure(manager)
+
+        seed(manager, 40, start=4)
+        follow_all(manager)
+        large = measure(manager)
+
+        assert small == large, f'Sorgu sayısı satır sayısıyla artıyor: {small} -> {large}'
+        for name, count in large.items():
+            assert count <= 2, f'{name} {count} sorgu çalıştırıyor'
+        manager.engine.dispose()
+
+
+def test_listing_counts_are_correct():
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = CollectionManager(os.path.join(tmp, 'collections.db'))
+        seed(manager, 4)
+        follow_all(manager)
+
+        collections = manager.list_collections()['collections']
+        assert len(collections) == 4
+        assert all(c['item_count'] == 3 for c in collections)
+
+        public = manager.get_public_collections()['collections']
+        assert len(public) == 2
+        assert all(c['follower_count'] == 2 for c in public)
+        assert all(c['owner']['username'] == 'default' for c in public)
+
+        shared = manager.get_collection_by_token('token1')['collection']
+        assert shared['follower_count'] == 2
+
+        followers = manager.get_collection_followers(1)['followers']
+        assert {f['username'] for f in followers} == {'default', 'follower0'}
+        assert all(f['followed_at'] for f in followers)
+
+        followed = manager.get_followed_collections(manager.default_user_id)['collections']
+        assert len(followed) == 4
+
+        items = manager.get_collection_items(1)['items']
+        assert sorted(item['metadata']['j'] for item in items) == [0, 1, 2]
+        manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = CollectionManager(os.path.join(tmp, 'collections.db'))
+        seed(manager, 40)
+        follow_all(manager)
+        for name, count in measure(manager).items():
+            print(f'{name}: {count} sorgu')
+        manager.engine.dispose()
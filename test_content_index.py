@@ -0,0 +1,145 @@
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import text
+from content_index import ContentLSHIndex, content_tokens
+from database import Database
+from recommendation import RecommendationEngine
+
+# MinHash/LSH içerik indeksinin benzer içerikleri bulduğunu, ekleme/silme ve
+# yeniden açılışta kalıcılığı doğrular.
+
+WORDS = [f'kelime{i}' for i in range(400)]
+DOMAINS = ['youtube.com', 'instagram.com', 'twitter.com', 'spotify.com']
+
+
+def random_item(rng):
+    return (
+        rng.choice(['video', 'audio']),
+        f'https://{rng.choice(DOMAINS)}/x',
+        rng.sample(WORDS, 4),
+        ' '.join(rng.sample(WORDS, 6))
+    )
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def test_query_finds_near_duplicates():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ContentLSHIndex(os.path.join(tmp, 'index.db'))
+        rng = random.Random(3)
+        items = {i: random_item(rng) for i in range(1, 2001)}
+        index.add_many((i, t, content_tokens(t, url, tags, title)) for i, (t, url, tags, title) in items.items())
+
+        # Bir kelimesi değişmiş kopya en üstte döner
+        content_type, url, tags, title = items[42]
+        query = content_tokens(content_type, url, tags, title.replace(title.split()[0], 'farkli'))
+        results = index.query(query, content_type=content_type, limit=5)
+        assert results[0][0] == 42
+        assert abs(results[0][1] - jaccard(query, content_tokens(*items[42]))) < 0.15
+
+        # Tür filtresi ve kendini hariç tutma
+        assert all(items[i][0] == content_type for i, _ in results)
+        own = content_tokens(*items[42])
+        assert 42 not in [i for i, _ in index.query(own, content_type=content_type, exclude=42)]
+        index.close()
+
+
+def test_incremental_updates_and_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.db')
+        index = ContentLSHIndex(path)
+        tokens = content_tokens('video', 'https://youtube.com/a', ['kedi', 'komik'], 'Komik kedi videosu')
+        index.add(1, 'video', tokens)
+        index.add(2, 'video', content_tokens('video', 'https://vimeo.com/b', ['yemek'], 'Mercimek çorbası'))
+        assert index.query(tokens)[0] == (1, 1.0)
+
+        # Güncelleme eski kovaları temizler
+        index.add(1, 'video', content_tokens('video', 'https://vimeo.com/c', ['spor'], 'Maç özeti'))
+        assert 1 not in [i for i, _ in index.query(tokens)]
+
+        index.remove(2)
+        assert len(index) == 1
+        index.close()
+
+        # Yeniden açılışta kayıtlar korunur; ayar değişince indeks sıfırlanır
+        index = ContentLSHIndex(path)
+        assert len(index) == 1
+        index.close()
+        index = ContentLSHIndex(path, num_perm=64, bands=16)
+        assert len(index) == 0
+        index.close()
+
+
+def video(i, title):
+    return {'type': 'video', 'url': f'https://www.youtube.com/watch?v={i}', 'title': title}
+
+
+def recommended_ids(engine, item):
+    return [r['id'] for r in engine.get_content_recommendations(item)]
+
+
+def test_engine_index_follows_database_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'db.db'))
+        owner = db.create_user('a@example.com', 'A', 'parola')
+        db.upgrade_premium(owner.user_id, 'pro')
+        db.create_collection(owner.user_id, 'Kediler', '', 'animals')
+        db.create_collection(owner.user_id, 'Kediler 2', '', 'animals')
+        db.add_item_to_collection(1, owner.user_id, video(1, 'komik kedi videosu derlemesi'))
+
+        index_path = os.path.join(tmp, 'index.db')
+        engine = RecommendationEngine(db, content_index_path=index_path)
+        first = db.get_collection_items(1)[0]
+        assert recommended_ids(engine, first) == []
+        assert engine.content_index.item_ids() == {first.item_id}
+
+        # İndeks oluştuktan sonra eklenen içerikler önerilir
+        db.add_item_to_collection(1, owner.user_id, video(2, 'komik kedi videosu derlemesi iki'))
+        db.add_item_to_collection(2, owner.user_id, video(3, 'komik kedi videosu derlemesi üç'))
+        ids = {item.item_id for item in db.get_all_public_items()}
+        assert engine.content_index.item_ids() == ids
+        assert set(recommended_ids(engine, first)) == ids - {first.item_id}
+
+        # Silinen içerik indeksten çıkar
+        second, third = sorted(ids - {first.item_id})
+        assert db.remove_item_from_collection(1, second, owner.user_id)
+        assert second not in engine.content_index.item_ids()
+        assert recommended_ids(engine, first) == [third]
+
+        # Sonradan gizlenen koleksiyonun içerikleri önerilmez ve indeksten temizlenir
+        with db.engine.begin() as conn:
+            conn.execute(text('UPDATE collections SET is_public = 0 WHERE collection_id = 2'))
+        assert recommended_ids(engine, first) == []
+        assert third not in engine.content_index.item_ids()
+        engine.content_index.close()
+
+        # Motor kapalıyken yapılan değişiklikler yeniden açılışta eşitlenir
+        db.item_listeners.clear()
+        db.add_item_to_collection(1, owner.user_id, video(4, 'komik kedi videosu derlemesi dört'))
+        db.remove_item_from_collection(1, first.item_id, owner.user_id)
+        engine = RecommendationEngine(db, content_index_path=index_path)
+        assert engine.content_index.item_ids() == {item.item_id for item in db.get_all_public_items()}
+        engine.content_index.close()
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = random.Random(5)
+        for size in (10000, 100000):
+            index = ContentLSHIndex(os.path.join(tmp, f'index{size}.db'))
+            items = [random_item(rng) for _ in range(size)]
+            started = time.perf_counter()
+            index.add_many((i, t, content_tokens(t, url, tags, title)) for i, (t, url, tags, title) in enumerate(items))
+            build = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for i in range(100):
+                index.query(content_tokens(*items[i]), content_type=items[i][0], limit=10, exclude=i)
+            query = (time.perf_counter() - started) * 10
+            print(f'{size} içerik: indeksleme {build:.1f} sn, sorgu ortalaması {query:.2f} ms')
+            index.close()
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import threading
+import time
+from sqlalchemy import text
+from database import Database, ITEM_LIMITS
+from models import Collection
+
+# Takipçi ve içerik sayaçlarının eşzamanlı yazmalarda kaybolmadığını ve
+# içerik limitinin aşılamadığını doğrular.
+
+THREADS = 8
+
+
+def seed(db, premium_type='free', users=40):
+    with db.engine.begin() as conn:
+        for user_id in range(1, users + 1):
+            conn.execute(text("""
+                INSERT INTO users (user_id, email, name, password_hash, premium_type)
+                VALUES (:uid, :email, 'u', 'x', :premium)
+            """), {'uid': user_id, 'email': f'u{user_id}@example.com', 'premium': premium_type})
+        conn.execute(text("""
+            INSERT INTO collections (collection_id, user_id, name, category, is_public,
+                                     item_count, total_items_added, followers_count)
+            VALUES (1, 1, 'açık', 'music', 1, 0, 0, 0), (2, 1, 'gizli', 'music', 0, 0, 0, 0)
+        """))
+
+
+def counters(db, collection_id=1):
+    with db.engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT followers_count, item_count, total_items_added,
+                   (SELECT COUNT(*) FROM collection_followers WHERE collection_id = :cid),
+                   (SELECT COUNT(*) FROM collection_items WHERE collection_id = :cid)
+            FROM collections WHERE collection_id = :cid
+        """), {'cid': collection_id}).one()
+
+
+def run_concurrently(calls):
+    """Çağrıları THREADS iş parçacığında aynı anda başlat, sonuçları döndür"""
+    results = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(THREADS)
+
+    def worker(chunk):
+        barrier.wait()
+        for call in chunk:
+            result = call()
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=worker, args=(calls[i::THREADS],)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def content(i):
+    return {'type': 'video', 'url': f'https://example.com/{i}', 'title': f'öğe {i}'}
+
+
+def test_follow_counts_are_atomic():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'follow.db'))
+        seed(db)
+
+        # Her kullanıcı iki kez takip etmeye çalışır; yalnızca biri sayılır
+        calls = [lambda uid=uid: db.follow_collection(1, uid) for uid in range(1, 41)] * 2
+        results = run_concurrently(calls)
+        assert results.count(True) == 40
+        assert counters(db)[0] == counters(db)[3] == 40
+
+        assert db.follow_collection(2, 1) is False
+        assert counters(db, 2)[0] == 0
+
+        results = run_concurrently([lambda uid=uid: db.unfollow_collection(1, uid) for uid in range(1, 21)])
+        assert all(results)
+        assert db.unfollow_collection(1, 1) is False
+        assert counters(db)[0] == counters(db)[3] == 20
+        db.engine.dispose()
+
+
+def test_item_limit_holds_under_concurrency():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'items.db'))
+        seed(db)
+        limit = ITEM_LIMITS['free']
+
+        results = run_concurrently([lambda i=i: db.add_item_to_collection(1, 1, content(i)) for i in range(limit * 2)])
+        assert results.count(True) == limit
+        followers_count, item_count, total_added, _, stored = counters(db)
+        assert item_count == total_added == stored == limit
+
+        # Başkasının koleksiyonuna eklenemez
+        assert db.add_item_to_collection(1, 2, content(0)) is False
+
+        # Silmek item_count'u düşürür ama toplam limit yeniden açılmaz
+        with db.engine.connect() as conn:
+            item_id = conn.execute(text('SELECT MIN(item_id) FROM collection_items')).scalar()
+        assert db.remove_item_from_collection(1, item_id, 1) is True
+        assert db.remove_item_from_collection(1, item_id, 1) is False
+        assert counters(db)[1:3] == (limit - 1, limit)
+        assert db.add_item_to_collection(1, 1, content(0)) is False
+
+        with db.engine.connect() as conn:
+            created_at = conn.execute(text('SELECT created_at FROM collection_items LIMIT 1')).scalar()
+            assert created_at
+        db.engine.dispose()
+
+
+def test_plan_limits_follow_premium_type():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'plans.db'))
+        seed(db, premium_type='pro')
+        for i in range(ITEM_LIMITS['pro'] + 1):
+            db.add_item_to_collection(1, 1, content(i))
+        assert counters(db)[2] == ITEM_LIMITS['pro']
+        db.engine.dispose()
+
+
+
+def test_decrements_handle_legacy_null_counters():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'legacy.db'))
+        seed(db)
+        assert db.add_item_to_collection(1, 1, content(0))
+        assert db.follow_collection(1, 2)
+        # Sayaç sütunları eklenmeden önce oluşturulmuş satırlar NULL taşır
+        with db.engine.begin() as conn:
+            conn.execute(text('UPDATE collections SET item_count = NULL, followers_count = NULL'))
+            item_id = conn.execute(text('SELECT item_id FROM collection_items')).scalar()
+
+        assert db.remove_item_from_collection(1, item_id, 1)
+        assert db.unfollow_collection(1, 2)
+        assert counters(db)[:2] == (0, 0)
+        db.engine.dispose()
+
+
+def test_orm_reads_see_counter_updates():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'orm.db'))
+        seed(db)
+        assert db.get_collection_by_id(1).followers_count == 0
+
+        # Açık tutulan oturumdaki nesne de Core yazmalarından sonra yenilenir
+        held = db.session.query(Collection).filter_by(collection_id=1).one()
+        assert held.item_count == 0
+
+        assert db.follow_collection(1, 2)
+        assert db.add_item_to_collection(1, 1, content(0))
+        assert (held.followers_count, held.item_count) == (1, 1)
+        db.remove_session()
+
+        collection = db.get_collection_by_id(1)
+        assert (collection.followers_count, collection.item_count, collection.total_items_added) == (1, 1, 1)
+        [listed] = [c for c in db.get_user_collections(1) if c.collection_id == 1]
+        assert (listed.followers_count, listed.item_count) == (1, 1)
+
+        item_id = db.get_collection_items(1)[0].item_id
+        assert db.remove_item_from_collection(1, item_id, 1)
+        assert db.unfollow_collection(1, 2)
+        collection = db.get_collection_by_id(1)
+        assert (collection.followers_count, collection.item_count) == (0, 0)
+        db.engine.dispose()
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        seed(db, users=2000)
+        started = time.perf_counter()
+        run_concurrently([lambda uid=uid: db.follow_collection(1, uid) for uid in range(1, 2001)])
+        elapsed = time.perf_counter() - started
+        print(f'{THREADS} iş parçacığı, 2000 takip: {elapsed:.2f} sn, sayaç {counters(db)[0]}')
+        db.engine.dispose()
@@ -0,0 +1,146 @@
+import os
+import tempfile
+import threading
+from sqlalchemy import inspect, text
+from database import Database
+from models import Collection, CollectionItem, User
+
+# Database'in genel metodlarını gerçek modellerle uçtan uca çalıştırır.
+
+
+def content(i, url=None):
+    return {'type': 'video', 'url': url or f'https://www.youtube.com/watch?v={i}', 'title': f'şarkı {i}'}
+
+
+def seeded_db(tmp):
+    """İki kullanıcı, üç koleksiyon, içerikler ve bir takip"""
+    db = Database(os.path.join(tmp, 'db.db'))
+    owner = db.create_user('a@example.com', 'A', 'parola')
+    other = db.create_user('b@example.com', 'B', 'parola')
+    assert db.upgrade_premium(owner.user_id, 'pro')
+    db.create_collection(owner.user_id, 'Müzik Listesi', 'Şarkılar', 'music')
+    db.create_collection(owner.user_id, 'Gizli', 'Özel', 'music', is_public=False)
+    db.create_collection(other.user_id, 'Başka Müzik', 'Albümler', 'music', subcategory='rock')
+    for i in range(3):
+        assert db.add_item_to_collection(1, owner.user_id, content(i))
+    assert db.add_item_to_collection(3, other.user_id, content(9))
+    assert db.follow_collection(3, owner.user_id)
+    return db, owner, other
+
+
+def test_users_and_collections():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, owner, other = seeded_db(tmp)
+        assert isinstance(owner, User)
+        assert db.update_user_profile(owner.user_id, name='AA')
+        assert not db.update_user_profile(999, name='x')
+        assert not db.upgrade_premium(999, 'pro')
+
+        # Ücretsiz plan tek koleksiyona izin verir
+        assert db.create_collection(other.user_id, 'İkinci', '', 'music') is None
+        assert db.create_collection(999, 'Yok', '', 'music') is None
+
+        collections = db.get_user_collections(owner.user_id)
+        assert all(isinstance(c, Collection) for c in collections)
+        assert {c.name for c in collections} == {'Müzik Listesi', 'Gizli'}
+
+        collection = db.get_collection_by_id(1)
+        assert collection.item_count == 3 and collection.total_items_added == 3
+        assert db.get_collection_by_id(999) is None
+        assert [c.collection_id for c in db.get_collections_by_ids([3, 1, 999])] == [3, 1]
+        assert {c.collection_id for c in db.get_all_public_collections()} == {1, 3}
+        db.engine.dispose()
+
+
+def test_items_and_follows():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, owner, other = seeded_db(tmp)
+        items = db.get_collection_items(1)
+        assert len(items) == 3 and all(isinstance(item, CollectionItem) for item in items)
+        assert db.get_collection_items(1, user_id=other.user_id) == []
+        assert [item.item_id for item in db.get_items_by_ids([items[0].item_id])] == [items[0].item_id]
+        assert len(db.get_all_public_items()) == 4
+
+        assert db.remove_item_from_collection(1, items[0].item_id, owner.user_id)
+        assert db.get_collection_by_id(1).item_count == 2
+
+        assert [c.collection_id for c in db.get_followed_collections(owner.user_id)] == [3]
+        assert db.get_collection_by_id(3).followers_count == 1
+        assert db.unfollow_collection(3, owner.user_id)
+        assert db.get_followed_collections(owner.user_id) == []
+        db.engine.dispose()
+
+
+def test_listings_search_and_recommendations():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, owner, other = seeded_db(tmp)
+        page, cursor = db.get_user_collections_page(owner.user_id, limit=1)
+        assert len(page) == 1 and cursor
+        items, _ = db.get_collection_items_page(1)
+        assert len(items) == 3
+        followed, _ = db.get_followed_collections_page(owner.user_id)
+        assert [c.collection_id for c in followed] == [3]
+
+        assert [c.collection_id for c in db.search_collections('muzik')] == [1, 3]
+        assert [c.collection_id for c in db.search_collections('albüm', category='music')] == [3]
+
+        db.record_collection_view(1)
+        assert db.get_trending_collections('daily', limit=2)[0].collection_id in (1, 3)
+
+        features = db.get_collection_features()
+        assert features[3]['subcategory'] == 'rock' and features[1]['content_types'] == {'video': 3}
+
+        # other, 3 numaralı koleksiyonu takip etmiyor; owner'ın koleksiyonu önerilir
+        assert db.follow_collection(1, other.user_id)
+        assert [c.collection_id for c in db.get_collection_suggestions(owner.user_id)] == [1]
+        assert [c.collection_id for c in db.get_precomputed_suggestions(owner.user_id)] == [1]
+        db.engine.dispose()
+
+
+def test_session_scope_does_not_serve_stale_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, owner, _ = seeded_db(tmp)
+        collection = db.get_collection_by_id(1)
+        assert inspect(collection).detached and collection.name == 'Müzik Listesi'
+        assert not db.Session.registry.has()
+
+        # Başka bir bağlantıdan yapılan yazma sonraki okumada görünür
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE collections SET name = 'Yeni Ad' WHERE collection_id = 1"))
+        assert db.get_collection_by_id(1).name == 'Yeni Ad'
+        assert {c.name for c in db.get_user_collections(owner.user_id)} == {'Yeni Ad', 'Gizli'}
+
+        # Hatalı iş birimi geri alınır ve oturum yine kapatılır
+        try:
+            with db.session_scope() as session:
+                session.query(Collection).filter_by(collection_id=1).update({'name': 'Yarım'})
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        assert not db.Session.registry.has()
+        assert db.get_collection_by_id(1).name == 'Yeni Ad'
+        db.engine.dispose()
+
+
+def test_sessions_are_thread_scoped():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, owner, _ = seeded_db(tmp)
+        sessions, errors = [], []
+
+        def worker():
+            try:
+                sessions.append(db.session)
+                assert len(db.get_user_collections(owner.user_id)) == 2
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.remove_session()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert len({id(session) for session in sessions}) == 4
+        db.engine.dispose()
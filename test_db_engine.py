@@ -0,0 +1,55 @@
+import os
+import tempfile
+from sqlalchemy import text
+from db_engine import SQLITE_PRAGMAS, connect_sqlite, create_sqlite_engine
+
+# Ortak SQLite profilinin her bağlantıda gerçekten uygulandığını doğrular.
+
+# PRAGMA okumasının döndürdüğü değerler (journal_mode küçük harf, enumlar sayı döner)
+EXPECTED = {
+    'journal_mode': 'wal',
+    'synchronous': 1,
+    'mmap_size': SQLITE_PRAGMAS['mmap_size'],
+    'cache_size': SQLITE_PRAGMAS['cache_size'],
+    'busy_timeout': SQLITE_PRAGMAS['busy_timeout'],
+    'temp_store': 2
+}
+
+
+def read_pragmas(execute):
+    return {name: execute(f'PRAGMA {name}') for name in SQLITE_PRAGMAS}
+
+
+def test_connect_sqlite_applies_every_pragma():
+    assert set(EXPECTED) == set(SQLITE_PRAGMAS)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_sqlite(os.path.join(tmp, 'a.db'))
+        try:
+            assert read_pragmas(lambda sql: conn.execute(sql).fetchone()[0]) == EXPECTED
+            assert conn.execute("SELECT tr_fold('İSTANBUL')").fetchone()[0] == 'istanbul'
+        finally:
+            conn.close()
+
+
+def test_engine_applies_pragmas_on_every_pooled_connection():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(os.path.join(tmp, 'b.db'), pool_size=2)
+        try:
+            connections = [engine.connect() for _ in range(3)]
+            for conn in connections:
+                assert read_pragmas(lambda sql: conn.execute(text(sql)).scalar()) == EXPECTED
+            for conn in connections:
+                conn.close()
+        finally:
+            engine.dispose()
+
+
+def test_custom_pragmas_override_profile():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = connect_sqlite(os.path.join(tmp, 'c.db'), pragmas={'synchronous': 'FULL', 'busy_timeout': 100})
+        try:
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 2
+            assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 100
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        finally:
+            conn.close()
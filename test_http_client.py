@@ -0,0 +1,141 @@
+import io
+import threading
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from services import http_client
+from services.http_client import HttpClient, HEAD_BYTE_BUDGET, get_http_client
+
+# fetch_head ağa çıkmadan sınanır: oturuma takılan sahte adaptör gövdeyi
+# bellekten verir ve kaç bayt okunduğunu sayar.
+
+
+class CountingBody(io.BytesIO):
+    """Okunan bayt sayısını tutan yanıt gövdesi"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class StubAdapter(BaseAdapter):
+    """Her isteğe önceden verilen gövde ve başlıklarla yanıt veren adaptör"""
+
+    def __init__(self, body=b'', status=200, headers=None):
+        super().__init__()
+        self.body = CountingBody(body)
+        self.status = status
+        self.headers = headers or {'Content-Type': 'text/html'}
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = self.body
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def client_with(body=b'', **kwargs):
+    client = HttpClient()
+    adapter = StubAdapter(body, **kwargs)
+    client.session.mount('http://', adapter)
+    client.session.mount('https://', adapter)
+    return client, adapter
+
+
+def page(head, body_size=0):
+    return (b'<html><head>' + head + b'</head><body>' + b'x' * body_size + b'</body></html>')
+
+
+def test_stops_reading_at_head_end():
+    client, adapter = client_with(page(b'<title>Merhaba</title>', body_size=4 * 1024 * 1024))
+    result = client.fetch_head('https://example.com/a')
+
+    assert result.ok and not result.truncated
+    assert result.text == '<html><head><title>Merhaba</title></head>'
+    assert result.url == 'https://example.com/a'
+    # Yalnızca ilk parça okunur, 4 MB'lık gövde indirilmez
+    assert adapter.body.bytes_read <= 16 * 1024
+
+
+def test_head_end_split_across_chunks():
+    # Küçük parçalarla </head> etiketi parça sınırına denk gelir
+    for chunk_size in (3, 5, 7, 11):
+        client, adapter = client_with(page(b'<title>t</title>', body_size=1024))
+        result = client.fetch_head('https://example.com/', chunk_size=chunk_size)
+        assert result.text.endswith('</head>'), chunk_size
+        assert not result.truncated
+        assert adapter.body.bytes_read < 100
+
+
+def test_byte_budget_truncates_headless_page():
+    body = b'<html><head><title>sonsuz</title>' + b'<meta name="a" content="b">' * 100000
+    client, adapter = client_with(body)
+    result = client.fetch_head('https://example.com/')
+
+    assert result.truncated
+    assert len(result.text) == HEAD_BYTE_BUDGET
+    # Bütçe aşıldıktan sonra en fazla bir parça fazladan okunabilir
+    assert adapter.body.bytes_read < HEAD_BYTE_BUDGET + 16 * 1024
+
+    client, _ = client_with(body)
+    assert len(client.fetch_head('https://example.com/', max_bytes=1000).text) == 1000
+
+
+def test_encoding_detection_order():
+    title = 'Şarkı listesi'
+
+    # Content-Type içindeki charset öncelikli
+    client, _ = client_with(page(f'<meta charset="utf-8"><title>{title}</title>'.encode('iso-8859-9')),
+                            headers={'Content-Type': 'text/html; charset=ISO-8859-9'})
+    assert title in client.fetch_head('https://example.com/').text
+
+    # Başlıkta yoksa <meta charset> kullanılır
+    client, _ = client_with(page(f'<meta charset="windows-1254"><title>{title}</title>'.encode('cp1254')))
+    assert title in client.fetch_head('https://example.com/').text
+
+    # Bilinmeyen kodlama adı veya hiç bilgi yoksa utf-8
+    for meta in (b'<meta charset="yok-boyle-bir-kodlama">', b''):
+        client, _ = client_with(page(meta + f'<title>{title}</title>'.encode('utf-8')))
+        assert title in client.fetch_head('https://example.com/').text
+
+
+def test_not_modified_reads_no_body():
+    client, adapter = client_with(b'okunmamali', status=304)
+    result = client.fetch_head('https://example.com/', headers={'If-None-Match': '"v1"'})
+    assert result.status_code == 304 and result.ok
+    assert result.text == '' and not result.truncated
+    assert adapter.body.bytes_read == 0
+
+
+def test_shared_client_is_created_once(monkeypatch):
+    monkeypatch.setattr(http_client, '_client', None)
+    clients = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        clients.append(get_http_client())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(clients) == 8
+    assert all(client is clients[0] for client in clients)
+    assert get_http_client() is clients[0]
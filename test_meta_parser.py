@@ -0,0 +1,188 @@
+import re
+import pytest
+from bs4 import BeautifulSoup
+from services import content_processor
+from services.content_processor import ContentProcessor
+from services.meta_parser import MetaIndex
+
+# MetaIndex, yerini aldığı soup.find tabanlı okuyucularla aynı sonucu vermeli.
+# Aşağıdaki legacy_* fonksiyonları ContentProcessor'ın eski BeautifulSoup
+# sürümünün birebir kopyasıdır ve örnek sayfalar üzerinde karşılaştırılır.
+
+NOW = '2024-05-01 12:00:00'
+
+PAGES = {
+    'article': """<!DOCTYPE html><html><head>
+        <title>Ekonomi &amp; Piyasalar | Haber</title>
+        <meta charset="utf-8">
+        <meta name="date" content="2024-03-02">
+        <meta name="publishedDate" content="2024-03-01T08:00:00Z">
+        <meta name="description" content="Günün özeti">
+        <meta name="author" content="Ayşe Yılmaz">
+        <meta property="og:title" content="Piyasalarda &quot;yeşil&quot; gün">
+        <meta property="og:title" content="Yinelenen başlık">
+        <meta property="og:image" content="https://example.com/a.jpg?w=1&amp;h=2">
+        </head><body><title>Gövdede başlık</title><p>Metin</p></body></html>""",
+    'plain': """<html><head><TITLE>Sade sayfa</TITLE>
+        <META NAME="description" CONTENT="Yalnızca name etiketi">
+        <meta name="publication_date" content="2023-12-31">
+        </head><body></body></html>""",
+    'youtube': """<html><head><title>Video - YouTube</title>
+        <meta property="og:title" content="Kedi videosu">
+        <meta property="og:description" content="Çok komik">
+        <meta property="og:image" content="https://i.ytimg.com/vi/x/hq.jpg">
+        <meta name="author" content="Kanal">
+        </head><body><div itemscope>
+        <meta itemprop="duration" content="PT3M20S">
+        <meta itemprop="interactionCount" content="12345">
+        </div></body></html>""",
+    'spotify': """<html><head>
+        <meta property="og:title" content="Şarkı">
+        <meta property="og:type" content="music.song">
+        <meta property="music:duration" content="215">
+        <meta name="music:duration" content="isim değil">
+        </head></html>""",
+    'twitter': """<html><head>
+        <meta property="og:title" content="Ali (@ali_veli) on X">
+        <meta property="og:description" content="Bir gönderi">
+        </head></html>""",
+    'instagram': """<html><head>
+        <meta property="og:title" content="Zeynep on Instagram: &quot;tatil&quot;">
+        <meta name="date" content="2022-07-07">
+        </head></html>""",
+}
+
+# content özniteliği olmayan etiketler: eski kod bunlarda None döndürüyor ya da hata fırlatıyordu
+CONTENTLESS = """<html><head><title>Yedek</title><meta property="og:title">
+    <meta name="author"><meta name="date"><meta name="publishedDate" content="2024-01-01">
+    </head></html>"""
+
+
+def legacy_title(soup):
+    og_title = soup.find('meta', property='og:title')
+    if og_title:
+        return og_title.get('content')
+    title = soup.find('title')
+    if title:
+        return title.text
+    return 'Başlık bulunamadı'
+
+
+def legacy_description(soup):
+    og_desc = soup.find('meta', property='og:description')
+    if og_desc:
+        return og_desc.get('content')
+    meta_desc = soup.find('meta', {'name': 'description'})
+    if meta_desc:
+        return meta_desc.get('content')
+    return ''
+
+
+def legacy_image(soup):
+    og_image = soup.find('meta', property='og:image')
+    return og_image.get('content') if og_image else None
+
+
+def legacy_author(soup, platform):
+    if platform == 'twitter':
+        author = soup.find('meta', property='og:title')
+        if author:
+            username = re.search(r'@(\w+)', author.get('content'))
+            if username:
+                return username.group(1)
+    elif platform == 'instagram':
+        author = soup.find('meta', property='og:title')
+        if author:
+            return author.get('content').split(' on Instagram')[0]
+    author = soup.find('meta', {'name': 'author'})
+    if author:
+        return author.get('content')
+    return 'Bilinmeyen Yazar'
+
+
+def legacy_date(soup):
+    published = soup.find('meta', {'name': ['publishedDate', 'publication_date', 'date']})
+    if published:
+        return published.get('content')
+    return NOW
+
+
+def legacy_platform_specific(soup, platform):
+    def content(tag):
+        return tag.get('content') if tag else None
+    if platform == 'youtube':
+        return {
+            'duration': content(soup.find('meta', {'itemprop': 'duration'})),
+            'views': content(soup.find('meta', {'itemprop': 'interactionCount'}))
+        }
+    elif platform == 'spotify':
+        return {
+            'type': content(soup.find('meta', property='og:type')),
+            'duration': content(soup.find('meta', property='music:duration'))
+        }
+    return {}
+
+
+class FixedDatetime:
+    @staticmethod
+    def now():
+        return NOW
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setattr(content_processor, 'datetime', FixedDatetime)
+    return ContentProcessor()
+
+
+@pytest.mark.parametrize('page', sorted(PAGES))
+@pytest.mark.parametrize('platform', ['website', 'youtube', 'spotify', 'twitter', 'instagram'])
+def test_getters_match_beautifulsoup(processor, page, platform):
+    html = PAGES[page]
+    soup = BeautifulSoup(html, 'html.parser')
+    for meta in (MetaIndex.parse(html), MetaIndex.from_soup(soup)):
+        assert processor.get_description(meta) == legacy_description(soup)
+        assert processor.get_image(meta) == legacy_image(soup)
+        assert processor.get_author(meta, platform) == legacy_author(soup, platform)
+        assert processor.get_date(meta) == legacy_date(soup)
+        assert processor.get_platform_specific(meta, platform) == legacy_platform_specific(soup, platform)
+        assert processor.get_title(meta) == legacy_title(soup)
+
+
+def test_contentless_tags_fall_back(processor):
+    soup = BeautifulSoup(CONTENTLESS, 'html.parser')
+    assert legacy_title(soup) is None and legacy_author(soup, 'website') is None and legacy_date(soup) is None
+    with pytest.raises(TypeError):
+        legacy_author(soup, 'twitter')
+
+    # İçeriği olmayan etiket yok sayılır, sıradaki kaynağa geçilir
+    meta = MetaIndex.parse(CONTENTLESS)
+    assert processor.get_title(meta) == 'Yedek'
+    assert processor.get_author(meta, 'website') == 'Bilinmeyen Yazar'
+    assert processor.get_author(meta, 'twitter') == 'Bilinmeyen Yazar'
+    assert processor.get_date(meta) == '2024-01-01'
+
+
+def test_date_follows_document_order():
+    # Anahtar önceliği değil, belgede önce geçen etiket kazanır (soup.find gibi)
+    meta = MetaIndex.parse(PAGES['article'])
+    assert meta.first_name('publishedDate', 'publication_date', 'date') == '2024-03-02'
+    assert meta.name('publishedDate', 'publication_date', 'date') == '2024-03-01T08:00:00Z'
+    assert MetaIndex.parse(PAGES['plain']).first_name('publishedDate', 'date') is None
+
+
+def test_index_keeps_first_value_and_decodes_entities():
+    meta = MetaIndex.parse(PAGES['article'])
+    assert meta.prop('og:title') == 'Piyasalarda "yeşil" gün'
+    assert meta.prop('og:image') == 'https://example.com/a.jpg?w=1&h=2'
+    assert meta.title == 'Ekonomi & Piyasalar | Haber'
+    # Büyük harfli etiket/öznitelik adları da indekslenir
+    plain = MetaIndex.parse(PAGES['plain'])
+    assert plain.title == 'Sade sayfa'
+    assert plain.name('description') == 'Yalnızca name etiketi'
+    # property ve name ayrı tutulur
+    spotify = MetaIndex.parse(PAGES['spotify'])
+    assert spotify.prop('music:duration') == '215'
+    assert spotify.name('music:duration') == 'isim değil'
+    assert spotify.prop('og:description', 'og:title') == 'Şarkı'
+    assert MetaIndex.parse(None).title is None
@@ -0,0 +1,136 @@
+import pytest
+from services import metadata_cache
+from services.metadata_cache import MetadataCache, normalize_url, CONTENT_TTLS, DEFAULT_TTL, HOUR, DAY
+from services.http_client import PageHead
+from content_collector import ContentCollector
+
+# Önbellek geçici dizindeki SQLite dosyasıyla, saat elle ilerletilerek sınanır.
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(metadata_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = MetadataCache(tmp_path / 'metadata.db')
+    yield cache
+    cache.close()
+
+
+def test_normalize_url():
+    same = [
+        'https://www.Example.com/yazi/',
+        'http://example.com/yazi',
+        'https://example.com:443/yazi?utm_source=x&fbclid=1',
+        ' https://EXAMPLE.com/yazi#bolum ',
+    ]
+    assert {normalize_url(url) for url in same} == {'https://example.com/yazi'}
+
+    # Sorgu parametreleri sıralanır, izleme olmayanlar korunur
+    assert normalize_url('https://example.com/?b=2&a=1&ref=tw') == 'https://example.com/?a=1&b=2'
+    assert normalize_url('https://example.com') == 'https://example.com/'
+    assert normalize_url('http://example.com:8080/a') == 'https://example.com:8080/a'
+    # youtu.be kısa bağlantısı tam adrese çevrilir
+    assert normalize_url('https://youtu.be/abc123?si=paylas') == normalize_url('https://www.youtube.com/watch?v=abc123&feature=share')
+    assert normalize_url('https://youtu.be/abc123') == 'https://youtube.com/watch?v=abc123'
+
+
+def test_ttl_depends_on_content_type(cache, clock):
+    assert CONTENT_TTLS['video'] == 7 * DAY and CONTENT_TTLS['text'] == 6 * HOUR
+    cache.set('https://example.com/video', {'title': 'v'}, 'video')
+    cache.set('https://example.com/tweet', {'title': 't'}, 'text')
+    cache.set('https://example.com/bilinmeyen', {'title': 'b'}, 'garip-tur')
+
+    clock.now += 6 * HOUR + 1
+    assert cache.get('https://example.com/video')['fresh']
+    assert not cache.get('https://example.com/tweet')['fresh']
+    assert cache.get('https://example.com/bilinmeyen')['fresh']
+
+    clock.now += DEFAULT_TTL
+    assert not cache.get('https://example.com/bilinmeyen')['fresh']
+    assert cache.get('https://example.com/video')['fresh']
+
+    clock.now += 7 * DAY
+    entry = cache.get('https://example.com/video')
+    # Süresi dolan kayıt silinmez, yeniden doğrulama için döner
+    assert entry == {'data': {'title': 'v'}, 'etag': None, 'last_modified': None, 'fresh': False}
+    assert cache.get('https://example.com/yok') is None
+
+
+def test_lru_eviction_runs_every_hundred_writes(tmp_path, clock):
+    cache = MetadataCache(tmp_path / 'metadata.db', max_entries=50)
+    count = lambda: cache.conn.execute('SELECT COUNT(*) FROM metadata_cache').fetchone()[0]
+
+    for i in range(60):
+        clock.now += 1
+        cache.set(f'https://example.com/{i}', {'i': i})
+    # İlk on kayıt sonradan okunur, en son kullanılanlar onlar olur
+    for i in range(10):
+        clock.now += 1
+        assert cache.get(f'https://example.com/{i}')
+
+    for i in range(60, 99):
+        clock.now += 1
+        cache.set(f'https://example.com/{i}', {'i': i})
+    # Sınır aşılsa da tahliye 100. yazmaya kadar beklemez
+    assert count() == 99
+
+    clock.now += 1
+    cache.set('https://example.com/99', {'i': 99})
+    assert count() == 50
+    survivors = {int(key.rsplit('/', 1)[1]) for (key,) in cache.conn.execute('SELECT url_key FROM metadata_cache')}
+    # En uzun süredir kullanılmayanlar (10-59) silinir, okunan ilk on kalır
+    assert survivors == set(range(10)) | set(range(60, 100))
+    cache.close()
+
+    # Açılışta da sınır uygulanır
+    reopened = MetadataCache(tmp_path / 'metadata.db', max_entries=20)
+    assert reopened.conn.execute('SELECT COUNT(*) FROM metadata_cache').fetchone()[0] == 20
+    reopened.close()
+
+
+def test_conditional_revalidation_with_not_modified(cache, clock, monkeypatch):
+    url = 'https://twitter.com/kullanici/status/1'
+    cache.set(url, {'type': 'text', 'title': 'eski'}, 'text', etag='"v1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+    clock.now += 6 * HOUR + 1
+
+    entry = cache.get(url)
+    assert not entry['fresh']
+    assert MetadataCache.conditional_headers(entry) == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+    }
+    assert MetadataCache.conditional_headers(None) == {}
+
+    collector = ContentCollector()
+    collector.metadata_cache = cache
+    requests_seen = []
+
+    def fetch_head(url, headers=None):
+        requests_seen.append(headers)
+        return PageHead(url=url, status_code=304, headers={}, text='')
+
+    monkeypatch.setattr(collector.http, 'fetch_head', fetch_head)
+    collector._collect_twitter = lambda *args: pytest.fail('304 yanıtında sayfa yeniden işlenmemeli')
+    collector.page_collectors = {collector._collect_twitter: True}
+    collector.supported_domains['twitter.com'] = collector._collect_twitter
+
+    data = collector._collect_content(url)
+    assert data == {'type': 'text', 'title': 'eski', 'url': url}
+    assert requests_seen == [{'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}]
+    # 304 sonrası süre türün TTL'iyle yeniden başlar
+    assert cache.get(url)['fresh']
+    clock.now += 6 * HOUR + 1
+    assert not cache.get(url)['fresh']
+    assert cache.refresh('https://example.com/yok') is False
@@ -0,0 +1,76 @@
+import os
+import tempfile
+from datetime import datetime
+import pytest
+from database import Database
+from models import CollectionItem
+from pagination import encode_cursor, decode_cursor
+
+# Anahtar kümesi sayfalamasında imleçle gezinmeyi uçtan uca doğrular: aynı
+# created_at değerinde id ile sıralama, son sayfanın boş dönmemesi ve bozuk imleç.
+
+ITEMS = 7
+
+
+def seeded_db(tmp):
+    db = Database(os.path.join(tmp, 'pages.db'))
+    owner = db.create_user('a@example.com', 'A', 'parola')
+    db.upgrade_premium(owner.user_id, 'pro')
+    db.create_collection(owner.user_id, 'Liste', '', 'music')
+    for i in range(ITEMS):
+        assert db.add_item_to_collection(1, owner.user_id, {'type': 'link', 'url': f'https://example.com/{i}', 'title': str(i)})
+    # İlk beş içerik aynı anda eklenmiş gibi: sıra item_id ile belirlenmeli
+    with db.session_scope() as session:
+        session.query(CollectionItem).filter(CollectionItem.item_id <= 5).update(
+            {CollectionItem.created_at: datetime(2024, 1, 1, 12, 0, 0)}
+        )
+        session.commit()
+    return db, owner
+
+
+def walk(db, limit):
+    """Tüm sayfaları imleçle gez: (sayfalar, toplanan item_id'ler)"""
+    pages, ids, cursor = [], [], None
+    while True:
+        items, cursor = db.get_collection_items_page(1, cursor=cursor, limit=limit)
+        pages.append([item.item_id for item in items])
+        ids.extend(pages[-1])
+        if cursor is None:
+            return pages, ids
+
+
+def test_cursor_walk_breaks_ties_by_id():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, _ = seeded_db(tmp)
+        # 6 ve 7 daha yeni; eşit created_at'lerde büyük id önce gelir
+        pages, ids = walk(db, limit=2)
+        assert pages == [[7, 6], [5, 4], [3, 2], [1]]
+        assert ids == sorted(ids, reverse=True)
+        db.engine.dispose()
+
+
+def test_last_full_page_has_no_cursor():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, _ = seeded_db(tmp)
+        # Kayıt sayısı sayfa boyutunun katıysa boş bir sayfa istenmez
+        pages, ids = walk(db, limit=ITEMS)
+        assert pages == [list(range(ITEMS, 0, -1))]
+
+        # Son kaydın ötesini gösteren imleç boş sayfa ve None döndürür
+        items, cursor = db.get_collection_items_page(1, cursor=encode_cursor([datetime(2024, 1, 1, 12, 0, 0), 1]))
+        assert items == [] and cursor is None
+        db.engine.dispose()
+
+
+def test_corrupt_cursor_is_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        db, owner = seeded_db(tmp)
+        _, cursor = db.get_collection_items_page(1, limit=2)
+        assert decode_cursor(cursor)[1] == 6
+
+        for bad in ('bozuk!', cursor[:-3], encode_cursor([1]), encode_cursor({'a': 1})):
+            with pytest.raises(ValueError):
+                db.get_collection_items_page(1, cursor=bad, limit=2)
+        with pytest.raises(ValueError):
+            db.get_user_collections_page(owner.user_id, cursor='e30')
+        db.engine.dispose()
@@ -0,0 +1,188 @@
+import os
+import tempfile
+from sqlalchemy import select, text, func, tuple_
+from datetime import datetime
+from models import Base
+from database import Database
+
+# Sık çalışan sorguların indeks kullandığını EXPLAIN QUERY PLAN ile doğrular.
+# Bir sorgu tam tablo taramasına (SCAN) veya ORDER BY için geçici B-ağacına
+# düşerse test başarısız olur.
+
+collections = Base.metadata.tables['collections']
+collection_items = Base.metadata.tables['collection_items']
+collection_followers = Base.metadata.tables['collection_followers']
+
+
+def hot_queries():
+    """Database metodlarının ürettiği sorgu biçimleri"""
+    return {
+        'get_user_collections': select(collections).where(collections.c.user_id == 1),
+        'create_collection_count': select(func.count()).select_from(collections).where(collections.c.user_id == 1),
+        'get_collection_items': select(collection_items).where(collection_items.c.collection_id == 1),
+        'get_collection_items_by_user': select(collection_items).where(
+            collection_items.c.collection_id == 1,
+            collection_items.c.user_id == 1
+        ),
+        'items_by_user': select(collection_items).where(collection_items.c.user_id == 1),
+        'follow_collection_existing': select(collection_followers).where(
+            collection_followers.c.collection_id == 1,
+            collection_followers.c.follower_id == 1
+        ).limit(1),
+        'get_followed_collections': select(collections).join(
+            collection_followers,
+            collections.c.collection_id == collection_followers.c.collection_id
+        ).where(
+            collection_followers.c.follower_id == 1,
+            collections.c.is_public == True
+        ),
+        'get_trending_collections': select(collections).where(
+            collections.c.is_public == True
+        ).order_by(collections.c.followers_count.desc()).limit(10),
+        'get_user_collections_page': select(collections).where(
+            collections.c.user_id == 1,
+            tuple_(collections.c.created_at, collections.c.collection_id) < tuple_(datetime(2024, 1, 1), 100)
+        ).order_by(collections.c.created_at.desc(), collections.c.collection_id.desc()).limit(21),
+        'get_collection_items_page': select(collection_items).where(
+            collection_items.c.collection_id == 1,
+            tuple_(collection_items.c.created_at, collection_items.c.item_id) < tuple_(datetime(2024, 1, 1), 100)
+        ).order_by(collection_items.c.created_at.desc(), collection_items.c.item_id.desc()).limit(21),
+        'get_followed_collections_page': select(collections).join(
+            collection_followers,
+            collections.c.collection_id == collection_followers.c.collection_id
+        ).where(
+            collection_followers.c.follower_id == 1,
+            collections.c.is_public == True
+        ).order_by(collection_followers.c.created_at.desc(), collection_followers.c.id.desc()).limit(21),
+    }
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+    return [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def assert_indexed(name, plan):
+    for step in plan:
+        assert not step.startswith('SCAN'), f'{name} tam tablo taraması yapıyor: {plan}'
+        assert 'TEMP B-TREE' not in step, f'{name} sıralama için geçici B-ağacı kullanıyor: {plan}'
+
+
+def test_hot_queries_use_indexes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'plans.db'))
+        with db.engine.connect() as conn:
+            for name, statement in hot_queries().items():
+                assert_indexed(name, explain(conn, statement))
+        db.engine.dispose()
+
+
+def test_suggestions_window_reads_category_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'suggestions.db'))
+        with db.engine.connect() as conn:
+            plan = explain(conn, db._suggestion_query(1, 10))
+        # Kategori adayları indeksten skor sırasıyla okunur; tablolar taranmaz, yalnızca
+        # CTE ve kategori başına en fazla limit satırlık ara sonuçlar sıralanır
+        assert not any(step.startswith(('SCAN collection', 'SCAN candidate')) for step in plan), plan
+        assert any(
+            step.startswith('SEARCH candidate') and 'ix_collections_category_public_followers_desc' in step
+            for step in plan
+        ), plan
+        db.engine.dispose()
+
+
+def test_search_uses_fts_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'search.db'))
+        with db.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO collections (collection_id, name, description, category, is_public, followers_count)
+                VALUES (1, 'İstanbul Müzikleri', 'Şarkılar', 'music', 1, 0),
+                       (2, 'Gizli', 'Işık', 'music', 0, 0),
+                       (3, 'Yemek', 'Tarifler', 'food', 1, 0)
+            """))
+            conn.execute(text("""
+                INSERT INTO collection_items (item_id, collection_id, user_id, content_type, source_url, title, note)
+                VALUES (1, 3, 1, 'video', 'x', 'Kısır tarifi', 'ışık ayarı güzel')
+            """))
+
+        # Önek, Türkçe harf ve aksan katlaması; gizli koleksiyonlar dönmez
+        assert db.search_collection_ids('istanbul') == [1]
+        assert db.search_collection_ids('MÜZ') == [1]
+        assert db.search_collection_ids('ISIK') == [3]
+        assert db.search_collection_ids('kisir', category='music') == []
+        assert db.search_collection_ids('   ') == []
+
+        # Güncelleme ve silme tetikleyicileri indeksi eşitler
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE collections SET name = 'Ankara' WHERE collection_id = 1"))
+            conn.execute(text("DELETE FROM collection_items WHERE item_id = 1"))
+        assert db.search_collection_ids('istanbul') == []
+        assert db.search_collection_ids('ankara') == [1]
+        assert db.search_collection_ids('ışık') == []
+
+        with db.engine.connect() as conn:
+            plan = [row[-1] for row in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT collection_id FROM search_index WHERE search_index MATCH 'a*' ORDER BY rank"
+            )]
+            assert any('VIRTUAL TABLE INDEX' in step for step in plan), plan
+        db.engine.dispose()
+
+
+def test_search_scan_limit_counts_only_visible_matches():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'scan.db'))
+        with db.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO collections (collection_id, name, category, is_public, followers_count)
+                VALUES (1, 'Eski İstanbul', 'music', 1, 0)
+            """))
+            # Daha yeni eşleşmelerin hepsi gizli veya başka kategoride
+            conn.execute(text("""
+                INSERT INTO collections (collection_id, name, category, is_public, followers_count)
+                VALUES (:cid, 'İstanbul', :category, :public, 0)
+            """), [
+                {'cid': cid, 'category': 'music' if cid % 2 else 'food', 'public': cid % 2 == 0}
+                for cid in range(2, 22)
+            ])
+
+        assert db.search_collection_ids('istanbul', category='music', scan_limit=5) == [1]
+        assert len(db.search_collection_ids('istanbul', scan_limit=5)) == 5
+        assert sorted(db.search_collection_ids('istanbul', scan_limit=None)) == [1] + list(range(2, 22, 2))
+        db.engine.dispose()
+
+
+def test_migration_adds_indexes_and_dedupes_followers():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'legacy.db')
+
+        # İndekssiz eski şema ve yinelenen takip kayıtları
+        db = Database(db_path)
+        with db.engine.begin() as conn:
+            for index in collection_followers.indexes:
+                conn.execute(text(f'DROP INDEX {index.name}'))
+            conn.execute(text("INSERT INTO collections (collection_id, name, category, followers_count) VALUES (1, 'c', 'music', 3)"))
+            for _ in range(3):
+                conn.execute(text('INSERT INTO collection_followers (collection_id, follower_id) VALUES (1, 7)'))
+        db.engine.dispose()
+
+        db = Database(db_path)
+        with db.engine.connect() as conn:
+            assert conn.execute(text('SELECT COUNT(*) FROM collection_followers')).scalar() == 1
+            assert conn.execute(text('SELECT followers_count FROM collections')).scalar() == 1
+            names = {row[1] for row in conn.exec_driver_sql('PRAGMA index_list(collection_followers)')}
+            assert {index.name for index in collection_followers.indexes} <= names
+            assert_indexed('follow_collection_existing', explain(conn, hot_queries()['follow_collection_existing']))
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'plans.db'))
+        with db.engine.connect() as conn:
+            for name, statement in hot_queries().items():
+                print(f'{name}:')
+                for step in explain(conn, statement):
+                    print(f'    {step}')
+        db.engine.dispose()
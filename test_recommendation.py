@@ -0,0 +1,224 @@
+import os
+import random
+import tempfile
+import time
+import pytest
+from sqlalchemy import text
+from database import Database
+from recommendation import CollectionFeatureIndex, RecommendationEngine
+
+# Vektörel benzerlik indeksinin eski çift döngülü hesapla aynı sonucu verdiğini doğrular.
+
+CATEGORIES = ['music', 'sports', 'food', 'art']
+SUBCATEGORIES = [None, 'a', 'b']
+TAGS = [f'tag{i}' for i in range(12)]
+CONTENT_TYPES = ['video', 'audio', 'text', 'image']
+
+
+def random_collections(count, seed=7):
+    rng = random.Random(seed)
+    return {
+        cid: {
+            'category': rng.choice(CATEGORIES),
+            'subcategory': rng.choice(SUBCATEGORIES),
+            'tags': set(rng.sample(TAGS, rng.randint(0, 4))),
+            'content_types': {t: rng.randint(1, 5) for t in rng.sample(CONTENT_TYPES, rng.randint(0, 3))}
+        }
+        for cid in range(1, count + 1)
+    }
+
+
+def reference_similarity(a, b):
+    """RecommendationEngine'in önceki _calculate_similarity hesabı"""
+    score = 0.0
+    if a['category'] == b['category']:
+        score += 0.4
+        if a['subcategory'] == b['subcategory']:
+            score += 0.2
+    common_tags = a['tags'] & b['tags']
+    if common_tags:
+        score += 0.2 * (len(common_tags) / max(len(a['tags']), len(b['tags'])))
+    common_types = set(a['content_types']) & set(b['content_types'])
+    if common_types:
+        score += 0.2 * (len(common_types) / max(len(a['content_types']), len(b['content_types'])))
+    return score
+
+
+def build_index(collections):
+    index = CollectionFeatureIndex()
+    for cid, c in collections.items():
+        index.update(cid, c['category'], c['subcategory'], c['tags'], c['content_types'])
+    return index
+
+
+def assert_matches_reference(index, collections, k=5):
+    for cid, c in collections.items():
+        expected = sorted(
+            (reference_similarity(c, other) for oid, other in collections.items() if oid != cid),
+            reverse=True
+        )
+        expected = [score for score in expected if score > 0][:k]
+        got = [score for _, score in index.top_k(cid, k)]
+        assert len(got) == len(expected), (cid, got, expected)
+        for g, e in zip(got, expected):
+            assert abs(g - e) < 1e-5, (cid, got, expected)
+
+
+def test_top_k_matches_pairwise_scores():
+    collections = random_collections(60)
+    assert_matches_reference(build_index(collections), collections)
+
+
+def test_incremental_updates_and_removal():
+    collections = random_collections(60)
+    index = build_index(collections)
+    index.top_k(1)
+
+    # Satır değişikliği, yeni koleksiyon ve yeni sözlük sütunları
+    collections[1]['category'] = 'travel'
+    collections[1]['tags'] = {'yeni-etiket'}
+    collections[61] = {'category': 'travel', 'subcategory': None, 'tags': {'yeni-etiket'}, 'content_types': {'podcast': 1}}
+    for cid in (1, 61):
+        c = collections[cid]
+        index.update(cid, c['category'], c['subcategory'], c['tags'], c['content_types'])
+
+    # Silinen koleksiyon sonuçlarda görünmez
+    index.remove(2)
+    del collections[2]
+
+    assert_matches_reference(index, collections)
+    assert index.top_k(61, 1)[0][0] == 1
+    assert index.top_k(2) == []
+    assert len(index) == 60
+
+
+def test_delta_layer_and_compaction(monkeypatch):
+    monkeypatch.setattr(CollectionFeatureIndex, 'DELTA_MIN_ROWS', 8)
+    monkeypatch.setattr(CollectionFeatureIndex, 'DELTA_RATIO', 0.1)
+    rng = random.Random(3)
+    collections = random_collections(80)
+    index = build_index(collections)
+    index.top_k(1)
+    base = index._base
+
+    # Eşiğin altındaki değişiklikler tabanı yeniden kurmadan deltaya yazılır
+    replacements = random_collections(120, seed=11)
+    for cid in (5, 6, 81):
+        collections[cid] = replacements[cid]
+        c = collections[cid]
+        index.update(cid, c['category'], c['subcategory'], c['tags'], c['content_types'])
+    index.remove(7)
+    del collections[7]
+    assert_matches_reference(index, collections)
+    assert index._base is base and len(index._delta_rows) == 3
+
+    # Eşiği aşınca taban yeniden kurulur ve silinen satırlar sıkıştırılır
+    for cid in rng.sample(sorted(collections), 30):
+        index.remove(cid)
+        del collections[cid]
+    for cid in range(82, 100):
+        collections[cid] = replacements[cid]
+        c = collections[cid]
+        index.update(cid, c['category'], c['subcategory'], c['tags'], c['content_types'])
+    assert_matches_reference(index, collections)
+    assert index._base is not base
+    assert len(index._ids) == len(index) == len(collections)
+    assert None not in index._ids and not index._dirty
+
+
+def test_engine_loads_features_from_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'rec.db'))
+        with db.engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO collections (collection_id, name, category, subcategory, is_public, followers_count)
+                VALUES (1, 'a', 'music', 'x', 1, 0), (2, 'b', 'music', 'x', 1, 0),
+                       (3, 'c', 'music', NULL, 1, 0), (4, 'd', 'music', 'x', 0, 0)
+            """))
+            conn.execute(text("""
+                INSERT INTO collection_items (item_id, collection_id, user_id, content_type, source_url)
+                VALUES (1, 1, 1, 'video', 'u'), (2, 1, 1, 'video', 'u'), (3, 3, 1, 'video', 'u')
+            """))
+
+        features = db.get_collection_features()
+        assert set(features) == {1, 2, 3}
+        assert features[1]['content_types'] == {'video': 2}
+        assert features[2]['content_types'] == {}
+
+        engine = RecommendationEngine(db)
+        engine._ensure_collection_features()
+        assert [cid for cid, _ in engine.collection_features.top_k(1)] == [2, 3]
+
+        # Gizlenen koleksiyon yenilemede indeksten çıkar
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE collections SET is_public = 0 WHERE collection_id = 2"))
+        engine.refresh_collection(2)
+        assert [cid for cid, _ in engine.collection_features.top_k(1)] == [3]
+        db.engine.dispose()
+
+
+
+def test_engine_follows_collection_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'rec.db'))
+        owner = db.create_user('a@example.com', 'A', 'parola')
+        db.upgrade_premium(owner.user_id, 'pro')
+        db.create_collection(owner.user_id, 'a', '', 'music', 'x')
+        db.create_collection(owner.user_id, 'b', '', 'music', 'x')
+        for cid in (1, 2):
+            assert db.add_item_to_collection(cid, owner.user_id, {
+                'type': 'video', 'url': f'https://example.com/{cid}', 'title': 'canlı konser kaydı tam'
+            })
+
+        engine = RecommendationEngine(db, content_index_path=os.path.join(tmp, 'index.db'))
+        similar = lambda cid: [c.collection_id for c in engine.get_similar_collections(cid)]
+        assert similar(1) == [2]
+        items = {item.collection_id: item.item_id for item in db.get_all_public_items()}
+        assert engine.content_index.item_ids() == set(items.values())
+
+        # Yeni koleksiyon ilk içeriği eklenmeden indekse girer
+        assert db.create_collection(owner.user_id, 'c', '', 'music', 'x')
+        assert similar(1) == [2, 3] and 3 in engine.collection_features
+
+        # Kategori ve görünürlük değişiklikleri satırı hemen yeniler
+        assert db.update_collection(3, owner.user_id, category='food', name='c2')
+        assert similar(1) == [2]
+        assert db.update_collection(2, owner.user_id, is_public=False)
+        assert similar(1) == [] and 2 not in engine.collection_features
+        assert engine.content_index.item_ids() == {items[1]}
+
+        assert db.update_collection(2, owner.user_id, is_public=True)
+        assert similar(1) == [2]
+        assert engine.content_index.item_ids() == set(items.values())
+
+        assert db.update_collection(2, owner.user_id + 1, is_public=False) is False
+        with pytest.raises(ValueError):
+            db.update_collection(2, owner.user_id, followers_count=5)
+        engine.content_index.close()
+        db.engine.dispose()
+
+if __name__ == '__main__':
+    collections = random_collections(50000)
+    started = time.perf_counter()
+    index = build_index(collections)
+    index.top_k(1)
+    print(f'{len(index)} koleksiyon indekslendi: {time.perf_counter() - started:.2f} sn')
+
+    started = time.perf_counter()
+    for cid in range(1, 101):
+        index.top_k(cid, 10)
+    print(f'top_k ortalaması: {(time.perf_counter() - started) * 10:.2f} ms')
+
+    sample = dict(list(collections.items())[:2000])
+    started = time.perf_counter()
+    for other in sample.values():
+        reference_similarity(sample[1], other)
+    print(f'çift döngü (2000 koleksiyon, sorgusuz): {(time.perf_counter() - started) * 1000:.2f} ms')
+
+    # Her güncellemeden sonra sorgu: delta katmanı tabanı yeniden kurmaz
+    started = time.perf_counter()
+    for cid in range(1, 101):
+        c = collections[cid]
+        index.update(cid, c['category'], c['subcategory'], c['tags'] | {'yeni'}, c['content_types'])
+        index.top_k(cid, 10)
+    print(f'güncelleme + top_k ortalaması: {(time.perf_counter() - started) * 10:.2f} ms')
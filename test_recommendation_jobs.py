@@ -0,0 +1,197 @@
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import text, event
+from database import Database
+from models import Collection
+from recommendation import CollectionFeatureIndex
+from recommendation_jobs import RecommendationPrecomputer, suggest_for_user
+
+# Toplu öneri işinin tam hesaplamayla aynı sonucu verdiğini ve sonraki
+# çalıştırmalarda yalnızca girdisi değişen satırları yeniden hesapladığını doğrular.
+
+CATEGORIES = ['music', 'sports', 'food', 'art', 'travel']
+CONTENT_TYPES = ['video', 'audio', 'text', 'image']
+
+
+def seed(db, collections=200, users=60, rng_seed=11):
+    rng = random.Random(rng_seed)
+    with db.engine.begin() as conn:
+        for cid in range(1, collections + 1):
+            conn.execute(text("""
+                INSERT INTO collections (collection_id, name, category, subcategory, is_public, followers_count)
+                VALUES (:cid, :name, :category, :sub, :public, 0)
+            """), {
+                'cid': cid, 'name': f'k{cid}', 'category': rng.choice(CATEGORIES),
+                'sub': rng.choice([None, 'a', 'b']), 'public': int(rng.random() > 0.1)
+            })
+            for _ in range(rng.randint(0, 4)):
+                conn.execute(text("""
+                    INSERT INTO collection_items (collection_id, user_id, content_type, source_url)
+                    VALUES (:cid, 1, :type, 'u')
+                """), {'cid': cid, 'type': rng.choice(CONTENT_TYPES)})
+        for user_id in range(1, users + 1):
+            for cid in rng.sample(range(1, collections + 1), rng.randint(0, 8)):
+                conn.execute(text(
+                    "INSERT INTO collection_followers (collection_id, follower_id) VALUES (:cid, :uid)"
+                ), {'cid': cid, 'uid': user_id})
+        conn.execute(text("""
+            UPDATE collections SET followers_count = (
+                SELECT COUNT(*) FROM collection_followers f WHERE f.collection_id = collections.collection_id
+            )
+        """))
+
+
+def full_results(db, top_n=10, limit=10):
+    """Materyalize tablolar olmadan beklenen sonuçlar"""
+    job = RecommendationPrecomputer(db)
+    features, rankings, follows = job._load_inputs()
+    index = CollectionFeatureIndex()
+    for cid, f in features.items():
+        index.update(cid, f['category'], f['subcategory'], content_types=f['content_types'])
+    similar = {cid: [s for s, _ in index.top_k(cid, top_n)] for cid in features}
+    suggestions = {uid: [c for c, _ in suggest_for_user(followed, rankings, limit)] for uid, followed in follows.items()}
+    return similar, suggestions
+
+
+def materialized(db):
+    similar, suggestions = {}, {}
+    with db.engine.connect() as conn:
+        for cid, sid in conn.execute(text("SELECT collection_id, similar_id FROM similar_collections_mv ORDER BY collection_id, rank")):
+            similar.setdefault(cid, []).append(sid)
+        for uid, cid in conn.execute(text("SELECT user_id, collection_id FROM user_suggestions_mv ORDER BY user_id, rank")):
+            suggestions.setdefault(uid, []).append(cid)
+    return similar, suggestions
+
+
+def assert_matches_full(db):
+    expected_similar, expected_suggestions = full_results(db)
+    similar, suggestions = materialized(db)
+    assert similar == {cid: ids for cid, ids in expected_similar.items() if ids}
+    assert suggestions == {uid: ids for uid, ids in expected_suggestions.items() if ids}
+
+
+def test_incremental_runs_match_full_recompute():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'jobs.db'))
+        seed(db)
+        job = RecommendationPrecomputer(db, workers=1)
+
+        first = job.run()
+        assert first['status'] == 'success'
+        assert first['similar_rows'] == len(full_results(db)[0])
+        assert_matches_full(db)
+
+        # Değişiklik yokken hiçbir satır hesaplanmaz
+        second = job.run()
+        assert (second['similar_rows'], second['suggestion_rows']) == (0, 0)
+
+        # Bir koleksiyonun kategorisi değişir, biri gizlenir, bir kullanıcı yeni takip ekler
+        with db.engine.begin() as conn:
+            public = [row[0] for row in conn.execute(text(
+                "SELECT collection_id FROM collections WHERE is_public = 1 ORDER BY collection_id LIMIT 2"
+            ))]
+            conn.execute(text("UPDATE collections SET category = 'art', subcategory = 'a' WHERE collection_id = :cid"), {'cid': public[0]})
+            conn.execute(text("UPDATE collections SET is_public = 0 WHERE collection_id = :cid"), {'cid': public[1]})
+            conn.execute(text("INSERT INTO collection_followers (collection_id, follower_id) VALUES (9, 1)"))
+        third = job.run()
+        assert 0 < third['similar_rows'] < first['similar_rows']
+        assert 0 < third['suggestion_rows'] < first['suggestion_rows']
+        assert third['removed_collections'] == 1
+        assert_matches_full(db)
+        db.engine.dispose()
+
+
+def test_process_pool_matches_inline():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'pool.db'))
+        seed(db, collections=120, users=30)
+        result = RecommendationPrecomputer(db, workers=2, parallel_min_rows=0).run()
+        assert result['status'] == 'success', result
+        assert_matches_full(db)
+        assert db.materialized.similar_ids(1) == full_results(db)[0][1][:10]
+        db.engine.dispose()
+
+
+def test_live_suggestions_match_job_in_one_query():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'live.db'))
+        seed(db)
+        _, rankings, follows = RecommendationPrecomputer(db)._load_inputs()
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            for limit in (3, 10):
+                for user_id, followed in follows.items():
+                    expected = [cid for cid, _ in suggest_for_user(followed, rankings, limit)]
+                    assert db.get_collection_suggestion_ids(user_id, limit) == expected, (user_id, limit)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert len(statements) == 2 * len(follows)
+        assert db.get_collection_suggestion_ids(10 ** 6) == []
+
+        # Skor kancası: en az takipçili koleksiyonlar önce
+        user_id = max(follows, key=lambda uid: len(set(follows[uid].values())))
+        default = db.get_collection_suggestion_ids(user_id, 10)
+        reverse = db.get_collection_suggestion_ids(user_id, 10, score=lambda c: -c.c.followers_count)
+        assert reverse != default
+        counts = dict(pair for ranked in rankings.values() for pair in ranked)
+        category = next(iter(sorted(set(follows[user_id].values()))))
+        in_category = [cid for cid in reverse if cid in dict(rankings[category])]
+        assert [counts[cid] for cid in in_category] == sorted(counts[cid] for cid in in_category)
+        db.engine.dispose()
+
+
+
+def test_public_suggestions_return_ranked_collections():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'public.db'))
+        seed(db)
+        _, rankings, follows = RecommendationPrecomputer(db)._load_inputs()
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            for user_id, followed in follows.items():
+                suggestions = db.get_collection_suggestions(user_id, 10)
+                assert all(isinstance(c, Collection) for c in suggestions)
+                assert [c.collection_id for c in suggestions] == [
+                    cid for cid, _ in suggest_for_user(followed, rankings, 10)
+                ], user_id
+                # Önerilenler herkese açık, takip edilmeyen ve takip edilen kategorilerden
+                assert all(c.is_public and c.collection_id not in followed for c in suggestions)
+                assert {c.category for c in suggestions} <= set(followed.values())
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        # Kullanıcı başına öneri sorgusu ve koleksiyonları getiren sorgu
+        assert len(statements) <= 2 * len(follows)
+
+        user_id = max(follows, key=lambda uid: len(set(follows[uid].values())))
+        reverse = db.get_collection_suggestions(user_id, 10, score=lambda c: -c.c.followers_count)
+        assert [c.collection_id for c in reverse] == db.get_collection_suggestion_ids(
+            user_id, 10, score=lambda c: -c.c.followers_count
+        )
+        assert db.get_collection_suggestions(10 ** 6) == []
+        db.engine.dispose()
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, 'bench.db'))
+        seed(db, collections=20000, users=2000)
+        for workers in (1, os.cpu_count() or 1):
+            with db.engine.begin() as conn:
+                for table in ('similar_collections_mv', 'user_suggestions_mv', 'recommendation_fingerprints'):
+                    conn.execute(text(f'DELETE FROM {table}'))
+            started = time.perf_counter()
+            result = RecommendationPrecomputer(db, workers=workers).run()
+            print(f'{workers} işçi, tam hesaplama: {time.perf_counter() - started:.2f} sn ({result["similar_rows"]} koleksiyon)')
+
+        with db.engine.begin() as conn:
+            conn.execute(text("UPDATE collections SET category = 'art' WHERE collection_id = 5"))
+        result = RecommendationPrecomputer(db).run()
+        print(f'tek değişiklik sonrası: {result["elapsed"]:.2f} sn ({result["similar_rows"]} koleksiyon)')
+        db.engine.dispose()
@@ -0,0 +1,133 @@
+import time
+import asyncio
+import threading
+from services.single_flight import SingleFlight
+from content_collector import ContentCollector
+
+# Aynı anahtar için eşzamanlı çağıranlar tek bir çalıştırmayı paylaşmalı;
+# iş hata verirse hatayı hepsi almalı.
+
+CALLERS = 8
+
+
+class SlowFetch:
+    """Serbest bırakılana kadar bitmeyen, çağrıları sayan iş"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(fetch, calls):
+    """İlk çağrı işi başlattıktan sonra diğerlerini başlat; hepsi bekliyorken işi bırak
+
+    Her çağrı için ('ok', sonuç) veya ('error', hata) döndürür.
+    """
+    outcomes = [None] * len(calls)
+
+    def caller(i):
+        try:
+            outcomes[i] = ('ok', calls[i]())
+        except Exception as e:
+            outcomes[i] = ('error', e)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(len(calls))]
+    threads[0].start()
+    assert fetch.started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Takipçilerin devam eden işe katılması için kısa bir süre tanı
+    time.sleep(0.1)
+    fetch.release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight()
+    fetch = SlowFetch(result={'title': 'paylaşılan'})
+    outcomes = run_concurrently(fetch, [lambda: flight.do('https://example.com/a', fetch)] * CALLERS)
+
+    assert fetch.calls == 1
+    assert all(kind == 'ok' and value is fetch.result for kind, value in outcomes)
+    assert flight.in_flight() == 0
+
+    # Sonuç saklanmaz, iş bittikten sonraki çağrı yeniden çalıştırır
+    flight.do('https://example.com/a', fetch)
+    assert fetch.calls == 2
+
+
+def test_failure_reaches_every_caller():
+    flight = SingleFlight()
+    fetch = SlowFetch(error=ConnectionError('zaman aşımı'))
+    outcomes = run_concurrently(fetch, [lambda: flight.do('k', fetch)] * CALLERS)
+
+    assert fetch.calls == 1
+    assert all(kind == 'error' and value is fetch.error for kind, value in outcomes)
+    # Hata anahtarı kilitli bırakmaz
+    assert flight.in_flight() == 0
+    assert flight.do('k', lambda: 'yeni') == 'yeni'
+
+
+def test_async_and_thread_callers_share_one_fetch():
+    flight = SingleFlight()
+    fetch = SlowFetch(result='ortak')
+
+    async def main():
+        tasks = [asyncio.ensure_future(flight.do_async('k', fetch)) for _ in range(4)]
+        await asyncio.get_running_loop().run_in_executor(None, fetch.started.wait, 5)
+        thread_result = []
+        thread = threading.Thread(target=lambda: thread_result.append(flight.do('k', fetch)))
+        thread.start()
+        await asyncio.sleep(0.1)
+        fetch.release.set()
+        results = await asyncio.gather(*tasks)
+        thread.join(5)
+        return results + thread_result
+
+    assert asyncio.run(main()) == ['ortak'] * 5
+    assert fetch.calls == 1
+
+
+def test_collector_merges_same_normalized_url(monkeypatch):
+    monkeypatch.setattr(ContentCollector, '_inflight', SingleFlight())
+    collector = ContentCollector()
+    fetch = SlowFetch(result={'type': 'text', 'title': 'makale'})
+    collector._collect_content = fetch
+
+    urls = [
+        'https://www.example.com/yazi/?utm_source=tw',
+        'http://example.com/yazi',
+        'https://example.com/yazi?fbclid=1',
+    ]
+    outcomes = run_concurrently(fetch, [lambda url=url: collector.collect_content(url) for url in urls])
+
+    assert fetch.calls == 1
+    # Her çağıran ortak sonucu kendi URL'iyle alır
+    assert outcomes == [('ok', {'type': 'text', 'title': 'makale', 'url': url}) for url in urls]
+
+
+def test_collector_callers_all_see_failure(monkeypatch):
+    monkeypatch.setattr(ContentCollector, '_inflight', SingleFlight())
+    collector = ContentCollector()
+    fetch = SlowFetch(error=RuntimeError('yt-dlp çöktü'))
+    collector._collect_content = fetch
+
+    urls = ['https://youtu.be/x', 'https://www.youtube.com/watch?v=x', 'https://youtube.com/watch?v=x&si=1']
+    outcomes = run_concurrently(fetch, [lambda url=url: collector.collect_content(url) for url in urls])
+
+    assert fetch.calls == 1
+    assert outcomes == [('error', fetch.error)] * len(urls)
+    assert ContentCollector._inflight.in_flight() == 0
@@ -0,0 +1,215 @@
+import io
+import os
+import pytest
+from storage import CHUNK_SIZE, Storage
+
+# İçerik adresli blob deposunun tekilleştirme, referans sayımı, çöp toplama ve
+# eski düzen dosyalarını devralma davranışını doğrular.
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    # Storage çalışma dizinindeki 'storage' klasörünü kullanır
+    monkeypatch.chdir(tmp_path)
+    store = Storage(gc_interval=None, gc_grace=3600)
+    yield store
+    store.conn.close()
+
+
+def blob(store, name):
+    return store.conn.execute(
+        "SELECT b.hash, b.ref_count, b.released_at FROM files f JOIN blobs b ON b.hash = f.blob_hash "
+        "WHERE f.file_path = ?", (str(store.storage_path / name),)
+    ).fetchone()
+
+
+def blob_files(store):
+    return [p for p in store.blob_path.rglob('*') if p.is_file()]
+
+
+def test_same_bytes_are_stored_once(storage):
+    assert storage.upload_file('u1/a.bin', io.BytesIO(b'ayni icerik'))
+    assert storage.upload_file('u2/b.bin', io.BytesIO(b'ayni icerik'))
+
+    a, b = blob(storage, 'u1/a.bin'), blob(storage, 'u2/b.bin')
+    assert a[0] == b[0] and a[1] == 2
+    assert len(blob_files(storage)) == 1
+    assert storage.download_file('u2/b.bin') == b'ayni icerik'
+    assert sorted(storage.list_files()) == ['a.bin', 'b.bin']
+
+    # Kopyalama yalnızca referans ekler
+    assert storage.copy_file('u1/a.bin', 'u3/c.bin')
+    assert blob(storage, 'u3/c.bin')[1] == 3 and len(blob_files(storage)) == 1
+
+
+def test_releasing_one_reference_keeps_the_blob(storage):
+    storage.upload_file('u1/a.bin', io.BytesIO(b'veri'))
+    storage.upload_file('u2/b.bin', io.BytesIO(b'veri'))
+    blob_hash = blob(storage, 'u1/a.bin')[0]
+
+    assert storage.delete_file('u1/a.bin')
+    assert storage.download_file('u1/a.bin') is None
+    assert storage.download_file('u2/b.bin') == b'veri'
+    assert blob(storage, 'u2/b.bin')[1:] == (1, None)
+
+    # Aynı ada farklı içerik yüklemek eski blobun referansını bırakır
+    storage.upload_file('u2/b.bin', io.BytesIO(b'yeni veri'))
+    ref_count, released_at = storage.conn.execute(
+        "SELECT ref_count, released_at FROM blobs WHERE hash = ?", (blob_hash,)
+    ).fetchone()
+    assert ref_count == 0 and released_at is not None
+    assert storage.download_file('u2/b.bin') == b'yeni veri'
+
+
+def test_gc_waits_for_grace_period(storage):
+    storage.upload_file('u1/a.bin', io.BytesIO(b'silinecek'))
+    storage.upload_file('u1/b.bin', io.BytesIO(b'kalacak'))
+    storage.delete_file('u1/a.bin')
+    assert len(blob_files(storage)) == 2
+
+    # Bekleme süresi dolmadan referanssız blob da silinmez
+    assert storage.collect_garbage() == 0
+    assert len(blob_files(storage)) == 2
+
+    storage.gc_grace = 0
+    assert storage.collect_garbage() == 1
+    assert len(blob_files(storage)) == 1
+    assert storage.download_file('u1/b.bin') == b'kalacak'
+    assert storage.collect_garbage() == 0
+
+
+def test_legacy_file_is_adopted_into_blob_store(storage):
+    # Blob deposundan önceki düzen: dosya adıyla diskte, kaydı blob_hash'siz ya da hiç yok
+    for name, row in (('u1/eski.bin', True), ('u1/kayitsiz.bin', False)):
+        legacy = storage.storage_path / name
+        legacy.parent.mkdir(parents=True, exist_ok=True)
+        legacy.write_bytes(b'eski icerik')
+        if row:
+            storage.conn.execute(
+                "INSERT INTO files (id, user_id, original_name, file_path, file_size) VALUES (?, 'u1', ?, ?, ?)",
+                (name, os.path.basename(name), str(legacy), len(b'eski icerik'))
+            )
+            storage.conn.commit()
+        assert storage.get_file_size(name) == len(b'eski icerik')
+
+        assert storage.copy_file(name, f'u2/{os.path.basename(name)}')
+        # Kaynak da bloba bağlanır ve eski dosya kaldırılır
+        assert not legacy.exists()
+        assert blob(storage, name)[0] == blob(storage, f'u2/{os.path.basename(name)}')[0]
+        assert storage.download_file(name) == b'eski icerik'
+
+    assert blob(storage, 'u1/eski.bin')[1] == 4
+    assert len(blob_files(storage)) == 1
+
+
+class RecordingReader(io.BytesIO):
+    """Okuma isteklerinin boyutlarını kaydeden dosya nesnesi"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def test_streamed_upload_larger_than_one_chunk(storage, tmp_path):
+    data = os.urandom(CHUNK_SIZE * 2 + 123)
+    source = RecordingReader(data)
+    assert storage.upload_stream('u1/buyuk.bin', source)
+    # Dosya hiçbir zaman tek seferde okunmaz
+    assert set(source.reads) == {CHUNK_SIZE}
+    assert storage.get_file_size('u1/buyuk.bin') == len(data)
+
+    with storage.open_stream('u1/buyuk.bin') as stream:
+        chunks = list(stream)
+    assert [len(c) for c in chunks] == [CHUNK_SIZE, CHUNK_SIZE, 123]
+    assert b''.join(chunks) == data
+
+    local = tmp_path / 'kesilmis.mp4'
+    local.write_bytes(data)
+    assert storage.upload_path('u1/yol.bin', str(local), chunk_size=4096)
+    assert blob(storage, 'u1/yol.bin')[0] == blob(storage, 'u1/buyuk.bin')[0]
+    assert storage.upload_path('u1/yok.bin', str(tmp_path / 'yok.mp4')) is None
+
+
+def test_range_reads_at_boundaries(storage):
+    data = bytes(range(256)) * 40
+    size = len(data)
+    storage.upload_file('u1/veri.bin', io.BytesIO(data))
+
+    def stream(**kwargs):
+        with storage.open_stream('u1/veri.bin', chunk_size=1000, **kwargs) as chunks:
+            return b''.join(chunks)
+
+    assert stream() == data
+    assert stream(start=0, end=1) == data[:1]
+    assert stream(start=size - 1) == data[-1:]
+    assert stream(start=999, end=2001) == data[999:2001]
+    # Dosya sonunu aşan aralıklar kısalır, tamamen dışarıdakiler boş döner
+    assert stream(start=size - 10, end=size + 100) == data[-10:]
+    assert stream(start=size) == b'' and stream(start=size + 5) == b''
+    assert stream(start=10, end=10) == b'' and stream(start=10, end=5) == b''
+
+    assert storage.read_range('u1/veri.bin', 0, 16) == data[:16]
+    assert storage.read_range('u1/veri.bin', size - 4, 16) == data[-4:]
+    assert storage.read_range('u1/veri.bin', size, 16) == b''
+    assert storage.read_range('u1/veri.bin', size + 100, 16) == b''
+    assert storage.read_range('u1/veri.bin', 5, 0) == b''
+
+    assert storage.read_range('u1/yok.bin', 0, 16) is None
+    with pytest.raises(FileNotFoundError):
+        with storage.open_stream('u1/yok.bin'):
+            pass
+
+
+def test_stream_closes_file_when_left_early(storage):
+    storage.upload_file('u1/veri.bin', io.BytesIO(b'x' * 5000))
+
+    # Yineleyici yarıda bırakılsa da bağlamdan çıkınca dosya kapanır
+    with storage.open_stream('u1/veri.bin', chunk_size=1000) as chunks:
+        assert next(chunks) == b'x' * 1000
+    with pytest.raises(ValueError, match='closed file'):
+        next(chunks)
+
+    # Tüketen tarafta hata olsa da dosya kapanır
+    with pytest.raises(RuntimeError):
+        with storage.open_stream('u1/veri.bin') as chunks:
+            raise RuntimeError('istemci bağlantıyı kesti')
+    with pytest.raises(ValueError, match='closed file'):
+        next(chunks)
+
+
+def test_mmap_view_is_zero_copy_and_closed_on_exit(storage):
+    data = os.urandom(10000)
+    storage.upload_file('u1/video.mp4', io.BytesIO(data))
+    storage.upload_file('u1/bos.bin', io.BytesIO(b''))
+
+    with storage.open_mmap('u1/video.mp4') as view:
+        assert view.readonly and len(view) == len(data)
+        part = view[100:200]
+        assert isinstance(part, memoryview) and bytes(part) == data[100:200]
+        part.release()
+    # Görünüm bağlamdan sonra kullanılamaz
+    with pytest.raises(ValueError):
+        view[0]
+
+    with storage.open_mmap('u1/bos.bin') as view:
+        assert len(view) == 0
+    with pytest.raises(FileNotFoundError):
+        with storage.open_mmap('u1/yok.bin'):
+            pass
+
+
+def test_mmap_escaped_slice_defers_close(storage, caplog):
+    data = b'0123456789' * 100
+    storage.upload_file('u1/video.mp4', io.BytesIO(data))
+
+    with caplog.at_level('WARNING', logger='DigiCollect.Storage'):
+        with storage.open_mmap('u1/video.mp4') as view:
+            escaped = view[10:20]
+    # BufferError yutulur ve uyarı yazılır; sızan dilim eşleme açık kaldığı için okunabilir
+    assert 'kapatılamadı' in caplog.text
+    assert bytes(escaped) == data[10:20]
+    escaped.release()
@@ -0,0 +1,110 @@
+import math
+import os
+import tempfile
+import pytest
+from sqlalchemy import text
+from database import Database
+from trending import TrendingTracker, TRENDING_WINDOWS, MAX_EXPONENT, HOUR, DAY
+
+# Trend skorlarının zamanla söndüğünü, pencerelerin farklı sıraladığını ve
+# landmark yeniden ölçeklemesinin sıralamayı bozmadığını doğrular.
+
+NOW = 1_700_000_000.0
+
+
+def make_db(tmp):
+    db = Database(os.path.join(tmp, 'trending.db'))
+    with db.engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO collections (collection_id, name, category, is_public, followers_count)
+            VALUES (1, 'eski', 'music', 1, 50), (2, 'yeni', 'music', 1, 0),
+                   (3, 'gizli', 'music', 0, 0), (4, 'sessiz', 'music', 1, 10)
+        """))
+    return db
+
+
+def test_windows_rank_recent_activity_differently():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp)
+        with db.engine.begin() as conn:
+            # 1: iki gün önce çok takip; 2: son saatte az ama taze etkinlik; 3: gizli
+            db.trending.record(conn, 1, 'follow', count=20, now=NOW - 2 * DAY)
+            db.trending.record(conn, 2, 'follow', count=2, now=NOW - 600)
+            db.trending.record(conn, 2, 'view', count=5, now=NOW - 60)
+            db.trending.record(conn, 3, 'follow', count=100, now=NOW)
+
+        with db.engine.connect() as conn:
+            hourly = db.trending.top(conn, 'hourly', now=NOW)
+            weekly = db.trending.top(conn, 'weekly', now=NOW)
+        assert [cid for cid, _ in hourly] == [2, 1]
+        assert [cid for cid, _ in weekly] == [1, 2]
+
+        # Güncel skor, olay ağırlığının sönümlü toplamıdır
+        expected = 20 * 3.0 * math.exp(-2 * DAY / TRENDING_WINDOWS['weekly'])
+        assert abs(dict(weekly)[1] - expected) < 1e-6
+        db.engine.dispose()
+
+
+def test_rebase_keeps_scores_and_prunes_stale_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp)
+        later = NOW + (MAX_EXPONENT + 1) * HOUR
+        with db.engine.begin() as conn:
+            db.trending.record(conn, 1, 'follow', now=NOW)
+            db.trending.record(conn, 2, 'item_add', now=later - HOUR)
+        with db.engine.connect() as conn:
+            before = dict(db.trending.top(conn, 'hourly', now=later))
+
+        # Üs sınırı aşıldığında yeni olay skorları küçültür ve landmark'ı ilerletir
+        with db.engine.begin() as conn:
+            db.trending.record(conn, 4, 'view', now=later)
+            landmark = conn.execute(text("SELECT landmark FROM trending_periods WHERE period = 'hourly'")).scalar()
+        assert landmark == later
+
+        with db.engine.connect() as conn:
+            after = dict(db.trending.top(conn, 'hourly', now=later))
+        # Çoktan sönmüş 1 silinir, 2'nin güncel skoru değişmez
+        assert set(after) == {2, 4}
+        assert math.isclose(after[2], before[2], rel_tol=1e-9)
+        db.engine.dispose()
+
+
+def test_trending_query_uses_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp)
+        with db.engine.connect() as conn:
+            plan = [row[-1] for row in conn.exec_driver_sql("""
+                EXPLAIN QUERY PLAN
+                SELECT t.collection_id FROM trending_scores AS t
+                JOIN collections AS c ON c.collection_id = t.collection_id AND c.is_public = 1
+                WHERE t.period = 'daily' AND t.score > 0 ORDER BY t.score DESC LIMIT 10
+            """)]
+        assert not any(step.startswith('SCAN') or 'TEMP B-TREE' in step for step in plan), plan
+        db.engine.dispose()
+
+
+def test_get_trending_collections_ranks_public_collections():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp)
+        for _ in range(3):
+            db.record_collection_view(2)
+        for _ in range(10):
+            db.record_collection_view(3)
+        assert db.follow_collection(4, 7)
+
+        def trending(limit, period='daily'):
+            return [c.collection_id for c in db.get_trending_collections(period, limit)]
+
+        # Takip görüntülemeden ağır basar; gizli koleksiyon listelenmez
+        assert trending(2) == [4, 2]
+        # Olay skoru olmayanlar takipçi sayısına göre eklenir
+        assert trending(4) == [4, 2, 1]
+
+        # Takibi bırakmak skoru sıfırlar; 4 yalnızca takipçi sırasıyla döner
+        assert db.unfollow_collection(4, 7)
+        assert trending(3) == [2, 1, 4]
+        assert trending(3, 'weekly') == [2, 1, 4]
+
+        with pytest.raises(ValueError):
+            db.get_trending_collections('monthly')
+        db.engine.dispose()
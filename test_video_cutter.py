@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import pytest
+import ffmpeg
+from services.video_cutter import VideoCutter
+
+# Kesim modlarının süre ve ses/görüntü uyumunu küçük bir üretilmiş klip üzerinde
+# doğrular. ffmpeg/ffprobe kurulu değilse atlanır.
+
+pytestmark = pytest.mark.skipif(
+    not (shutil.which('ffmpeg') and shutil.which('ffprobe')),
+    reason='ffmpeg/ffprobe bulunamadı'
+)
+
+START, END = 1.5, 4.5
+# Test klibinde anahtar kare aralığı (saniye)
+GOP = 1.0
+
+
+def make_clip(path, acodec='libmp3lame'):
+    """6 sn, 25 fps, saniyede bir anahtar kareli h264 (main) + AAC olmayan ses"""
+    video = ffmpeg.input('testsrc=duration=6:size=320x240:rate=25', format='lavfi')
+    audio = ffmpeg.input('sine=frequency=440:duration=6', format='lavfi')
+    stream = ffmpeg.output(
+        video, audio, path,
+        vcodec='libx264', acodec=acodec, g=25, pix_fmt='yuv420p', **{'profile:v': 'main'}
+    )
+    ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+
+
+def durations(path):
+    """(kapsayıcı, video, ses) süreleri"""
+    probe = ffmpeg.probe(path)
+    streams = {s['codec_type']: s for s in probe['streams']}
+    return (
+        float(probe['format']['duration']),
+        float(streams['video']['duration']),
+        float(streams['audio']['duration']) if 'audio' in streams else None
+    )
+
+
+def decode_errors(path):
+    _, err = ffmpeg.output(ffmpeg.input(path), '-', format='null', loglevel='error').run(
+        capture_stdout=True, capture_stderr=True
+    )
+    return err.decode('utf-8', 'replace').strip()
+
+
+@pytest.fixture
+def clip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'clip.mp4')
+        make_clip(path)
+        yield tmp, path
+
+
+def cut(tmp, path, mode):
+    result = VideoCutter().cut_video(path, START, END, os.path.join(tmp, f'{mode}.mp4'), mode=mode)
+    assert result['status'] == 'success', result
+    return result
+
+
+def test_copy_starts_at_previous_keyframe(clip):
+    tmp, path = clip
+    result = cut(tmp, path, 'copy')
+    assert result['strategy'] == 'copy'
+    total, video, _ = durations(result['output_path'])
+    # Başlangıç en fazla bir GOP geriye kayabilir
+    assert END - START - 0.1 <= video <= END - START + GOP + 0.1
+
+
+def test_accurate_and_smart_are_frame_exact(clip):
+    tmp, path = clip
+    accurate = cut(tmp, path, 'accurate')
+    smart = cut(tmp, path, 'auto')
+    assert accurate['strategy'] == smart['strategy'] == 'smart'
+
+    for result in (accurate, smart):
+        total, video, audio = durations(result['output_path'])
+        assert abs(video - (END - START)) < 0.1, result
+        assert abs(audio - video) < 0.1, result
+        assert decode_errors(result['output_path']) == ''
+
+    probe = ffmpeg.probe(smart['output_path'])
+    codecs = {s['codec_type']: s for s in probe['streams']}
+    assert codecs['audio']['codec_name'] == 'aac'
+    assert codecs['video']['profile'] == 'Main'
+    assert codecs['video']['time_base'] == ffmpeg.probe(path, select_streams='v:0')['streams'][0]['time_base']
+
+
+def test_reencode_covers_range(clip):
+    tmp, path = clip
+    result = cut(tmp, path, 'reencode')
+    assert result['strategy'] == 'reencode'
+    _, video, audio = durations(result['output_path'])
+    assert abs(video - (END - START)) < 0.1
+    assert abs(audio - video) < 0.1
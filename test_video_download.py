@@ -0,0 +1,86 @@
+import pytest
+from yt_dlp.utils import download_range_func
+from services import ytdl_pool
+from services.ytdl_pool import YoutubeDLPool, PROFILES
+from services.video_cutter import VideoCutter
+
+# VideoCutter'ın yt-dlp'ye verdiği seçenekler ağa çıkmadan sınanır: havuz
+# gerçek, içindeki YoutubeDL işleme anındaki seçenekleri kaydeden bir sahtedir.
+
+INFO = {'id': 'abc', 'title': 'Kedi', 'duration': 120, 'thumbnail': 'https://i.ytimg.com/t.jpg',
+        'uploader': 'Kanal', 'view_count': 10, 'upload_date': '20240101'}
+
+
+class RecordingYoutubeDL:
+    def __init__(self, params):
+        self.params = params
+        self.calls = []
+
+    def extract_info(self, url, download=True, process=True):
+        return dict(INFO)
+
+    def process_ie_result(self, info, download=True):
+        self.calls.append({'params': dict(self.params), 'download': download})
+        if download:
+            sections = self.params.get('download_ranges')
+            suffix = ''.join(f"_{r['start_time']}-{r['end_time']}" for r in sections(info, self)) if sections else ''
+            info['requested_downloads'] = [{'filepath': f"/tmp/digicollect/{info['id']}{suffix}.mp4"}]
+        return info
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cutter(monkeypatch):
+    monkeypatch.setattr(ytdl_pool.yt_dlp, 'YoutubeDL', RecordingYoutubeDL)
+    pool = YoutubeDLPool(size=1)
+    cutter = VideoCutter()
+    cutter.ytdl = pool
+    yield cutter
+    pool.close()
+
+
+def calls(cutter, profile):
+    with cutter.ytdl.checkout(profile) as ydl:
+        return ydl.calls
+
+
+def test_download_section_requests_only_the_range(cutter):
+    result = cutter.download_section('https://youtu.be/abc', 5, 12.5)
+
+    assert result == {'status': 'success', 'output_path': '/tmp/digicollect/abc_5-12.5.mp4',
+                      'start_time': 5, 'end_time': 12.5}
+    [call] = calls(cutter, 'video_720p')
+    assert call['download'] is True
+    params = call['params']
+    assert params['download_ranges'] == download_range_func(None, [(5, 12.5)])
+    assert list(params['download_ranges'](INFO, None)) == [{'start_time': 5, 'end_time': 12.5}]
+    assert params['force_keyframes_at_cuts'] is True
+    assert params['format'] == PROFILES['video_720p']['format']
+    assert '%(section_start' in params['outtmpl']
+
+    # Bölüm seçenekleri bu indirmeyle sınırlı kalır; sonraki tam indirme etkilenmez
+    cutter.download_video('https://youtu.be/abc')
+    full = calls(cutter, 'video_720p')[-1]['params']
+    assert 'download_ranges' not in full and 'force_keyframes_at_cuts' not in full
+
+
+def test_download_section_rejects_empty_range(cutter):
+    result = cutter.download_section('https://youtu.be/abc', 10, 10)
+    assert result['status'] == 'error' and 'Bitiş' in result['error']
+    assert calls(cutter, 'video_720p') == []
+
+
+def test_metadata_does_not_download(cutter):
+    result = cutter.fetch_video_metadata('https://www.youtube.com/watch?v=abc')
+
+    assert result['status'] == 'success'
+    assert (result['video_id'], result['title'], result['duration']) == ('abc', 'Kedi', 120)
+    assert result['metadata'] == {'uploader': 'Kanal', 'view_count': 10, 'like_count': 0, 'upload_date': '20240101'}
+    [call] = calls(cutter, 'metadata')
+    assert call['download'] is False
+    assert 'download_ranges' not in call['params']
+
+    # Ardından gelen bölüm indirmesi aynı sayfa bilgisini kullanır
+    assert cutter.download_section('https://youtu.be/abc', 0, 3)['status'] == 'success'
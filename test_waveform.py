@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from services.waveform import WaveformEngine, WaveformPeaks, zoom_range
+
+# Seviyeler ve pencereleme, kaba kuvvet min/max ile karşılaştırılarak sınanır.
+# 16 Hz'de 4 örneklik kovalar: seviye L'de bir kova 0.25 * 2**L saniye.
+
+SAMPLE_RATE = 16
+BUCKET = 4
+BUCKETS = 64
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(7)
+    return rng.integers(-32768, 32767, BUCKETS * BUCKET, dtype=np.int16)
+
+
+def make_peaks(samples, level_count=10):
+    engine = WaveformEngine(sample_rate=SAMPLE_RATE, bucket_size=BUCKET, level_count=level_count)
+    levels = engine._compute_levels(samples)
+    return WaveformPeaks(SAMPLE_RATE, BUCKET, len(samples) / SAMPLE_RATE, levels)
+
+
+def test_levels_halve_and_keep_extremes(samples):
+    peaks = make_peaks(samples)
+    assert [len(mins) for mins, _ in peaks.levels] == [64, 32, 16, 8, 4, 2, 1]
+    for level, (mins, maxs) in enumerate(peaks.levels):
+        groups = samples.reshape(len(mins), -1)
+        assert groups.shape[1] == BUCKET * 2 ** level
+        assert np.array_equal(mins, groups.min(axis=1))
+        assert np.array_equal(maxs, groups.max(axis=1))
+
+    # Seviye sayısı sınırlanabilir
+    assert len(make_peaks(samples, level_count=3).levels) == 3
+
+
+def test_levels_pad_partial_buckets():
+    engine = WaveformEngine(sample_rate=SAMPLE_RATE, bucket_size=BUCKET)
+    assert engine._compute_levels(np.zeros(0, dtype=np.int16)) == []
+
+    # Son kova son örnekle tamamlanır (sessizlik eklenmez)
+    samples = np.array([5, 9, 7, 6, 8, 10], dtype=np.int16)
+    (mins0, maxs0), (mins1, maxs1) = engine._compute_levels(samples)
+    assert mins0.tolist() == [5, 8] and maxs0.tolist() == [9, 10]
+    assert mins1.tolist() == [5] and maxs1.tolist() == [10]
+
+    # Tek sayıda kovalı seviye, son kovayı tekrarlayarak bir üste çıkar
+    samples = np.arange(3 * BUCKET, dtype=np.int16)
+    levels = engine._compute_levels(samples)
+    assert [m.tolist() for m, _ in levels] == [[0, 4, 8], [0, 8], [0]]
+    assert [m.tolist() for _, m in levels] == [[3, 7, 11], [7, 11], [11]]
+
+
+def test_window_uses_each_level(samples):
+    peaks = make_peaks(samples)
+    duration = peaks.duration
+    for level, (mins, maxs) in enumerate(peaks.levels):
+        assert peaks.seconds_per_bucket(level) == 0.25 * 2 ** level
+        # Tam width kova veren seviye seçilir ve dizisi olduğu gibi döner
+        width = len(mins)
+        assert peaks.level_for(duration, width) == level
+        wmins, wmaxs = peaks.window(0, duration, width)
+        assert wmins.dtype == np.float32
+        assert np.allclose(wmins, mins / 32768) and np.allclose(wmaxs, maxs / 32768)
+
+        if level:
+            # Bir sütun fazlası istenirse bir ince seviyeden fazlalık sütunlara indirilir
+            assert peaks.level_for(duration, width + 1) == level - 1
+            wmins, wmaxs = peaks.window(0, duration, width + 1)
+            assert len(wmins) == width + 1
+            assert wmins.min() == samples.min() / 32768 and wmaxs.max() == samples.max() / 32768
+            assert np.all(wmins <= wmaxs)
+
+    # Seviye sayısından daha kaba istek en kaba seviyede kalır
+    assert peaks.level_for(duration, 1) == len(peaks.levels) - 1
+
+
+def test_window_slices_sub_range(samples):
+    peaks = make_peaks(samples)
+    # 4-8 sn aralığı seviye 0'da 16-32. kovalar
+    mins, maxs = peaks.window(4, 8, 16)
+    level0_mins, level0_maxs = peaks.levels[0]
+    assert np.allclose(mins, level0_mins[16:32] / 32768)
+    assert np.allclose(maxs, level0_maxs[16:32] / 32768)
+
+    # Aynı aralık 4 sütunda seviye 2'den okunur
+    mins, _ = peaks.window(4, 8, 4)
+    assert np.allclose(mins, peaks.levels[2][0][4:8] / 32768)
+
+    # Geçersiz veya parçanın dışındaki aralıklar boş döner
+    for start, end, width in ((4, 8, 0), (8, 4, 10), (100, 120, 10)):
+        assert len(peaks.window(start, end, width)[0]) == 0
+    assert len(WaveformPeaks(SAMPLE_RATE, BUCKET, 0, []).window(0, 1, 10)[0]) == 0
+
+
+def test_zoom_range_follows_selection():
+    assert zoom_range(40, 60, 100) == (38, 62)
+    # Parça sınırlarında kırpılır
+    assert zoom_range(0, 50, 100) == (0, 55)
+    assert zoom_range(0, 100, 100) == (0, 100)
+    # Süre bilinmiyorsa veya seçim boşsa tüm parça gösterilir
+    assert zoom_range(10, 20, 0) == (0, 0)
+    assert zoom_range(20, 20, 100) == (0, 0)
+
+
+def test_engine_caches_peaks_file(tmp_path, samples, monkeypatch):
+    audio = tmp_path / 'parca.mp3'
+    audio.write_bytes(b'ses')
+    engine = WaveformEngine(sample_rate=SAMPLE_RATE, bucket_size=BUCKET)
+    decoded = []
+    monkeypatch.setattr(engine, '_decode', lambda path: decoded.append(path) or samples)
+
+    peaks = engine.load(str(audio))
+    assert peaks.duration == len(samples) / SAMPLE_RATE
+    assert len(peaks.levels) == 7
+    assert np.array_equal(peaks.levels[3][1], make_peaks(samples).levels[3][1])
+
+    # Ses dosyası değişmedikçe PCM yeniden çözülmez
+    engine.load(str(audio))
+    assert len(decoded) == 1
@@ -0,0 +1,157 @@
+import threading
+import pytest
+from services import ytdl_pool
+from services.ytdl_pool import YoutubeDLPool, PROFILES
+
+# Havuz, ağa çıkmayan sahte bir YoutubeDL ile sınanır: sahte örnek aldığı
+# seçenekleri ve extract_info/process_ie_result çağrılarını kaydeder.
+
+
+class FakeYoutubeDL:
+    def __init__(self, params):
+        self.params = params
+        self.extracted = []
+        self.processed = []
+        self.closed = False
+
+    def extract_info(self, url, download=True, process=True):
+        self.extracted.append((url, download, process))
+        return {'id': url.rsplit('=', 1)[-1], 'title': 'Video', 'duration': 60,
+                'thumbnail': 'https://i.ytimg.com/t.jpg', 'formats': [{'format_id': '22'}]}
+
+    def process_ie_result(self, info, download=True):
+        # İşlenen sözlük yerinde değiştirilir, gerçek yt-dlp gibi
+        self.processed.append({'params': dict(self.params), 'download': download})
+        info['formats'].append({'format_id': 'eklendi'})
+        if download:
+            info['requested_downloads'] = [{'filepath': f"/tmp/{info['id']}.mp4"}]
+        return info
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ytdl_pool, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def pool(monkeypatch, clock):
+    monkeypatch.setattr(ytdl_pool.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    pool = YoutubeDLPool(size=2)
+    yield pool
+    pool.close()
+
+
+def test_checkout_reuses_instances_per_profile(pool):
+    with pool.checkout('metadata') as first:
+        assert isinstance(first, FakeYoutubeDL)
+        with pool.checkout('metadata') as second:
+            assert second is not first
+    # Boşa çıkan örnek yeniden verilir, yenisi oluşturulmaz
+    with pool.checkout('metadata') as again:
+        assert again in (first, second)
+    with pool.checkout('audio_mp3') as audio:
+        assert audio.params['format'] == 'bestaudio/best'
+    assert len(pool._created['metadata']) == 2 and len(pool._created['audio_mp3']) == 1
+
+    # Seçenekler profilin kopyasıdır, örnek üzerinde değişiklik profile sızmaz
+    audio.params['postprocessors'][0]['preferredquality'] = '64'
+    assert PROFILES['audio_mp3']['postprocessors'][0]['preferredquality'] == '192'
+
+    with pytest.raises(ValueError):
+        with pool.checkout('bilinmeyen'):
+            pass
+
+    pool.close()
+    assert first.closed and second.closed and audio.closed
+
+
+def test_checkout_waits_when_pool_is_exhausted(monkeypatch, clock):
+    monkeypatch.setattr(ytdl_pool.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    pool = YoutubeDLPool(size=1)
+    got = []
+
+    def waiter_body():
+        with pool.checkout('metadata') as ydl:
+            got.append(ydl)
+
+    with pool.checkout('metadata') as only:
+        waiter = threading.Thread(target=waiter_body)
+        waiter.start()
+        waiter.join(0.1)
+        # Tek örnek kullanımdayken ikinci çağıran bekler
+        assert waiter.is_alive() and got == []
+    waiter.join(5)
+    assert got == [only]
+    pool.close()
+
+
+def test_checkout_overrides_are_restored(pool):
+    with pool.checkout('metadata') as ydl:
+        pass
+
+    with pool.checkout('metadata', quiet=False, download_ranges='aralik') as same:
+        assert same is ydl
+        assert same.params['quiet'] is False and same.params['download_ranges'] == 'aralik'
+    assert ydl.params == PROFILES['metadata']
+
+    # Hata durumunda da eski seçenekler geri yüklenir ve örnek havuza döner
+    with pytest.raises(RuntimeError):
+        with pool.checkout('metadata', format='worst') as same:
+            raise RuntimeError('indirme hatası')
+    assert ydl.params == PROFILES['metadata']
+    with pool.checkout('metadata') as again:
+        assert again is ydl
+
+
+def test_page_info_is_cached_for_five_minutes(pool, clock):
+    assert pool.info_ttl == 300
+    info = pool.extract_info('https://www.youtube.com/watch?v=abc', 'metadata')
+    with pool.checkout('metadata') as ydl:
+        pass
+    assert ydl.extracted == [('https://www.youtube.com/watch?v=abc', False, False)]
+    assert info['id'] == 'abc'
+
+    # Aynı normalize URL başka biçimde ve başka profille istense de sayfa yeniden çıkarılmaz
+    clock.now += 299
+    downloaded = pool.extract_info('https://youtu.be/abc?si=paylas', 'video_720p', download=True)
+    assert downloaded['requested_downloads'] == [{'filepath': '/tmp/abc.mp4'}]
+    with pool.checkout('video_720p') as video:
+        pass
+    assert video.extracted == [] and video.processed[-1]['download'] is True
+
+    # process_ie_result önbellekteki ham sonucu değiştirmez
+    cached = pool._get_cached_info('https://youtube.com/watch?v=abc')
+    assert cached['formats'] == [{'format_id': '22'}] and 'requested_downloads' not in cached
+
+    # Süre dolunca sayfa yeniden çıkarılır
+    clock.now += 2
+    pool.extract_info('https://youtube.com/watch?v=abc', 'metadata')
+    assert len(ydl.extracted) + len(video.extracted) == 2
+
+
+def test_info_cache_is_bounded(monkeypatch, clock):
+    monkeypatch.setattr(ytdl_pool.yt_dlp, 'YoutubeDL', FakeYoutubeDL)
+    pool = YoutubeDLPool(size=1, max_cached_infos=2)
+    for video_id in ('a', 'b', 'c'):
+        clock.now += 1
+        pool.extract_info(f'https://youtube.com/watch?v={video_id}')
+    # En eski kayıt atılır
+    assert list(pool._infos) == ['https://youtube.com/watch?v=b', 'https://youtube.com/watch?v=c']
+
+    # Süresi dolan kayıtlar yeni yazmada temizlenir
+    clock.now += 300
+    pool.extract_info('https://youtube.com/watch?v=d')
+    assert list(pool._infos) == ['https://youtube.com/watch?v=d']
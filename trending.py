@@ -0,0 +1,144 @@
+import math
+import time
+from sqlalchemy import text
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+# Zaman penceresi -> üstel sönüm süresi (saniye). Bir olayın etkisi bu süre
+# sonunda 1/e'ye iner.
+TRENDING_WINDOWS = {
+    'hourly': HOUR,
+    'daily': DAY,
+    'weekly': WEEK
+}
+
+# Olay türlerinin skora katkısı
+EVENT_WEIGHTS = {
+    'follow': 3.0,
+    'unfollow': -3.0,
+    'item_add': 1.0,
+    'view': 0.2
+}
+
+# Skorlar bir referans zamana (landmark) göre ileri sönümle saklanır:
+#   saklanan = Σ ağırlık * e^((olay_zamanı - landmark) / tau)
+# Tüm satırlar aynı çarpanla büyüdüğü için sıralama zamanla değişmez ve
+# (period, score) indeksi doğrudan ilk k'yı verir. Üs bu sınırı aşınca
+# skorlar küçültülüp landmark ileri alınır.
+MAX_EXPONENT = 50.0
+
+# Yeniden ölçeklemede bu değerin altına düşen satırlar silinir
+PRUNE_THRESHOLD = 1e-6
+
+TRENDING_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS trending_periods (
+        period TEXT PRIMARY KEY,
+        landmark REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS trending_scores (
+        period TEXT NOT NULL,
+        collection_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (period, collection_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_trending_scores_period_score ON trending_scores (period, score)"
+]
+
+
+class TrendingTracker:
+    """Takip, içerik ekleme ve görüntüleme olaylarından zamanla sönen trend skorları
+
+    Her (pencere, koleksiyon) için tek satır tutulur; olay kaydı bir UPSERT,
+    trend listesi tek bir indeksli sorgudur.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        with self.engine.begin() as conn:
+            for statement in TRENDING_DDL:
+                conn.execute(text(statement))
+
+    @staticmethod
+    def _landmark(conn, period, tau, now):
+        """Pencerenin referans zamanını getir, gerekirse skorları yeniden ölçekle"""
+        row = conn.execute(
+            text("SELECT landmark FROM trending_periods WHERE period = :period"),
+            {'period': period}
+        ).first()
+        if row is None:
+            conn.execute(
+                text("INSERT INTO trending_periods (period, landmark) VALUES (:period, :now)"),
+                {'period': period, 'now': now}
+            )
+            return now
+
+        landmark = row[0]
+        if (now - landmark) / tau > MAX_EXPONENT:
+            factor = math.exp(-(now - landmark) / tau)
+            conn.execute(
+                text("UPDATE trending_scores SET score = score * :factor WHERE period = :period"),
+                {'factor': factor, 'period': period}
+            )
+            conn.execute(
+                text("DELETE FROM trending_scores WHERE period = :period AND abs(score) < :threshold"),
+                {'period': period, 'threshold': PRUNE_THRESHOLD}
+            )
+            conn.execute(
+                text("UPDATE trending_periods SET landmark = :now WHERE period = :period"),
+                {'period': period, 'now': now}
+            )
+            landmark = now
+        return landmark
+
+    def record(self, conn, collection_id, event, count=1, now=None):
+        """Olayı tüm pencerelere işle
+
+        Args:
+            conn: Açık bir bağlantı veya oturum; olay çağıranın işlemiyle birlikte commit edilir
+            collection_id: Koleksiyon
+            event: EVENT_WEIGHTS anahtarlarından biri
+            count: Olay adedi
+            now: Olay zamanı (unix saniye), varsayılan şimdi
+        """
+        if event not in EVENT_WEIGHTS:
+            raise ValueError(f"Bilinmeyen trend olayı: {event}")
+        now = time.time() if now is None else now
+
+        for period, tau in TRENDING_WINDOWS.items():
+            landmark = self._landmark(conn, period, tau, now)
+            conn.execute(text("""
+                INSERT INTO trending_scores (period, collection_id, score)
+                VALUES (:period, :collection_id, :score)
+                ON CONFLICT (period, collection_id) DO UPDATE SET score = score + excluded.score
+            """), {
+                'period': period,
+                'collection_id': collection_id,
+                'score': EVENT_WEIGHTS[event] * count * math.exp((now - landmark) / tau)
+            })
+
+    def top(self, conn, period='daily', limit=10, public_only=True, now=None):
+        """En yüksek skorlu koleksiyonları (collection_id, güncel skor) olarak döndür"""
+        if period not in TRENDING_WINDOWS:
+            raise ValueError(f"Bilinmeyen zaman periyodu: {period}")
+        now = time.time() if now is None else now
+
+        sql = """
+            SELECT t.collection_id, t.score, p.landmark
+            FROM trending_scores AS t
+            JOIN trending_periods AS p ON p.period = t.period
+        """
+        if public_only:
+            sql += " JOIN collections AS c ON c.collection_id = t.collection_id AND c.is_public = 1"
+        sql += " WHERE t.period = :period AND t.score > 0 ORDER BY t.score DESC LIMIT :limit"
+
+        tau = TRENDING_WINDOWS[period]
+        return [
+            (collection_id, score * math.exp(-(now - landmark) / tau))
+            for collection_id, score, landmark in conn.execute(text(sql), {'period': period, 'limit': limit})
+        ]
@@ -10,6 +10,11 @@ app = Flask(__name__)
 db = Database()
 auth = Auth(db)
 
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """İstek bitiminde iş parçacığının veritabanı oturumunu kapat"""
+    db.remove_session()
+
 @app.route('/verify/<token>')
 def verify_email(token):
     success, message = auth.verify_email(token)
@@ -0,0 +1,76 @@
+from kivy.uix.widget import Widget
+from kivy.properties import NumericProperty, ListProperty, ObjectProperty
+from kivy.graphics import Color, Rectangle, Mesh
+from kivy.clock import Clock
+import numpy as np
+
+class WaveformView(Widget):
+    # WaveformPeaks nesnesi (services.waveform)
+    peaks = ObjectProperty(None, allownone=True)
+
+    # Görünen zaman aralığı (saniye); view_end 0 ise parçanın tamamı gösterilir
+    view_start = NumericProperty(0)
+    view_end = NumericProperty(0)
+
+    # Vurgulanacak seçim aralığı (saniye)
+    selection_start = NumericProperty(0)
+    selection_end = NumericProperty(0)
+
+    # Renkler
+    wave_color = ListProperty([0.2, 0.6, 1, 1])
+    selection_color = ListProperty([0.2, 0.6, 1, 0.15])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._trigger_redraw = Clock.create_trigger(self._redraw)
+        self.bind(
+            size=self._trigger_redraw,
+            pos=self._trigger_redraw,
+            peaks=self._trigger_redraw,
+            view_start=self._trigger_redraw,
+            view_end=self._trigger_redraw,
+            selection_start=self._trigger_redraw,
+            selection_end=self._trigger_redraw
+        )
+
+    def _redraw(self, *args):
+        """Tepe dizilerinden dalga formunu çiz (görüntü dosyası yüklenmez)"""
+        self.canvas.clear()
+        if self.peaks is None or self.width <= 0:
+            return
+
+        start = self.view_start
+        end = self.view_end or self.peaks.duration
+        if end <= start:
+            return
+
+        # Her piksel sütunu için tek bir min/max çifti
+        mins, maxs = self.peaks.window(start, end, self.width)
+        if len(mins) == 0:
+            return
+
+        with self.canvas:
+            # Seçim alanı
+            if self.selection_end > self.selection_start:
+                Color(*self.selection_color)
+                sel_x = self.x + (max(self.selection_start, start) - start) * self.width / (end - start)
+                sel_right = self.x + (min(self.selection_end, end) - start) * self.width / (end - start)
+                if sel_right > sel_x:
+                    Rectangle(pos=(sel_x, self.y), size=(sel_right - sel_x, self.height))
+
+            # Her sütun için min'den max'a dikey çizgi; tek Mesh ile çizilir
+            column_width = self.width / len(mins)
+            xs = self.x + (np.arange(len(mins), dtype=np.float32) + 0.5) * column_width
+            half = self.height / 2
+            vertices = np.zeros((len(mins) * 2, 4), dtype=np.float32)
+            vertices[0::2, 0] = xs
+            vertices[0::2, 1] = self.center_y + mins * half
+            vertices[1::2, 0] = xs
+            vertices[1::2, 1] = self.center_y + maxs * half
+
+            Color(*self.wave_color)
+            Mesh(
+                vertices=vertices.ravel().tolist(),
+                indices=list(range(len(vertices))),
+                mode='lines'
+            )